@@ -21,6 +21,10 @@ class MissingServerConfigError(RunnerError):
     """Error for unable to create runner due to missing server configurations."""
 
 
+class RunnerRemoveError(RunnerError):
+    """Error for unable to SSH into a runner and run the remove script."""
+
+
 class IssueMetricEventError(Exception):
     """Represents an error when issuing a metric event."""
 
@@ -7,12 +7,15 @@ Migrate to PyGithub in the future. PyGithub is still lacking some API such as
 remove token for runner.
 """
 import functools
+import http
 import logging
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Callable, ParamSpec, TypeVar
 from urllib.error import HTTPError
 
-from ghapi.all import GhApi, pages
+from ghapi.all import GhApi
 from ghapi.page import paged
 from typing_extensions import assert_never
 
@@ -34,6 +37,40 @@ ParamT = ParamSpec("ParamT")
 # Return type of the function decorated with retry
 ReturnT = TypeVar("ReturnT")
 
+# The runner listing is reused for this many seconds, long enough to serve the repeated listings
+# of one reconcile.
+RUNNER_LIST_CACHE_TTL = 30
+_RUNNER_LIST_PAGE_SIZE = 100
+
+
+@dataclass
+class _RunnerListPage:
+    """A page of the self-hosted runner listing.
+
+    Attributes:
+        etag: The ETag of the page, to validate the page with a conditional request.
+        total_count: The total number of runners reported with the page.
+        runners: The runners on the page.
+    """
+
+    etag: str | None
+    total_count: int
+    runners: list[SelfHostedRunner]
+
+
+@dataclass
+class _RunnerListCache:
+    """The cached self-hosted runner listing of a GitHub path.
+
+    Attributes:
+        pages: The pages of the listing by page number.
+        validated_at: The monotonic time the pages were last validated with GitHub, None if the
+            pages are outdated.
+    """
+
+    pages: dict[int, _RunnerListPage] = field(default_factory=dict)
+    validated_at: float | None = None
+
 
 def catch_http_errors(func: Callable[ParamT, ReturnT]) -> Callable[ParamT, ReturnT]:
     """Catch HTTP errors and raise custom exceptions.
@@ -77,19 +114,26 @@ def catch_http_errors(func: Callable[ParamT, ReturnT]) -> Callable[ParamT, Retur
 class GithubClient:
     """GitHub API client."""
 
-    def __init__(self, token: str):
+    def __init__(self, token: str, runner_list_ttl: float = RUNNER_LIST_CACHE_TTL):
         """Instantiate the GiHub API client.
 
         Args:
             token: GitHub personal token for API requests.
+            runner_list_ttl: The time in seconds to reuse the runner listing for.
         """
         self._token = token
         self._client = GhApi(token=self._token)
+        self._runner_list_ttl = runner_list_ttl
+        self._runner_list_cache: dict[str, _RunnerListCache] = {}
 
     @catch_http_errors
     def get_runner_github_info(self, path: GitHubPath) -> list[SelfHostedRunner]:
         """Get runner information on GitHub under a repo or org.
 
+        The listing is reused for the runner list TTL. Once expired, the pages are requested
+        conditionally with the ETags of the previous listing, unchanged pages are answered with
+        304 Not Modified which do not count against the rate limit.
+
         Args:
             path: GitHub repository path in the format '<owner>/<repo>', or the GitHub organization
                 name.
@@ -97,42 +141,70 @@ class GithubClient:
         Returns:
             List of runner information.
         """
-        remote_runners_list: list[SelfHostedRunner] = []
+        cache = self._runner_list_cache.setdefault(path.path(), _RunnerListCache())
+        if (
+            cache.validated_at is None
+            or time.monotonic() - cache.validated_at >= self._runner_list_ttl
+        ):
+            pages: dict[int, _RunnerListPage] = {}
+            page_number = 1
+            while True:
+                page = self._get_runner_list_page(path, page_number, cache.pages.get(page_number))
+                pages[page_number] = page
+                if not page.runners or page_number * _RUNNER_LIST_PAGE_SIZE >= page.total_count:
+                    break
+                page_number += 1
+            cache.pages = pages
+            cache.validated_at = time.monotonic()
+        return [runner for _, page in sorted(cache.pages.items()) for runner in page.runners]
 
-        if isinstance(path, GitHubRepo):
-            # The documentation of ghapi for pagination is incorrect and examples will give errors.
-            # This workaround is a temp solution. Will be moving to PyGitHub in the future.
-            self._client.actions.list_self_hosted_runners_for_repo(
-                owner=path.owner, repo=path.repo, per_page=100
-            )
-            num_of_pages = self._client.last_page()
-            remote_runners_list = [
-                item
-                for page in pages(
-                    self._client.actions.list_self_hosted_runners_for_repo,
-                    num_of_pages + 1,
+    def _get_runner_list_page(
+        self, path: GitHubPath, page_number: int, cached_page: _RunnerListPage | None
+    ) -> _RunnerListPage:
+        """Get a page of the runner listing, reusing the cached page if it has not changed.
+
+        Args:
+            path: GitHub repository path in the format '<owner>/<repo>', or the GitHub organization
+                name.
+            page_number: The number of the page, starting from 1.
+            cached_page: The page from the previous listing.
+
+        Raises:
+            HTTPError: The request of the page failed.
+
+        Returns:
+            The page of the listing.
+        """
+        headers = (
+            {"If-None-Match": cached_page.etag}
+            if cached_page is not None and cached_page.etag
+            else None
+        )
+        try:
+            if isinstance(path, GitHubRepo):
+                response = self._client.actions.list_self_hosted_runners_for_repo(
                     owner=path.owner,
                     repo=path.repo,
-                    per_page=100,
+                    per_page=_RUNNER_LIST_PAGE_SIZE,
+                    page=page_number,
+                    headers=headers,
                 )
-                for item in page["runners"]
-            ]
-        if isinstance(path, GitHubOrg):
-            # The documentation of ghapi for pagination is incorrect and examples will give errors.
-            # This workaround is a temp solution. Will be moving to PyGitHub in the future.
-            self._client.actions.list_self_hosted_runners_for_org(org=path.org, per_page=100)
-            num_of_pages = self._client.last_page()
-            remote_runners_list = [
-                item
-                for page in pages(
-                    self._client.actions.list_self_hosted_runners_for_org,
-                    num_of_pages + 1,
+            else:
+                response = self._client.actions.list_self_hosted_runners_for_org(
                     org=path.org,
-                    per_page=100,
+                    per_page=_RUNNER_LIST_PAGE_SIZE,
+                    page=page_number,
+                    headers=headers,
                 )
-                for item in page["runners"]
-            ]
-        return remote_runners_list
+        except HTTPError as exc:
+            if exc.code == http.HTTPStatus.NOT_MODIFIED and cached_page is not None:
+                return cached_page
+            raise
+        return _RunnerListPage(
+            etag=self._client.recv_hdrs.get("ETag"),
+            total_count=response["total_count"],
+            runners=list(response["runners"]),
+        )
 
     @catch_http_errors
     def get_runner_remove_token(self, path: GitHubPath) -> str:
@@ -199,6 +271,9 @@ class GithubClient:
                 org=path.org,
                 runner_id=runner_id,
             )
+        # The runner listing no longer reflects GitHub, the next listing revalidates it.
+        if (cache := self._runner_list_cache.get(path.path())) is not None:
+            cache.validated_at = None
 
     def get_job_info_by_runner_name(
         self, path: GitHubRepo, workflow_run_id: str, runner_name: str
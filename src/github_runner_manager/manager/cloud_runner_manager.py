@@ -5,12 +5,20 @@
 
 import abc
 import logging
+import time
 from dataclasses import dataclass
 from enum import Enum, auto
-from typing import Iterator, Sequence, Tuple
+from typing import Iterable, Iterator, Sequence, Tuple
 
+from github_runner_manager.errors import RunnerCreateError
+from github_runner_manager.manager.create_concurrency import (
+    AdaptiveConcurrencyLimit,
+    CreateOutcome,
+    is_throttled,
+)
 from github_runner_manager.metrics.runner import RunnerMetrics
 from github_runner_manager.types_ import (
+    MetricsReceiverConfig,
     ProxyConfig,
     RepoPolicyComplianceConfig,
     SSHDebugConnection,
@@ -143,12 +151,15 @@ class SupportServiceConfig:
         dockerhub_mirror: The dockerhub mirror to use for runners.
         ssh_debug_connections: The information on the ssh debug services.
         repo_policy_compliance: The configuration of the repo policy compliance service.
+        metrics_receiver: The configuration of the receiver the runners push their metrics to.
+            If None, the metrics are only pulled from the runners.
     """
 
     proxy_config: ProxyConfig | None
     dockerhub_mirror: str | None
     ssh_debug_connections: list[SSHDebugConnection] | None
     repo_policy_compliance: RepoPolicyComplianceConfig | None
+    metrics_receiver: MetricsReceiverConfig | None = None
 
 
 @dataclass
@@ -188,6 +199,73 @@ class CloudRunnerManager(abc.ABC):
             registration_token: The GitHub registration token for registering runners.
         """
 
+    def create_runners(
+        self, registration_token: str, num: int, concurrency: AdaptiveConcurrencyLimit
+    ) -> tuple[InstanceId, ...]:
+        """Create self-hosted runners in a single pass.
+
+        Cloud runner managers can override this to overlap the creation of the runners, within
+        the concurrency limit. By default, the runners are created one by one.
+
+        Args:
+            registration_token: The GitHub registration token for registering runners.
+            num: The number of runners to create.
+            concurrency: The limit on the number of runners created concurrently, updated with
+                the outcome of the creations.
+
+        Returns:
+            The instance IDs of the runners created successfully.
+        """
+        instance_ids = []
+        for _ in range(num):
+            start = time.monotonic()
+            try:
+                instance_ids.append(self.create_runner(registration_token=registration_token))
+            except RunnerCreateError as exc:
+                logger.exception("Failed to create a runner.")
+                concurrency.record(
+                    CreateOutcome(
+                        duration=time.monotonic() - start, failed=True, throttled=is_throttled(exc)
+                    )
+                )
+                continue
+            concurrency.record(CreateOutcome(duration=time.monotonic() - start))
+        return tuple(instance_ids)
+
+    def refill_warm_pool(self, queue_size: int) -> int:  # pylint: disable=unused-argument
+        """Launch instances into the pool of instances waiting to be claimed by a job.
+
+        Cloud runner managers can override this to keep pre-booted instances to create runners
+        from. By default, there is no such pool.
+
+        Args:
+            queue_size: The number of jobs waiting in the queue.
+
+        Returns:
+            The number of instances launched.
+        """
+        return 0
+
+    def reconcile_metrics_receiver(self) -> None:
+        """Keep the receiver of the metrics pushed by the runners running as configured.
+
+        Cloud runner managers can override this when their runners push their metrics. By
+        default, the metrics are only pulled from the runners.
+        """
+
+    def report_github_states(  # pylint: disable=unused-argument
+        self, busy: Iterable[InstanceId], offline: Iterable[InstanceId]
+    ) -> None:
+        """Report the state of the runners on GitHub.
+
+        Cloud runner managers can override this to adapt how often the runners are health
+        checked. By default, the report is ignored.
+
+        Args:
+            busy: The instance IDs of the runners GitHub reports busy.
+            offline: The instance IDs of the runners GitHub reports offline.
+        """
+
     @abc.abstractmethod
     def get_runner(self, instance_id: InstanceId) -> CloudRunnerInstance | None:
         """Get a self-hosted runner by instance id.
@@ -225,11 +303,15 @@ class CloudRunnerManager(abc.ABC):
         """
 
     @abc.abstractmethod
-    def cleanup(self, remove_token: str) -> Iterator[RunnerMetrics]:
+    def cleanup(
+        self, remove_token: str, runners: Sequence[CloudRunnerInstance] | None = None
+    ) -> Iterator[RunnerMetrics]:
         """Cleanup runner and resource on the cloud.
 
         Perform health check on runner and delete the runner if it fails.
 
         Args:
             remove_token: The GitHub remove token for removing runners.
+            runners: The runners with their health known from a recent state snapshot, their
+                health is not checked again. If None, the health of all runners is checked.
         """
@@ -0,0 +1,144 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Adaptive limit on the number of runners created concurrently."""
+
+import logging
+from collections import deque
+from dataclasses import dataclass
+
+logger = logging.getLogger(__name__)
+
+# HTTP status codes of the cloud API indicating that requests should be slowed down.
+THROTTLE_STATUS_CODES = frozenset((429, 503))
+# Creations slower than this factor of the usual creation time are not taken as a sign to
+# increase the concurrency.
+_LATENCY_TOLERANCE = 2.0
+# Weight of a new sample in the moving average of the creation time.
+_LATENCY_SMOOTHING = 0.2
+# The concurrency is decreased when the rate of failures in the recent creations exceeds this.
+_MAX_ERROR_RATE = 0.3
+_ERROR_WINDOW = 10
+
+
+@dataclass
+class CreateOutcome:
+    """The outcome of the creation of a runner.
+
+    Attributes:
+        duration: The time in seconds taken by the creation.
+        failed: Whether the creation failed.
+        throttled: Whether the failure was due to the cloud API rate limiting or being
+            unavailable.
+    """
+
+    duration: float
+    failed: bool = False
+    throttled: bool = False
+
+
+def is_throttled(exc: BaseException) -> bool:
+    """Check whether an error was caused by the cloud API throttling or being unavailable.
+
+    Args:
+        exc: The error.
+
+    Returns:
+        Whether an error in the cause chain has a throttling HTTP status code.
+    """
+    current: BaseException | None = exc
+    while current is not None:
+        status_code = getattr(current, "status_code", None) or getattr(
+            current, "http_status", None
+        )
+        if status_code in THROTTLE_STATUS_CODES:
+            return True
+        current = current.__cause__ or current.__context__
+    return False
+
+
+class AdaptiveConcurrencyLimit:  # pylint: disable=too-few-public-methods
+    """Additive increase, multiplicative decrease control of the creation concurrency.
+
+    The limit grows by one after a limit's worth of healthy creations, i.e., a creation that
+    succeeded without being much slower than usual. It is halved when the cloud throttles the
+    requests or too many recent creations failed, at most once per limit's worth of outcomes as
+    the creations in flight when the limit is lowered would report the same condition.
+
+    Attributes:
+        limit: The current number of runners to create concurrently.
+        max_limit: The upper bound of the limit.
+    """
+
+    def __init__(self, max_limit: int, initial_limit: int | None = None) -> None:
+        """Construct the object.
+
+        Args:
+            max_limit: The upper bound of the limit.
+            initial_limit: The limit to start with, defaults to the upper bound.
+        """
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit if initial_limit is None else initial_limit
+        self.limit = min(max(1, self.limit), self.max_limit)
+        self._healthy_count = 0
+        self._outcomes_since_decrease = self.limit
+        self._recent_failures: deque[bool] = deque(maxlen=_ERROR_WINDOW)
+        self._average_duration: float | None = None
+
+    def record(self, outcome: CreateOutcome) -> None:
+        """Update the limit with the outcome of a creation.
+
+        Args:
+            outcome: The outcome of the creation.
+        """
+        self._outcomes_since_decrease += 1
+        self._recent_failures.append(outcome.failed)
+        if outcome.throttled or self._error_rate() > _MAX_ERROR_RATE:
+            self._decrease(
+                "cloud throttling" if outcome.throttled else "high creation failure rate"
+            )
+            return
+        if outcome.failed:
+            return
+
+        healthy = (
+            self._average_duration is None
+            or outcome.duration <= self._average_duration * _LATENCY_TOLERANCE
+        )
+        self._average_duration = (
+            outcome.duration
+            if self._average_duration is None
+            else (1 - _LATENCY_SMOOTHING) * self._average_duration
+            + _LATENCY_SMOOTHING * outcome.duration
+        )
+        if not healthy:
+            return
+        self._healthy_count += 1
+        if self._healthy_count >= self.limit and self.limit < self.max_limit:
+            self.limit += 1
+            self._healthy_count = 0
+            logger.info("Increased runner creation concurrency to %s", self.limit)
+
+    def _error_rate(self) -> float:
+        """Get the rate of failures in the recent creations.
+
+        Returns:
+            The failure rate.
+        """
+        if len(self._recent_failures) < _ERROR_WINDOW:
+            return 0.0
+        return sum(self._recent_failures) / len(self._recent_failures)
+
+    def _decrease(self, reason: str) -> None:
+        """Halve the limit unless it was decreased recently.
+
+        Args:
+            reason: The reason of the decrease, for logging.
+        """
+        if self._outcomes_since_decrease < self.limit:
+            return
+        self.limit = max(1, self.limit // 2)
+        self._outcomes_since_decrease = 0
+        self._healthy_count = 0
+        self._recent_failures.clear()
+        logger.warning("Decreased runner creation concurrency to %s due to %s", self.limit, reason)
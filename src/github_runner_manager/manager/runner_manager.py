@@ -4,12 +4,23 @@
 """Class for managing the GitHub self-hosted runners hosted on cloud instances."""
 
 import logging
+import queue
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from enum import Enum, auto
 from multiprocessing import Pool
-from typing import Iterator, Sequence, Type, cast
-
-from github_runner_manager.errors import GithubMetricsError, RunnerCreateError
+from multiprocessing.pool import AsyncResult
+from typing import Callable, Iterable, Iterator, Sequence, Type, cast
+
+from github_runner_manager.errors import (
+    CloudError,
+    GithubMetricsError,
+    IssueMetricEventError,
+    MetricsStorageError,
+    RunnerCreateError,
+    SSHError,
+)
 from github_runner_manager.manager.cloud_runner_manager import (
     CloudRunnerInstance,
     CloudRunnerManager,
@@ -17,6 +28,11 @@ from github_runner_manager.manager.cloud_runner_manager import (
     HealthState,
     InstanceId,
 )
+from github_runner_manager.manager.create_concurrency import (
+    AdaptiveConcurrencyLimit,
+    CreateOutcome,
+    is_throttled,
+)
 from github_runner_manager.manager.github_runner_manager import (
     GitHubRunnerManager,
     GitHubRunnerState,
@@ -78,6 +94,98 @@ class RunnerInstance:
         self.cloud_state = cloud_instance.state
 
 
+@dataclass
+class RunnerStateSnapshot:
+    """The state of the runners on the cloud and on GitHub at one point in time.
+
+    A snapshot is taken once per reconcile and passed through its phases, so that the cloud,
+    GitHub and the health of the runners are queried once instead of once per phase. The phases
+    remove the runners they delete from the snapshot, and mark it outdated when they create
+    runners.
+
+    Attributes:
+        cloud_runners: The runner instances on the cloud with their health.
+        github_runners: The self-hosted runners registered on GitHub.
+        outdated: Whether runners were created since the snapshot was taken.
+    """
+
+    cloud_runners: tuple[CloudRunnerInstance, ...]
+    github_runners: tuple[SelfHostedRunner, ...]
+    outdated: bool = False
+
+    def get_runners(
+        self,
+        github_states: Sequence[GitHubRunnerState] | None = None,
+        cloud_states: Sequence[CloudRunnerState] | None = None,
+    ) -> tuple[RunnerInstance]:
+        """Get information on runner filter by state.
+
+        Only runners that has cloud instance are returned.
+
+        Args:
+            github_states: Filter for the runners with these github states. If None all
+                states will be included.
+            cloud_states: Filter for the runners with these cloud states. If None all states
+                will be included.
+
+        Returns:
+            Information on the runners.
+        """
+        github_infos_map = {info["name"]: info for info in self.github_runners}
+        cloud_infos_map = {info.name: info for info in self.cloud_runners}
+        logger.info(
+            "Found following runners: %s", cloud_infos_map.keys() | github_infos_map.keys()
+        )
+
+        runner_names = cloud_infos_map.keys() & github_infos_map.keys()
+        cloud_only = cloud_infos_map.keys() - runner_names
+        github_only = github_infos_map.keys() - runner_names
+        if cloud_only:
+            logger.warning(
+                "Found runner instance on cloud but not registered on GitHub: %s", cloud_only
+            )
+        if github_only:
+            logger.warning(
+                "Found self-hosted runner on GitHub but no matching runner instance on cloud: %s",
+                github_only,
+            )
+
+        runner_instances: list[RunnerInstance] = [
+            RunnerInstance(
+                cloud_infos_map[name], github_infos_map[name] if name in github_infos_map else None
+            )
+            for name in cloud_infos_map.keys()
+        ]
+        if cloud_states is not None:
+            runner_instances = [
+                runner for runner in runner_instances if runner.cloud_state in cloud_states
+            ]
+        if github_states is not None:
+            runner_instances = [
+                runner
+                for runner in runner_instances
+                if runner.github_state is not None and runner.github_state in github_states
+            ]
+        return cast(tuple[RunnerInstance], tuple(runner_instances))
+
+    def remove_runners(self, instance_ids: Iterable[InstanceId]) -> None:
+        """Remove deleted runners from the snapshot.
+
+        Args:
+            instance_ids: The instance IDs of the runners deleted.
+        """
+        instance_id_set = set(instance_ids)
+        names = {
+            runner.name for runner in self.cloud_runners if runner.instance_id in instance_id_set
+        }
+        self.cloud_runners = tuple(
+            runner for runner in self.cloud_runners if runner.instance_id not in instance_id_set
+        )
+        self.github_runners = tuple(
+            runner for runner in self.github_runners if runner["name"] not in names
+        )
+
+
 @dataclass
 class RunnerManagerConfig:
     """Configuration for the runner manager.
@@ -86,11 +194,20 @@ class RunnerManagerConfig:
         name: A name to identify this manager.
         token: GitHub personal access token to query GitHub API.
         path: Path to GitHub repository or organization to registry the runners.
+        pipelined_creation: Whether to create several runners in one pass of the cloud runner
+            manager, overlapping the boot and readiness wait of all runners, instead of one
+            process per runner.
+        create_concurrency: The maximum number of runners created concurrently. The actual
+            concurrency adapts below this limit to the cloud API health.
+        delete_concurrency: The maximum number of runners deleted concurrently.
     """
 
     name: str
     token: str
     path: GitHubPath
+    pipelined_creation: bool = False
+    create_concurrency: int = 10
+    delete_concurrency: int = 10
 
 
 class RunnerManager:
@@ -99,6 +216,7 @@ class RunnerManager:
     Attributes:
         manager_name: A name to identify this manager.
         name_prefix: The name prefix of the runners.
+        create_concurrency: The current number of runners created concurrently.
     """
 
     def __init__(
@@ -119,28 +237,99 @@ class RunnerManager:
         self._github = GitHubRunnerManager(
             prefix=self.name_prefix, token=self._config.token, path=self._config.path
         )
+        self._create_concurrency = AdaptiveConcurrencyLimit(max_limit=config.create_concurrency)
 
-    def create_runners(self, num: int) -> tuple[InstanceId, ...]:
+    @property
+    def create_concurrency(self) -> int:
+        """The current number of runners created concurrently.
+
+        Returns:
+            The creation concurrency.
+        """
+        return self._create_concurrency.limit
+
+    def create_runners(
+        self, num: int, snapshot: RunnerStateSnapshot | None = None
+    ) -> tuple[InstanceId, ...]:
         """Create runners.
 
         Args:
             num: Number of runners to create.
+            snapshot: The state snapshot of the reconcile, marked outdated by the creation.
 
         Returns:
             List of instance ID of the runners.
         """
         logger.info("Creating %s runners", num)
         registration_token = self._github.get_registration_token()
+        if snapshot is not None:
+            snapshot.outdated = True
+
+        if self._config.pipelined_creation and num > 1:
+            return self._cloud.create_runners(
+                registration_token=registration_token,
+                num=num,
+                concurrency=self._create_concurrency,
+            )
 
         create_runner_args = [
             RunnerManager._CreateRunnerArgs(self._cloud, registration_token) for _ in range(num)
         ]
-        return RunnerManager._spawn_runners(create_runner_args)
+        return RunnerManager._spawn_runners(create_runner_args, self._create_concurrency)
+
+    def refill_warm_pool(self, queue_size: int) -> int:
+        """Refill the pool of pre-booted instances waiting for a job.
+
+        Args:
+            queue_size: The number of jobs waiting in the queue.
+
+        Returns:
+            The number of instances launched.
+        """
+        return self._cloud.refill_warm_pool(queue_size=queue_size)
+
+    def reconcile_metrics_receiver(self) -> None:
+        """Keep the receiver of the metrics pushed by the runners running as configured."""
+        self._cloud.reconcile_metrics_receiver()
+
+    def get_snapshot(self) -> RunnerStateSnapshot:
+        """Take a snapshot of the state of the runners.
+
+        The runners on GitHub are listed while the runners on the cloud are listed and health
+        checked.
+
+        Returns:
+            The state snapshot.
+        """
+        logger.info("Taking snapshot of the runners...")
+        with ThreadPoolExecutor(max_workers=1, thread_name_prefix="github-runners") as executor:
+            github_future = executor.submit(self._github.get_runners)
+            cloud_infos = self._cloud.get_runners()
+            github_infos = github_future.result()
+        github_states = {
+            runner["name"]: GitHubRunnerState.from_runner(runner) for runner in github_infos
+        }
+        self._cloud.report_github_states(
+            busy=[
+                runner.instance_id
+                for runner in cloud_infos
+                if github_states.get(runner.name) == GitHubRunnerState.BUSY
+            ],
+            offline=[
+                runner.instance_id
+                for runner in cloud_infos
+                if github_states.get(runner.name) == GitHubRunnerState.OFFLINE
+            ],
+        )
+        return RunnerStateSnapshot(
+            cloud_runners=tuple(cloud_infos), github_runners=tuple(github_infos)
+        )
 
     def get_runners(
         self,
         github_states: Sequence[GitHubRunnerState] | None = None,
         cloud_states: Sequence[CloudRunnerState] | None = None,
+        snapshot: RunnerStateSnapshot | None = None,
     ) -> tuple[RunnerInstance]:
         """Get information on runner filter by state.
 
@@ -151,65 +340,37 @@ class RunnerManager:
                 states will be included.
             cloud_states: Filter for the runners with these cloud states. If None all states
                 will be included.
+            snapshot: The state snapshot to get the runners from. Taken anew if None, or
+                refreshed if outdated.
 
         Returns:
             Information on the runners.
         """
         logger.info("Getting runners...")
-        github_infos = self._github.get_runners(github_states)
-        cloud_infos = self._cloud.get_runners(cloud_states)
-        github_infos_map = {info["name"]: info for info in github_infos}
-        cloud_infos_map = {info.name: info for info in cloud_infos}
-        logger.info(
-            "Found following runners: %s", cloud_infos_map.keys() | github_infos_map.keys()
-        )
-
-        runner_names = cloud_infos_map.keys() & github_infos_map.keys()
-        cloud_only = cloud_infos_map.keys() - runner_names
-        github_only = github_infos_map.keys() - runner_names
-        if cloud_only:
-            logger.warning(
-                "Found runner instance on cloud but not registered on GitHub: %s", cloud_only
-            )
-        if github_only:
-            logger.warning(
-                "Found self-hosted runner on GitHub but no matching runner instance on cloud: %s",
-                github_only,
-            )
+        snapshot = self._refresh_snapshot(snapshot)
+        return snapshot.get_runners(github_states=github_states, cloud_states=cloud_states)
 
-        runner_instances: list[RunnerInstance] = [
-            RunnerInstance(
-                cloud_infos_map[name], github_infos_map[name] if name in github_infos_map else None
-            )
-            for name in cloud_infos_map.keys()
-        ]
-        if cloud_states is not None:
-            runner_instances = [
-                runner for runner in runner_instances if runner.cloud_state in cloud_states
-            ]
-        if github_states is not None:
-            runner_instances = [
-                runner
-                for runner in runner_instances
-                if runner.github_state is not None and runner.github_state in github_states
-            ]
-        return cast(tuple[RunnerInstance], tuple(runner_instances))
-
-    def delete_runners(self, num: int) -> IssuedMetricEventsStats:
+    def delete_runners(
+        self, num: int, snapshot: RunnerStateSnapshot | None = None
+    ) -> IssuedMetricEventsStats:
         """Delete runners.
 
         Args:
             num: The number of runner to delete.
+            snapshot: The state snapshot to select the runners from, updated for the deletion.
 
         Returns:
             Stats on metrics events issued during the deletion of runners.
         """
         logger.info("Deleting %s number of runners", num)
-        runners_list = self.get_runners()[:num]
+        runners_list = self.get_runners(snapshot=snapshot)[:num]
         runner_names = [runner.name for runner in runners_list]
         logger.info("Deleting runners: %s", runner_names)
         remove_token = self._github.get_removal_token()
-        return self._delete_runners(runners=runners_list, remove_token=remove_token)
+        stats = self._delete_runners(runners=runners_list, remove_token=remove_token)
+        if snapshot is not None:
+            snapshot.remove_runners(runner.instance_id for runner in runners_list)
+        return stats
 
     def flush_runners(
         self, flush_mode: FlushMode = FlushMode.FLUSH_IDLE
@@ -239,20 +400,60 @@ class RunnerManager:
         stats = self._cloud.flush_runners(remove_token, busy)
         return self._issue_runner_metrics(metrics=stats)
 
-    def cleanup(self) -> IssuedMetricEventsStats:
+    def cleanup(self, snapshot: RunnerStateSnapshot | None = None) -> IssuedMetricEventsStats:
         """Run cleanup of the runners and other resources.
 
+        Args:
+            snapshot: The state snapshot to take the health of the runners from, updated for the
+                runners deleted. If None, the health of the runners is checked.
+
         Returns:
             Stats on metrics events issued during the cleanup of runners.
         """
         self._github.delete_runners([GitHubRunnerState.OFFLINE])
         remove_token = self._github.get_removal_token()
-        deleted_runner_metrics = self._cloud.cleanup(remove_token)
-        return self._issue_runner_metrics(metrics=deleted_runner_metrics)
+        if snapshot is None:
+            deleted_runner_metrics = self._cloud.cleanup(remove_token)
+            return self._issue_runner_metrics(metrics=deleted_runner_metrics)
+
+        snapshot = self._refresh_snapshot(snapshot)
+        deleted_runner_metrics = self._cloud.cleanup(remove_token, runners=snapshot.cloud_runners)
+        stats = self._issue_runner_metrics(metrics=deleted_runner_metrics)
+        # The cleanup deleted the offline runners on GitHub and the unhealthy runners.
+        snapshot.github_runners = tuple(
+            runner
+            for runner in snapshot.github_runners
+            if GitHubRunnerState.from_runner(runner) != GitHubRunnerState.OFFLINE
+        )
+        snapshot.remove_runners(
+            runner.instance_id
+            for runner in snapshot.cloud_runners
+            if runner.health == HealthState.UNHEALTHY
+        )
+        return stats
+
+    def _refresh_snapshot(self, snapshot: RunnerStateSnapshot | None) -> RunnerStateSnapshot:
+        """Take a snapshot if none is given, or update an outdated snapshot in place.
+
+        Args:
+            snapshot: The state snapshot.
+
+        Returns:
+            The up-to-date state snapshot.
+        """
+        if snapshot is None:
+            return self.get_snapshot()
+        if snapshot.outdated:
+            fresh = self.get_snapshot()
+            snapshot.cloud_runners = fresh.cloud_runners
+            snapshot.github_runners = fresh.github_runners
+            snapshot.outdated = False
+        return snapshot
 
     @staticmethod
     def _spawn_runners(
         create_runner_args: Sequence["RunnerManager._CreateRunnerArgs"],
+        concurrency: AdaptiveConcurrencyLimit,
     ) -> tuple[InstanceId, ...]:
         """Spawn runners in parallel using multiprocessing.
 
@@ -265,6 +466,11 @@ class RunnerManager:
 
         Args:
             create_runner_args: List of arg for invoking _create_runner method.
+            concurrency: The limit on the number of runners created concurrently, updated with
+                the outcome of the creations.
+
+        Raises:
+            RunnerCreateError: If the creation of a single runner failed.
 
         Returns:
             A tuple of instance ID's of runners spawned.
@@ -272,40 +478,71 @@ class RunnerManager:
         num = len(create_runner_args)
 
         if num == 1:
-            return (RunnerManager._create_runner(create_runner_args[0]),)
+            start = time.monotonic()
+            try:
+                instance_id = RunnerManager._create_runner(create_runner_args[0])
+            except RunnerCreateError as exc:
+                concurrency.record(
+                    CreateOutcome(
+                        duration=time.monotonic() - start, failed=True, throttled=is_throttled(exc)
+                    )
+                )
+                raise
+            concurrency.record(CreateOutcome(duration=time.monotonic() - start))
+            return (instance_id,)
 
-        return RunnerManager._spawn_runners_using_multiprocessing(create_runner_args, num)
+        return RunnerManager._spawn_runners_using_multiprocessing(create_runner_args, concurrency)
 
     @staticmethod
     def _spawn_runners_using_multiprocessing(
-        create_runner_args: Sequence["RunnerManager._CreateRunnerArgs"], num: int
+        create_runner_args: Sequence["RunnerManager._CreateRunnerArgs"],
+        concurrency: AdaptiveConcurrencyLimit,
     ) -> tuple[InstanceId, ...]:
         """Parallel spawn of runners.
 
         The length of the create_runner_args is number _create_runner invocation, and therefore the
-        number of runner spawned.
+        number of runner spawned. A new creation is only started when the number of creations in
+        flight is below the concurrency limit, which adapts to the outcome of each creation.
 
         Args:
             create_runner_args: List of arg for invoking _create_runner method.
-            num: The number of runners to spawn.
+            concurrency: The limit on the number of runners created concurrently.
 
         Returns:
             A tuple of instance ID's of runners spawned.
         """
         instance_id_list = []
-        with Pool(processes=min(num, 10)) as pool:
-            jobs = pool.imap_unordered(
-                func=RunnerManager._create_runner, iterable=create_runner_args
-            )
-            for _ in range(num):
-                try:
-                    instance_id = next(jobs)
-                except RunnerCreateError:
-                    logger.exception("Failed to spawn a runner.")
-                except StopIteration:
-                    break
-                else:
+        remaining = list(enumerate(create_runner_args))
+        in_flight: dict[int, AsyncResult] = {}
+        completed: queue.SimpleQueue[int] = queue.SimpleQueue()
+
+        def _notify_completed(index: int) -> Callable[[object], None]:
+            """Get a pool callback notifying the completion of a creation.
+
+            Args:
+                index: The index of the creation.
+
+            Returns:
+                The callback for both results and errors.
+            """
+            return lambda _: completed.put(index)
+
+        with Pool(processes=min(len(remaining), concurrency.max_limit)) as pool:
+            while remaining or in_flight:
+                while remaining and len(in_flight) < concurrency.limit:
+                    index, args = remaining.pop()
+                    in_flight[index] = pool.apply_async(
+                        RunnerManager._create_runner_with_outcome,
+                        (args,),
+                        callback=_notify_completed(index),
+                        error_callback=_notify_completed(index),
+                    )
+                # Re-raises any unexpected error of the creation.
+                instance_id, outcome = in_flight.pop(completed.get()).get()
+                concurrency.record(outcome)
+                if instance_id is not None:
                     instance_id_list.append(instance_id)
+        logger.info("Runner creation concurrency: %s", concurrency.limit)
         return tuple(instance_id_list)
 
     def _delete_runners(
@@ -320,13 +557,35 @@ class RunnerManager:
         Returns:
             Stats on metrics events issued during the deletion of runners.
         """
-        runner_metrics_list = []
-        for runner in runners:
-            deleted_runner_metrics = self._cloud.delete_runner(
-                instance_id=runner.instance_id, remove_token=remove_token
-            )
-            if deleted_runner_metrics is not None:
-                runner_metrics_list.append(deleted_runner_metrics)
+        if not runners:
+            return self._issue_runner_metrics(metrics=iter([]))
+
+        def _delete(runner: RunnerInstance) -> RunnerMetrics | None:
+            """Delete a runner, a failure does not affect the deletion of the other runners.
+
+            Args:
+                runner: The runner to delete.
+
+            Returns:
+                The metrics of the runner deleted, if any.
+            """
+            try:
+                return self._cloud.delete_runner(
+                    instance_id=runner.instance_id, remove_token=remove_token
+                )
+            except (CloudError, SSHError, MetricsStorageError):
+                logger.exception("Failed to delete runner %s", runner.name)
+                return None
+
+        # The deletions are I/O bound: SSH commands on the runner and calls to the cloud API.
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(self._config.delete_concurrency, len(runners))),
+            thread_name_prefix="delete-runner",
+        ) as executor:
+            # The metrics are in the order of the runners regardless of completion order.
+            runner_metrics_list = [
+                metrics for metrics in executor.map(_delete, runners) if metrics is not None
+            ]
         return self._issue_runner_metrics(metrics=iter(runner_metrics_list))
 
     def _issue_runner_metrics(self, metrics: Iterator[RunnerMetrics]) -> IssuedMetricEventsStats:
@@ -339,39 +598,47 @@ class RunnerManager:
             Stats on runner metrics issued.
         """
         total_stats: IssuedMetricEventsStats = {}
+        try:
+            # The events are counted once written, so that the events of a failed write are not.
+            with metric_events.batched_events() as total_stats:
+                for extracted_metrics in metrics:
+                    self._issue_extracted_metrics(extracted_metrics)
+        except IssueMetricEventError:
+            logger.exception("Failed to write the last batch of metric events")
+        return total_stats
 
-        for extracted_metrics in metrics:
-            job_metrics = None
-
-            # We need a guard because pre-job metrics may not be available for idle runners
-            # that are deleted.
-            if extracted_metrics.pre_job:
-                try:
-                    job_metrics = github_metrics.job(
-                        github_client=self._github.github,
-                        pre_job_metrics=extracted_metrics.pre_job,
-                        runner_name=extracted_metrics.runner_name,
-                    )
-                except GithubMetricsError:
-                    logger.exception(
-                        "Failed to calculate job metrics for %s", extracted_metrics.runner_name
-                    )
-            else:
-                logger.debug(
-                    "No pre-job metrics found for %s, will not calculate job metrics.",
-                    extracted_metrics.runner_name,
-                )
+    def _issue_extracted_metrics(self, extracted_metrics: RunnerMetrics) -> None:
+        """Issue the metrics of a runner.
 
-            issued_events = runner_metrics.issue_events(
-                runner_metrics=extracted_metrics,
-                job_metrics=job_metrics,
-                flavor=self.manager_name,
+        Args:
+            extracted_metrics: The metrics of the runner.
+        """
+        job_metrics = None
+
+        # We need a guard because pre-job metrics may not be available for idle runners
+        # that are deleted.
+        if extracted_metrics.pre_job:
+            try:
+                job_metrics = github_metrics.job(
+                    github_client=self._github.github,
+                    pre_job_metrics=extracted_metrics.pre_job,
+                    runner_name=extracted_metrics.runner_name,
+                )
+            except GithubMetricsError:
+                logger.exception(
+                    "Failed to calculate job metrics for %s", extracted_metrics.runner_name
+                )
+        else:
+            logger.debug(
+                "No pre-job metrics found for %s, will not calculate job metrics.",
+                extracted_metrics.runner_name,
             )
 
-            for event_type in issued_events:
-                total_stats[event_type] = total_stats.get(event_type, 0) + 1
-
-        return total_stats
+        runner_metrics.issue_events(
+            runner_metrics=extracted_metrics,
+            job_metrics=job_metrics,
+            flavor=self.manager_name,
+        )
 
     @dataclass
     class _CreateRunnerArgs:
@@ -398,3 +665,27 @@ class RunnerManager:
             The instance ID of the runner created.
         """
         return args.cloud_runner_manager.create_runner(registration_token=args.registration_token)
+
+    @staticmethod
+    def _create_runner_with_outcome(
+        args: _CreateRunnerArgs,
+    ) -> tuple[InstanceId | None, CreateOutcome]:
+        """Create a single runner and report the outcome for the concurrency control.
+
+        This is a staticmethod for usage with multiprocess.Pool.
+
+        Args:
+            args: The arguments.
+
+        Returns:
+            The instance ID of the runner created, None if the creation failed, and the outcome.
+        """
+        start = time.monotonic()
+        try:
+            instance_id = RunnerManager._create_runner(args)
+        except RunnerCreateError as exc:
+            logger.exception("Failed to spawn a runner.")
+            return None, CreateOutcome(
+                duration=time.monotonic() - start, failed=True, throttled=is_throttled(exc)
+            )
+        return instance_id, CreateOutcome(duration=time.monotonic() - start)
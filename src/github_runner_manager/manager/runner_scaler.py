@@ -21,6 +21,7 @@ from github_runner_manager.manager.runner_manager import (
     IssuedMetricEventsStats,
     RunnerInstance,
     RunnerManager,
+    RunnerStateSnapshot,
 )
 from github_runner_manager.metrics import events as metric_events
 from github_runner_manager.reactive.types_ import RunnerConfig as ReactiveRunnerConfig
@@ -74,6 +75,7 @@ class _ReconcileMetricData:
         flavor: The name of the flavor in the reconciliation event.
         expected_runner_quantity: The expected number of runners.
             May be None if reactive mode is enabled.
+        create_concurrency: The number of runners created concurrently.
     """
 
     start_timestamp: float
@@ -82,6 +84,7 @@ class _ReconcileMetricData:
     runner_list: tuple[RunnerInstance]
     flavor: str
     expected_runner_quantity: int | None = None
+    create_concurrency: int | None = None
 
 
 class RunnerScaler:
@@ -169,8 +172,12 @@ class RunnerScaler:
 
         metric_stats = {}
         start_timestamp = time.time()
+        # The receiver of the pushed metrics outlives the reconciliation, it is kept running here.
+        self._manager.reconcile_metrics_receiver()
 
         expected_runner_quantity = quantity if self._reactive_config is None else None
+        # The state of the runners is fetched once and passed through the reconcile phases.
+        snapshot: RunnerStateSnapshot | None = None
 
         try:
             if self._reactive_config is not None:
@@ -185,14 +192,15 @@ class RunnerScaler:
                 reconcile_diff = reconcile_result.processes_diff
                 metric_stats = reconcile_result.metric_stats
             else:
-                reconcile_result = self._reconcile_non_reactive(quantity)
+                snapshot = self._manager.get_snapshot()
+                reconcile_result = self._reconcile_non_reactive(quantity, snapshot)
                 reconcile_diff = reconcile_result.runner_diff
                 metric_stats = reconcile_result.metric_stats
         except CloudError as exc:
             logger.error("Failed to reconcile runners.")
             raise ReconcileError("Failed to reconcile runners.") from exc
         finally:
-            runner_list = self._manager.get_runners()
+            runner_list = self._manager.get_runners(snapshot=snapshot)
             self._log_runners(runner_list)
             end_timestamp = time.time()
             reconcile_metric_data = _ReconcileMetricData(
@@ -202,6 +210,7 @@ class RunnerScaler:
                 runner_list=runner_list,
                 flavor=self._manager.manager_name,
                 expected_runner_quantity=expected_runner_quantity,
+                create_concurrency=self._manager.create_concurrency,
             )
             _issue_reconciliation_metric(reconcile_metric_data)
 
@@ -209,30 +218,33 @@ class RunnerScaler:
 
         return reconcile_diff
 
-    def _reconcile_non_reactive(self, expected_quantity: int) -> _ReconcileResult:
+    def _reconcile_non_reactive(
+        self, expected_quantity: int, snapshot: RunnerStateSnapshot
+    ) -> _ReconcileResult:
         """Reconcile the quantity of runners in non-reactive mode.
 
         Args:
             expected_quantity: The number of intended runners.
+            snapshot: The state snapshot of the runners, updated by the reconcile.
 
         Returns:
             The reconcile result.
         """
         delete_metric_stats = None
-        metric_stats = self._manager.cleanup()
-        runners = self._manager.get_runners()
+        metric_stats = self._manager.cleanup(snapshot=snapshot)
+        runners = self._manager.get_runners(snapshot=snapshot)
         logger.info("Reconcile runners from %s to %s", len(runners), expected_quantity)
         runner_diff = expected_quantity - len(runners)
         if runner_diff > 0:
             try:
-                self._manager.create_runners(runner_diff)
+                self._manager.create_runners(runner_diff, snapshot=snapshot)
             except MissingServerConfigError:
                 logging.exception(
                     "Unable to spawn runner due to missing server configuration, "
                     "such as, image."
                 )
         elif runner_diff < 0:
-            delete_metric_stats = self._manager.delete_runners(-runner_diff)
+            delete_metric_stats = self._manager.delete_runners(-runner_diff, snapshot=snapshot)
         else:
             logger.info("No changes to the number of runners.")
         # Merge the two metric stats.
@@ -326,6 +338,7 @@ def _issue_reconciliation_metric(
                 expected_runners=reconcile_metric_data.expected_runner_quantity,
                 duration=reconcile_metric_data.end_timestamp
                 - reconcile_metric_data.start_timestamp,
+                create_concurrency=reconcile_metric_data.create_concurrency,
             )
         )
     except IssueMetricEventError:
@@ -2,15 +2,24 @@
 #  See LICENSE file for licensing details.
 
 """Models and functions for the metric events."""
+import atexit
+import contextlib
+import json
 import logging
+import os
+import threading
+import time
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, ClassVar, Iterator, Optional
 
 from pydantic import BaseModel, NonNegativeFloat
 
 from github_runner_manager.errors import IssueMetricEventError
 
 METRICS_LOG_PATH = Path("/var/log/github-runner-metrics.log")
+# Thresholds to write the buffered events of a batch.
+BATCH_MAX_BYTES = 64 * 1024
+BATCH_MAX_DELAY_IN_SECONDS = 1.0
 
 
 logger = logging.getLogger(__name__)
@@ -22,11 +31,14 @@ class Event(BaseModel):
     Attributes:
          timestamp: The UNIX time stamp of the time at which the event was originally issued.
          event: The name of the event. Will be set to the class name in snake case if not provided.
+         event_name: The default name of the events of the class, computed once per class.
     """
 
     timestamp: NonNegativeFloat
     event: str
 
+    event_name: ClassVar[str] = "event"
+
     @staticmethod
     def _camel_to_snake(camel_case_string: str) -> str:
         """Convert a camel case string to snake case.
@@ -45,6 +57,15 @@ class Event(BaseModel):
                 snake_case_string += char
         return snake_case_string
 
+    def __init_subclass__(cls, **kwargs: Any):
+        """Compute the default event name of the subclass.
+
+        Args:
+            kwargs: The keyword arguments to pass to the base class.
+        """
+        super().__init_subclass__(**kwargs)
+        cls.event_name = cls._camel_to_snake(cls.__name__)
+
     def __init__(self, *args: Any, **kwargs: Any):
         """Initialize the event.
 
@@ -54,10 +75,41 @@ class Event(BaseModel):
                 specific fields. E.g. timestamp=12345 will set the timestamp field to 12345.
         """
         if "event" not in kwargs:
-            event = self._camel_to_snake(self.__class__.__name__)
-            kwargs["event"] = event
+            kwargs["event"] = self.event_name
         super().__init__(*args, **kwargs)
 
+    def to_json(self) -> str:
+        """Serialize the event, leaving out the fields set to None.
+
+        The output is the same as json(exclude_none=True), without building the intermediate
+        dictionary of pydantic. The values of the fields of the events are validated JSON types,
+        except for nested models which are serialized by _encode_nested.
+
+        Returns:
+            The event as JSON.
+        """
+        return json.dumps(
+            {name: value for name, value in self.__dict__.items() if value is not None},
+            default=_encode_nested,
+        )
+
+
+def _encode_nested(value: Any) -> Any:
+    """Encode a nested model of an event for JSON serialization.
+
+    Args:
+        value: The value not serializable by the json module.
+
+    Raises:
+        TypeError: If the value is not a model.
+
+    Returns:
+        The model as dictionary, without the fields set to None.
+    """
+    if isinstance(value, BaseModel):
+        return value.dict(exclude_none=True)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
 
 class RunnerInstalled(Event):
     """Metric event for when a runner is installed.
@@ -144,6 +196,8 @@ class Reconciliation(Event):
         expected_runners: The expected number of runners. This is optional as it is not suitable
             for reactive runners.
         duration: The duration of the reconciliation in seconds.
+        create_concurrency: The number of runners created concurrently chosen by the runner
+            manager.
     """
 
     flavor: str
@@ -152,12 +206,163 @@ class Reconciliation(Event):
     active_runners: int
     expected_runners: int | None
     duration: NonNegativeFloat
+    create_concurrency: int | None = None
+
+
+class _EventBatch:
+    """Buffer of serialized events written to the metrics log together.
+
+    The buffered lines are written with a single write on a file opened with O_APPEND, so that a
+    reader tailing the log never sees a partial line, even with other processes appending. The
+    lines are kept until they are written, and the events are only counted as issued then.
+    """
+
+    def __init__(self) -> None:
+        """Construct the object."""
+        self._lock = threading.Lock()
+        self._lines: list[tuple[str, type[Event], dict[type[Event], int]]] = []
+        self._size = 0
+        self._first_buffered_at = 0.0
+        self._retry_at = 0.0
+
+    def add(self, line: str, event_type: type[Event], issued: dict[type[Event], int]) -> None:
+        """Buffer a line, writing the batch if it is over the size or time threshold.
+
+        A failure to write the batch is logged and the write is retried after
+        BATCH_MAX_DELAY_IN_SECONDS, with the lines kept in the buffer.
+
+        Args:
+            line: The serialized event, terminated by a newline.
+            event_type: The type of the event.
+            issued: The number of events written by type, updated once the line is written.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not self._lines:
+                self._first_buffered_at = now
+            self._lines.append((line, event_type, issued))
+            self._size += len(line)
+            if now < self._retry_at or (
+                self._size < BATCH_MAX_BYTES
+                and now - self._first_buffered_at < BATCH_MAX_DELAY_IN_SECONDS
+            ):
+                return
+            try:
+                self._write_locked()
+            except IssueMetricEventError:
+                logger.exception("Failed to write a batch of metric events, will retry")
+                self._retry_at = now + BATCH_MAX_DELAY_IN_SECONDS
+
+    def flush(self) -> None:
+        """Write the buffered lines."""
+        with self._lock:
+            self._write_locked()
+
+    def _write_locked(self) -> None:
+        """Write the buffered lines and count their events, the lock must be held.
+
+        Raises:
+            IssueMetricEventError: If the batch cannot be written.
+        """
+        if not self._lines:
+            return
+        try:
+            _append("".join(line for line, _, _ in self._lines).encode("utf-8"))
+        except OSError as exc:
+            raise IssueMetricEventError(f"Cannot write to {METRICS_LOG_PATH}") from exc
+        for _, event_type, issued in self._lines:
+            issued[event_type] = issued.get(event_type, 0) + 1
+        self._lines = []
+        self._size = 0
+
+
+class _ThreadBatch(threading.local):  # pylint: disable=too-few-public-methods
+    """The batch of the batched_events contexts of the current thread.
+
+    Attributes:
+        batch: The batch of the outermost context, None outside of any context.
+        issued: The number of events written by type of each context, innermost last.
+    """
+
+    def __init__(self) -> None:
+        """Construct the object."""
+        self.batch: _EventBatch | None = None
+        self.issued: list[dict[type[Event], int]] = []
+
+
+_THREAD_BATCH = _ThreadBatch()
+# The batches of all threads, written at exit of the process.
+_ACTIVE_BATCHES: set[_EventBatch] = set()
+_ACTIVE_BATCHES_LOCK = threading.Lock()
+
+
+@contextlib.contextmanager
+def batched_events() -> Iterator[dict[type[Event], int]]:
+    """Buffer the events issued by the current thread within the context and write them in batches.
+
+    The events are written when the buffer exceeds BATCH_MAX_BYTES or holds events older than
+    BATCH_MAX_DELAY_IN_SECONDS, and on exit of the outermost context or of the process. Writing
+    the last events on exit of the context raises IssueMetricEventError on failure.
+
+    Yields:
+        The number of events of the context written to the metrics log by type, complete on exit
+        of the outermost context.
+    """
+    outermost = _THREAD_BATCH.batch is None
+    if _THREAD_BATCH.batch is None:
+        _THREAD_BATCH.batch = _EventBatch()
+        with _ACTIVE_BATCHES_LOCK:
+            _ACTIVE_BATCHES.add(_THREAD_BATCH.batch)
+    batch = _THREAD_BATCH.batch
+    issued: dict[type[Event], int] = {}
+    _THREAD_BATCH.issued.append(issued)
+    try:
+        yield issued
+    finally:
+        _THREAD_BATCH.issued.pop()
+        if outermost:
+            _THREAD_BATCH.batch = None
+            with _ACTIVE_BATCHES_LOCK:
+                _ACTIVE_BATCHES.discard(batch)
+            batch.flush()
+
+
+def _flush_at_exit() -> None:
+    """Write the events still buffered when the process exits."""
+    with _ACTIVE_BATCHES_LOCK:
+        batches = list(_ACTIVE_BATCHES)
+    for batch in batches:
+        try:
+            batch.flush()
+        except IssueMetricEventError:
+            logger.exception("Failed to write the buffered metric events on exit")
+
+
+atexit.register(_flush_at_exit)
+
+
+def _append(data: bytes) -> None:
+    """Append data to the metrics log with a single write.
+
+    Args:
+        data: The data to append.
+    """
+    fd = os.open(METRICS_LOG_PATH, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        written = os.write(fd, data)
+        # A regular file is written in full unless the disk is full.
+        while written < len(data):
+            written += os.write(fd, data[written:])
+    finally:
+        os.close(fd)
 
 
 def issue_event(event: Event) -> None:
     """Issue a metric event.
 
-    The metric event is logged to the metrics log.
+    The metric event is logged to the metrics log. Within batched_events, the event is buffered
+    and written with the other events of the batch, failures to write being reported on exit of
+    the context.
 
     Args:
         event: The metric event to log.
@@ -165,8 +370,11 @@ def issue_event(event: Event) -> None:
     Raises:
         IssueMetricEventError: If the event cannot be logged.
     """
+    line = f"{event.to_json()}\n"
+    if (batch := _THREAD_BATCH.batch) is not None:
+        batch.add(line, type(event), _THREAD_BATCH.issued[-1])
+        return
     try:
-        with METRICS_LOG_PATH.open(mode="a", encoding="utf-8") as metrics_file:
-            metrics_file.write(f"{event.json(exclude_none=True)}\n")
+        _append(line.encode("utf-8"))
     except OSError as exc:
         raise IssueMetricEventError(f"Cannot write to {METRICS_LOG_PATH}") from exc
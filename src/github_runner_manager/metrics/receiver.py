@@ -0,0 +1,238 @@
+#  Copyright 2024 Canonical Ltd.
+#  See LICENSE file for licensing details.
+
+"""HTTP receiver for the metrics pushed by the runners.
+
+The runners post their metrics files as soon as they are written, the receiver stores them in the
+metrics storage of the runner. The metrics are then available even if the runner instance is lost
+before its metrics could be pulled, and the pull at deletion skips the files already pushed.
+
+A runner authenticates with a token derived from a secret shared with the manager and from the
+runner name, so that a runner can only post the metrics of its own storage.
+
+The runners push their metrics once the receiver is configured in the support services. As the
+processes reconciling the runners are short-lived, the receiver runs in a long-lived process kept
+running by the reconciliation, see the receiver_process module.
+"""
+
+import hashlib
+import hmac
+import logging
+import re
+import tempfile
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from github_runner_manager.errors import GetMetricsStorageError
+from github_runner_manager.metrics import runner as runner_metrics
+from github_runner_manager.metrics.storage import StorageManagerProtocol
+from github_runner_manager.types_ import MetricsReceiverConfig
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8089
+PUSHED_FILE_NAMES = frozenset(
+    (
+        runner_metrics.RUNNER_INSTALLED_TS_FILE_NAME,
+        runner_metrics.PRE_JOB_METRICS_FILE_NAME,
+        runner_metrics.POST_JOB_METRICS_FILE_NAME,
+    )
+)
+# Time in seconds a request may wait on the client, so that slow or idle clients do not hold on
+# to the threads of the server.
+REQUEST_TIMEOUT_IN_SECONDS = 30
+_PATH_PATTERN = re.compile(r"^/runners/(?P<runner_name>[\w-]+)/metrics/(?P<file_name>[\w.-]+)$")
+
+
+def get_runner_token(secret: str, runner_name: str) -> str:
+    """Get the token a runner authenticates to the receiver with.
+
+    Args:
+        secret: The secret shared by the manager and the receiver.
+        runner_name: The name of the runner.
+
+    Returns:
+        The token of the runner.
+    """
+    return hmac.new(secret.encode(), runner_name.encode(), hashlib.sha256).hexdigest()
+
+
+def get_push_url(base_url: str, runner_name: str) -> str:
+    """Get the URL a runner posts its metrics files under.
+
+    Args:
+        base_url: The URL of the receiver.
+        runner_name: The name of the runner.
+
+    Returns:
+        The URL to post the metrics files under, followed by the file name.
+    """
+    return f"{base_url.rstrip('/')}/runners/{runner_name}/metrics"
+
+
+class _MetricsHTTPServer(ThreadingHTTPServer):
+    """HTTP server holding the state of the receiver for the request handlers.
+
+    Attributes:
+        daemon_threads: Whether the request threads do not block the exit of the process.
+        storage_manager: The metrics storage manager.
+        secret: The secret the runner tokens are derived from.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self, address: tuple[str, int], storage_manager: StorageManagerProtocol, secret: str
+    ):
+        """Construct the object.
+
+        Args:
+            address: The host and port to listen on.
+            storage_manager: The metrics storage manager.
+            secret: The secret the runner tokens are derived from.
+        """
+        super().__init__(address, _MetricsRequestHandler)
+        self.storage_manager = storage_manager
+        self.secret = secret
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Handler of the requests posting a metrics file.
+
+    Attributes:
+        server: The HTTP server of the receiver.
+        timeout: The timeout in seconds of the socket of the request.
+    """
+
+    server: _MetricsHTTPServer
+    timeout = REQUEST_TIMEOUT_IN_SECONDS
+
+    # The name of the method is set by BaseHTTPRequestHandler.
+    def do_POST(self) -> None:  # noqa: N802 pylint: disable=invalid-name
+        """Store the metrics file posted by a runner."""
+        match = _PATH_PATTERN.match(self.path)
+        if match is None or match["file_name"] not in PUSHED_FILE_NAMES:
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        runner_name = match["runner_name"]
+        token = self.headers.get("Authorization", "").removeprefix("Bearer ")
+        if not hmac.compare_digest(token, get_runner_token(self.server.secret, runner_name)):
+            self.send_error(HTTPStatus.FORBIDDEN)
+            return
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self.send_error(HTTPStatus.LENGTH_REQUIRED)
+            return
+        if not 0 <= length <= runner_metrics.FILE_SIZE_BYTES_LIMIT:
+            self.send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+            return
+        content = self.rfile.read(length)
+        try:
+            storage = self.server.storage_manager.get(runner_name)
+        except GetMetricsStorageError:
+            logger.warning("Metrics posted for runner %s without metrics storage", runner_name)
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return
+        try:
+            _write_atomic(storage.path / match["file_name"], content)
+        except OSError:
+            logger.exception("Failed to store metrics posted by runner %s", runner_name)
+            self.send_error(HTTPStatus.INTERNAL_SERVER_ERROR)
+            return
+        logger.debug("Received %s from runner %s", match["file_name"], runner_name)
+        self.send_response(HTTPStatus.NO_CONTENT)
+        self.end_headers()
+
+    # pylint: disable-next=redefined-builtin
+    def log_message(self, format: str, *args: object) -> None:
+        """Log the requests with the module logger instead of printing them.
+
+        Args:
+            format: The format string of the message.
+            args: The arguments of the message.
+        """
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def _write_atomic(path: Path, content: bytes) -> None:
+    """Write a file so that readers never see it partially written.
+
+    Args:
+        path: The path of the file.
+        content: The content of the file.
+    """
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as temp_file:
+        temp_file.write(content)
+    Path(temp_file.name).replace(path)
+
+
+class MetricsReceiver:
+    """Receiver of the metrics files pushed by the runners.
+
+    Attributes:
+        port: The port the receiver listens on.
+    """
+
+    def __init__(
+        self,
+        storage_manager: StorageManagerProtocol,
+        secret: str,
+        host: str = "0.0.0.0",  # nosec: B104 the runner instances post from the network
+        port: int = DEFAULT_PORT,
+    ):
+        """Construct the object.
+
+        Args:
+            storage_manager: The metrics storage manager.
+            secret: The secret the runner tokens are derived from.
+            host: The address to listen on.
+            port: The port to listen on, 0 to pick a free port.
+        """
+        self._server = _MetricsHTTPServer((host, port), storage_manager, secret)
+        self._thread: threading.Thread | None = None
+
+    @classmethod
+    def from_config(
+        cls, config: MetricsReceiverConfig, storage_manager: StorageManagerProtocol
+    ) -> "MetricsReceiver":
+        """Create the receiver the runners push to with the configuration.
+
+        The receiver listens on the port of the configured URL, the one the runners post to. The
+        URL is a plain HTTP one, as the receiver does not serve TLS.
+
+        Args:
+            config: The configuration of the metrics receiver.
+            storage_manager: The metrics storage manager of the runners.
+
+        Returns:
+            The receiver.
+        """
+        port = int(config.url.port) if config.url.port else 80
+        return cls(storage_manager=storage_manager, secret=config.secret, port=port)
+
+    @property
+    def port(self) -> int:
+        """The port the receiver listens on.
+
+        Returns:
+            The port.
+        """
+        return self._server.server_address[1]
+
+    def start(self) -> None:
+        """Serve the requests in a background thread."""
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics-receiver", daemon=True
+        )
+        self._thread.start()
+        logger.info("Metrics receiver listening on port %s", self.port)
+
+    def shutdown(self) -> None:
+        """Stop serving the requests."""
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
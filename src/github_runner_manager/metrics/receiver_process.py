@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+#  Copyright 2024 Canonical Ltd.
+#  See LICENSE file for licensing details.
+
+"""Module for running the receiver of the metrics pushed by the runners in its own process.
+
+The processes reconciling the runners are short-lived, the receiver is run by a long-lived
+process spawned at the reconciliation and kept running while the receiver is configured. The
+process is replaced when the configuration changes.
+"""
+import hashlib
+import logging
+import os
+import shutil
+import signal
+
+# All commands run by subprocess are secure.
+import subprocess  # nosec
+import sys
+import threading
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from github_runner_manager.metrics import storage as metrics_storage
+from github_runner_manager.metrics.receiver import MetricsReceiver
+from github_runner_manager.types_ import MetricsReceiverConfig, SystemUserConfig
+from github_runner_manager.utilities import secure_run_subprocess
+
+logger = logging.getLogger(__name__)
+
+METRICS_RECEIVER_LOG_DIR = Path("/var/log/metrics_receiver")
+
+PYTHON_BIN = "/usr/bin/python3"
+METRICS_RECEIVER_SCRIPT_MODULE = "github_runner_manager.metrics.receiver_process"
+METRICS_RECEIVER_CMD_LINE_PREFIX = f"{PYTHON_BIN} -m {METRICS_RECEIVER_SCRIPT_MODULE}"
+METRICS_RECEIVER_DIGEST_ARG = "--config-digest"
+_CONFIG_DIGEST_LENGTH = 16
+# Leave room for the digest of the configuration of the process after the prefix.
+PID_CMD_COLUMN_WIDTH = (
+    len(f"{METRICS_RECEIVER_CMD_LINE_PREFIX} {METRICS_RECEIVER_DIGEST_ARG} ")
+    + _CONFIG_DIGEST_LENGTH
+    + 1
+)
+PIDS_COMMAND_LINE = ["ps", "axo", f"cmd:{PID_CMD_COLUMN_WIDTH},pid", "--no-headers"]
+RECEIVER_CONFIG_ENV_VAR = "METRICS_RECEIVER_CONFIG"
+
+
+class MetricsReceiverError(Exception):
+    """Raised when the metrics receiver process cannot be reconciled."""
+
+
+class ReceiverProcessConfig(BaseModel):
+    """Configuration of the metrics receiver process.
+
+    Attributes:
+        receiver: The configuration of the metrics receiver.
+        system_user: The user the process runs as, owning the metrics storage.
+        storage_on_tmpfs: Whether the metrics storage of the runners is on a tmpfs.
+    """
+
+    receiver: MetricsReceiverConfig
+    system_user: SystemUserConfig
+    storage_on_tmpfs: bool = False
+
+
+def reconcile(
+    receiver_config: MetricsReceiverConfig | None,
+    system_user: SystemUserConfig,
+    storage_on_tmpfs: bool,
+) -> None:
+    """Keep a single metrics receiver process running with the configuration.
+
+    The processes running with another configuration are killed, and all of them are killed if
+    the receiver is not configured.
+
+    Args:
+        receiver_config: The configuration of the metrics receiver, None if not configured.
+        system_user: The user the process runs as, owning the metrics storage.
+        storage_on_tmpfs: Whether the metrics storage of the runners is on a tmpfs.
+    """
+    processes = _get_processes()
+    if receiver_config is None:
+        for pid, _ in processes:
+            _kill_process(pid)
+        return
+    config = ReceiverProcessConfig(
+        receiver=receiver_config, system_user=system_user, storage_on_tmpfs=storage_on_tmpfs
+    )
+    digest = _get_config_digest(config)
+    running = False
+    for pid, process_digest in processes:
+        if running or process_digest != digest:
+            _kill_process(pid)
+            continue
+        running = True
+    if not running:
+        _setup_log_dir(system_user)
+        _spawn_receiver(config, digest)
+
+
+def _get_config_digest(config: ReceiverProcessConfig) -> str:
+    """Get the digest identifying the configuration of a process.
+
+    Args:
+        config: The configuration of the process.
+
+    Returns:
+        The digest of the configuration.
+    """
+    return hashlib.sha256(config.json().encode()).hexdigest()[:_CONFIG_DIGEST_LENGTH]
+
+
+def _kill_process(pid: int) -> None:
+    """Kill a metrics receiver process.
+
+    Args:
+        pid: The PID of the process.
+    """
+    logger.info("Killing metrics receiver process with pid %s", pid)
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        logger.info("Metrics receiver process with pid %s already terminated", pid)
+
+
+def _get_processes() -> list[tuple[int, str | None]]:
+    """Get the PIDs of the metrics receiver processes with the digest of their configuration.
+
+    Returns:
+        The PIDs and configuration digests of the processes.
+
+    Raises:
+        MetricsReceiverError: If the command to get the PIDs fails.
+    """
+    result = secure_run_subprocess(cmd=PIDS_COMMAND_LINE)
+    if result.returncode != 0:
+        raise MetricsReceiverError("Failed to get list of processes")
+
+    processes = []
+    for line in result.stdout.decode().split("\n"):
+        if not line.startswith(METRICS_RECEIVER_CMD_LINE_PREFIX):
+            continue
+        *args, pid = line[len(METRICS_RECEIVER_CMD_LINE_PREFIX) :].split()
+        digest = args[1] if args[:1] == [METRICS_RECEIVER_DIGEST_ARG] and len(args) > 1 else None
+        processes.append((int(pid), digest))
+    return processes
+
+
+def _setup_log_dir(system_user: SystemUserConfig) -> None:
+    """Set up the log dir.
+
+    Args:
+        system_user: The user owning the log dir.
+    """
+    METRICS_RECEIVER_LOG_DIR.mkdir(exist_ok=True)
+    shutil.chown(METRICS_RECEIVER_LOG_DIR, user=system_user.user, group=system_user.group)
+
+
+def _spawn_receiver(config: ReceiverProcessConfig, digest: str) -> None:
+    """Spawn a metrics receiver process.
+
+    Args:
+        config: The configuration to pass to the spawned process.
+        digest: The digest of the configuration.
+    """
+    env = {
+        "PYTHONPATH": os.environ["PYTHONPATH"],
+        RECEIVER_CONFIG_ENV_VAR: config.json(),
+    }
+    # The digest on the command line only identifies the configuration of the process.
+    command = [
+        PYTHON_BIN,
+        "-m",
+        METRICS_RECEIVER_SCRIPT_MODULE,
+        METRICS_RECEIVER_DIGEST_ARG,
+        digest,
+    ]
+    logger.debug("Spawning the metrics receiver process with command: %s", command)
+    # The process writes its logs to the file inherited, it is not waited for.
+    with open(METRICS_RECEIVER_LOG_DIR / "receiver.log", "ab") as log_file:
+        process = subprocess.Popen(  # pylint: disable=consider-using-with  # nosec
+            command,
+            env=env,
+            stdin=subprocess.DEVNULL,
+            stdout=log_file,
+            stderr=subprocess.STDOUT,
+            user=config.system_user.user,
+            group=config.system_user.group,
+            start_new_session=True,
+        )
+    logger.info("Spawned the metrics receiver process with pid %s", process.pid)
+
+
+def main() -> None:
+    """Run the metrics receiver until the process is terminated.
+
+    Raises:
+        ValueError: If the configuration environment variable is not set.
+    """
+    config_str = os.environ.get(RECEIVER_CONFIG_ENV_VAR)
+    if not config_str:
+        raise ValueError(f"Missing {RECEIVER_CONFIG_ENV_VAR} environment variable.")
+    config = ReceiverProcessConfig.parse_raw(config_str)
+
+    logging.basicConfig(
+        stream=sys.stdout,
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    storage_manager_class = (
+        metrics_storage.TmpfsStorageManager
+        if config.storage_on_tmpfs
+        else metrics_storage.StorageManager
+    )
+    receiver = MetricsReceiver.from_config(
+        config.receiver, storage_manager_class(system_user_config=config.system_user)
+    )
+    terminated = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: terminated.set())
+    receiver.start()
+    try:
+        terminated.wait()
+    finally:
+        receiver.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,8 +3,10 @@
 
 """Classes and function to extract the metrics from storage and issue runner metrics events."""
 
+import concurrent.futures
 import json
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from enum import Enum
 from json import JSONDecodeError
 from pathlib import Path
@@ -30,6 +32,9 @@ PRE_JOB_METRICS_FILE_NAME = "pre-job-metrics.json"
 POST_JOB_METRICS_FILE_NAME = "post-job-metrics.json"
 RUNNER_INSTALLATION_START_TS_FILE_NAME = "runner-installation-start.timestamp"
 RUNNER_INSTALLED_TS_FILE_NAME = "runner-installed.timestamp"
+# Number of storages submitted for extraction per worker thread, bounding the work done ahead of
+# the consumer of the extracted metrics.
+_EXTRACT_IN_FLIGHT_PER_WORKER = 2
 
 
 class PreJobMetrics(BaseModel):
@@ -108,7 +113,10 @@ class RunnerMetrics(BaseModel):
 
 
 def extract(
-    metrics_storage_manager: MetricsStorageManager, runners: set[str], include: bool = False
+    metrics_storage_manager: MetricsStorageManager,
+    runners: set[str],
+    include: bool = False,
+    concurrency: int = 1,
 ) -> Iterator[RunnerMetrics]:
     """Extract metrics from runners.
 
@@ -121,26 +129,84 @@ def extract(
 
     In order to avoid DoS attacks, the file size is also checked.
 
+    With a concurrency over one, the storages are extracted in a thread pool and the metrics are
+    yielded in the order the extractions complete, while the following storages are extracted.
+
     Args:
         metrics_storage_manager: The metrics storage manager.
         runners: The runners to include or exclude.
         include: If true the provided runners are included for metric extraction, else the provided
             runners are excluded.
+        concurrency: The number of storages to extract concurrently.
 
     Yields:
         Extracted runner metrics of a particular runner.
     """
-    for ms in metrics_storage_manager.list_all():
-        if (include and ms.runner_name in runners) or (
-            not include and ms.runner_name not in runners
-        ):
-            runner_metrics = _extract_storage(
-                metrics_storage_manager=metrics_storage_manager, metrics_storage=ms
+    metrics_storages = (
+        ms
+        for ms in metrics_storage_manager.list_all()
+        if (include and ms.runner_name in runners)
+        or (not include and ms.runner_name not in runners)
+    )
+    if concurrency > 1:
+        extracted = _extract_storages_concurrently(
+            metrics_storage_manager=metrics_storage_manager,
+            metrics_storages=metrics_storages,
+            concurrency=concurrency,
+        )
+    else:
+        extracted = (
+            (
+                ms,
+                _extract_storage(
+                    metrics_storage_manager=metrics_storage_manager, metrics_storage=ms
+                ),
+            )
+            for ms in metrics_storages
+        )
+    for ms, runner_metrics in extracted:
+        if not runner_metrics:
+            logger.warning("Not able to issue metrics for runner %s", ms.runner_name)
+        else:
+            yield runner_metrics
+
+
+def _extract_storages_concurrently(
+    metrics_storage_manager: MetricsStorageManager,
+    metrics_storages: Iterator[MetricsStorage],
+    concurrency: int,
+) -> Iterator[tuple[MetricsStorage, Optional[RunnerMetrics]]]:
+    """Extract metrics from metrics storages in a thread pool.
+
+    At most _EXTRACT_IN_FLIGHT_PER_WORKER storages per worker are submitted ahead of the
+    consumer, so that no further storage is extracted once the consumer stops iterating.
+
+    Args:
+        metrics_storage_manager: The metrics storage manager.
+        metrics_storages: The metrics storages to extract.
+        concurrency: The number of worker threads.
+
+    Yields:
+        The metrics storages with their extracted metrics, in order of completion.
+    """
+    max_in_flight = concurrency * _EXTRACT_IN_FLIGHT_PER_WORKER
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight: dict[Future[Optional[RunnerMetrics]], MetricsStorage] = {}
+        for ms in metrics_storages:
+            if len(in_flight) >= max_in_flight:
+                done, _ = concurrent.futures.wait(
+                    in_flight, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+                for future in done:
+                    yield in_flight.pop(future), future.result()
+            future = executor.submit(
+                _extract_storage,
+                metrics_storage_manager=metrics_storage_manager,
+                metrics_storage=ms,
             )
-            if not runner_metrics:
-                logger.warning("Not able to issue metrics for runner %s", ms.runner_name)
-            else:
-                yield runner_metrics
+            in_flight[future] = ms
+        for future in concurrent.futures.as_completed(in_flight):
+            yield in_flight[future], future.result()
 
 
 def issue_events(
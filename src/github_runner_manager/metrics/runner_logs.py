@@ -3,17 +3,30 @@
 
 """Functions to pull and remove the logs of the crashed runners."""
 
+import contextlib
+import fcntl
+import gzip
+import json
 import logging
+import os
 import shutil
 import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
+from typing import Iterable, Iterator
 
 RUNNER_LOGS_DIR_PATH = Path("/var/log/github-runner-logs")
 
 SYSLOG_PATH = Path("/var/log/syslog")
 
 OUTDATED_LOGS_IN_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_LOGS_BYTES = 1024 * 1024 * 1024
+_INDEX_FILE_NAME = ".index.json"
+# The file system timestamps have a coarse granularity: a logs directory changed within this
+# time before the index is synced may change again without a new modification time.
+_MTIME_GRANULARITY_NS = 1_000_000_000
 
 logger = logging.getLogger(__name__)
 
@@ -27,14 +40,11 @@ def create_logs_dir(runner_name: str) -> Path:
     Returns:
         The path to the directory where the logs of the crashed runners will be stored.
     """
-    target_log_path = RUNNER_LOGS_DIR_PATH / runner_name
-    target_log_path.mkdir(parents=True, exist_ok=True)
-
-    return target_log_path
+    return RunnerLogsRetention(logs_dir=RUNNER_LOGS_DIR_PATH).create_logs_dir(runner_name)
 
 
 def remove_outdated() -> None:
-    """Remove the logs that are too old."""
+    """Remove the logs that are too old, and the oldest logs over the size limit."""
     maxage_absolute = time.time() - OUTDATED_LOGS_IN_SECONDS
     dt_object = datetime.fromtimestamp(maxage_absolute)
     logger.info(
@@ -42,13 +52,308 @@ def remove_outdated() -> None:
         "All logs older than %s will be removed.",
         dt_object.strftime("%Y-%m-%d %H:%M:%S"),
     )
+    RunnerLogsRetention(logs_dir=RUNNER_LOGS_DIR_PATH, max_age=OUTDATED_LOGS_IN_SECONDS).evict()
+
+
+@dataclass
+class _LogsEntry:
+    """Entry of the index of the logs of a runner.
+
+    Attributes:
+        created_at: The UNIX time stamp of the creation of the logs.
+        size: The total size in bytes of the log files.
+    """
+
+    created_at: float
+    size: int
+
+
+@dataclass
+class _LogsIndex:
+    """Index of the logs of the crashed runners.
+
+    Attributes:
+        entries: The entries of the logs by runner name, in creation order.
+        logs_mtime: The modification time of the logs directory the index is in sync with, None
+            if the index needs to be synced.
+        total_size: The total size of the indexed logs.
+    """
+
+    entries: OrderedDict[str, _LogsEntry]
+    logs_mtime: int | None
+
+    @property
+    def total_size(self) -> int:
+        """The total size of the indexed logs.
+
+        Returns:
+            The size in bytes.
+        """
+        return sum(entry.size for entry in self.entries.values())
+
+    @classmethod
+    def from_json(cls, content: str) -> "_LogsIndex":
+        """Read the index from the content of the index file.
+
+        Args:
+            content: The content of the index file.
+
+        Returns:
+            The index, empty and to be synced if the content is not a valid index.
+        """
+        try:
+            data = json.loads(content)
+            entries = OrderedDict(
+                (name, _LogsEntry(created_at=created_at, size=size))
+                for name, created_at, size in data["entries"]
+            )
+            logs_mtime = data["logs_mtime"]
+        except (ValueError, KeyError, TypeError):
+            return cls(entries=OrderedDict(), logs_mtime=None)
+        return cls(entries=entries, logs_mtime=logs_mtime)
+
+    def to_json(self) -> str:
+        """Get the content of the index file.
+
+        Returns:
+            The index as JSON.
+        """
+        return json.dumps(
+            {
+                "logs_mtime": self.logs_mtime,
+                "entries": [
+                    [name, entry.created_at, entry.size] for name, entry in self.entries.items()
+                ],
+            }
+        )
+
+
+class RunnerLogsRetention:
+    """Retention of the logs of the crashed runners by age and total size.
+
+    The logs directories are indexed in creation order with their size, in an index file in the
+    logs directory shared by the processes. The logs directory is only listed again when it was
+    changed other than through the retention, and only the logs missing from the index are
+    measured then, so that an eviction only visits the evicted logs.
+
+    Attributes:
+        total_size: The total size of the indexed logs.
+    """
+
+    def __init__(
+        self,
+        logs_dir: Path = RUNNER_LOGS_DIR_PATH,
+        max_age: float = OUTDATED_LOGS_IN_SECONDS,
+        max_bytes: int = DEFAULT_MAX_LOGS_BYTES,
+        compress: bool = False,
+    ):
+        """Construct the object.
+
+        Args:
+            logs_dir: The directory of the logs of the crashed runners.
+            max_age: The age in seconds after which logs are evicted.
+            max_bytes: The total size of the logs over which the oldest logs are evicted.
+            compress: Whether to gzip the log files written with write_log.
+        """
+        self._logs_dir = logs_dir
+        self._max_age = max_age
+        self._max_bytes = max_bytes
+        self._compress = compress
+
+    @property
+    def total_size(self) -> int:
+        """The total size of the indexed logs.
+
+        Returns:
+            The size in bytes.
+        """
+        with self._open_index() as index:
+            return index.total_size
 
-    for log_path in RUNNER_LOGS_DIR_PATH.glob("*"):
-        if log_path.is_dir() and (log_path.stat().st_mtime < maxage_absolute):
-            logger.info("Removing the outdated logs of the runner %s.", log_path.name)
+    def create_logs_dir(self, runner_name: str) -> Path:
+        """Create the directory to store the logs of a crashed runner.
+
+        Args:
+            runner_name: The name of the runner.
+
+        Returns:
+            The path to the directory where the logs of the crashed runner will be stored.
+        """
+        target_log_path = self._logs_dir / runner_name
+        with self._open_index() as index:
+            before = self._logs_dir.stat()
             try:
-                shutil.rmtree(log_path)
-            except OSError:
-                logger.exception(
-                    "Unable to remove the outdated logs of the runner %s.", log_path.name
+                target_log_path.mkdir()
+                created = True
+            except FileExistsError:
+                created = False
+            self._track_change(index, before, 1 if created else 0)
+            if runner_name not in index.entries:
+                index.entries[runner_name] = _LogsEntry(
+                    created_at=time.time(), size=0 if created else _get_dir_size(target_log_path)
                 )
+        return target_log_path
+
+    def write_log(self, runner_name: str, file_name: str, chunks: Iterable[bytes]) -> Path:
+        """Write a log file of a crashed runner as its content is received.
+
+        With compression, the content is gzipped while written and the file name gets the .gz
+        suffix.
+
+        Args:
+            runner_name: The name of the runner.
+            file_name: The name of the log file.
+            chunks: The content of the log file.
+
+        Returns:
+            The path of the written log file.
+        """
+        log_path = self.create_logs_dir(runner_name) / file_name
+        if self._compress:
+            log_path = log_path.with_name(f"{file_name}.gz")
+            with gzip.open(log_path, "wb") as log_file:
+                for chunk in chunks:
+                    log_file.write(chunk)
+        else:
+            with log_path.open("wb") as log_file:
+                for chunk in chunks:
+                    log_file.write(chunk)
+        size = log_path.stat().st_size
+        with self._open_index() as index:
+            if (entry := index.entries.get(runner_name)) is not None:
+                entry.size += size
+        return log_path
+
+    def update_size(self, runner_name: str) -> None:
+        """Update the size of the logs of a runner written without write_log.
+
+        Args:
+            runner_name: The name of the runner.
+        """
+        size = _get_dir_size(self._logs_dir / runner_name)
+        with self._open_index() as index:
+            if (entry := index.entries.get(runner_name)) is not None:
+                entry.size = size
+
+    def evict(self) -> list[str]:
+        """Remove the logs over the age limit, then the oldest logs over the size limit.
+
+        Returns:
+            The names of the runners whose logs were removed.
+        """
+        min_created_at = time.time() - self._max_age
+        evicted = []
+        with self._open_index() as index:
+            total_size = index.total_size
+            while index.entries:
+                runner_name, entry = next(iter(index.entries.items()))
+                if entry.created_at >= min_created_at and total_size <= self._max_bytes:
+                    break
+                del index.entries[runner_name]
+                total_size -= entry.size
+                evicted.append(runner_name)
+            before = self._logs_dir.stat()
+            removed = 0
+            for runner_name in evicted:
+                logger.info("Removing the logs of the runner %s.", runner_name)
+                try:
+                    shutil.rmtree(self._logs_dir / runner_name)
+                    removed += 1
+                except FileNotFoundError:
+                    pass
+                except OSError:
+                    logger.exception("Unable to remove the logs of the runner %s.", runner_name)
+            self._track_change(index, before, -removed)
+        return evicted
+
+    @contextlib.contextmanager
+    def _open_index(self) -> Iterator[_LogsIndex]:
+        """Hold the index while it is read, updated and written back.
+
+        The index file is locked against the other processes for the duration. The index is
+        synced with the logs directory first if the directory changed since the index was written.
+
+        Yields:
+            The index.
+        """
+        self._logs_dir.mkdir(parents=True, exist_ok=True)
+        with open(self._logs_dir / _INDEX_FILE_NAME, "a+", encoding="utf-8") as index_file:
+            fcntl.flock(index_file, fcntl.LOCK_EX)
+            index_file.seek(0)
+            index = _LogsIndex.from_json(index_file.read())
+            logs_mtime = self._logs_dir.stat().st_mtime_ns
+            if index.logs_mtime != logs_mtime:
+                self._sync_index(index)
+                # A change within the granularity of the file system timestamps may not change
+                # the modification time again, hence sync again on next use.
+                recent = time.time_ns() - logs_mtime < _MTIME_GRANULARITY_NS
+                index.logs_mtime = None if recent else logs_mtime
+            yield index
+            # The index file is rewritten in place, which leaves the logs directory unchanged.
+            index_file.seek(0)
+            index_file.truncate()
+            index_file.write(index.to_json())
+
+    def _sync_index(self, index: _LogsIndex) -> None:
+        """Sync the index with the logs directories on disk.
+
+        The logs missing from the index are dated by the modification time of their directory.
+
+        Args:
+            index: The index to sync.
+        """
+        logger.debug("Syncing the index of the logs of the crashed runners")
+        found: dict[str, _LogsEntry] = {}
+        with os.scandir(self._logs_dir) as dir_entries:
+            for dir_entry in dir_entries:
+                if not dir_entry.is_dir():
+                    continue
+                if (entry := index.entries.get(dir_entry.name)) is None:
+                    entry = _LogsEntry(
+                        created_at=dir_entry.stat().st_mtime,
+                        size=_get_dir_size(Path(dir_entry.path)),
+                    )
+                found[dir_entry.name] = entry
+        index.entries = OrderedDict(
+            sorted(found.items(), key=lambda name_entry: name_entry[1].created_at)
+        )
+
+    def _track_change(self, index: _LogsIndex, before: os.stat_result, nlink_change: int) -> None:
+        """Keep the index in sync after logs directories were created or removed.
+
+        The index stays in sync only if it was in sync before and nothing else changed the logs
+        directory meanwhile, as told by its link count changing only by the directories created
+        or removed.
+
+        Args:
+            index: The index updated with the change.
+            before: The status of the logs directory before the change.
+            nlink_change: The change of the number of logs directories.
+        """
+        after = self._logs_dir.stat()
+        if (
+            index.logs_mtime == before.st_mtime_ns
+            and after.st_nlink - before.st_nlink == nlink_change
+        ):
+            index.logs_mtime = after.st_mtime_ns
+        else:
+            index.logs_mtime = None
+
+
+def _get_dir_size(path: Path) -> int:
+    """Get the total size of the files in a directory tree.
+
+    Args:
+        path: The path of the directory.
+
+    Returns:
+        The size in bytes, 0 if the directory does not exist.
+    """
+    size = 0
+    for root, _, file_names in os.walk(path):
+        for file_name in file_names:
+            try:
+                size += os.lstat(os.path.join(root, file_name)).st_size
+            except FileNotFoundError:
+                continue
+    return size
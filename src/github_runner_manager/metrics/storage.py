@@ -5,9 +5,17 @@
 
 It contains a protocol and reference implementation.
 """
+import concurrent.futures
 import logging
+import os
+import pwd
 import shutil
+import stat
 import tarfile
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Callable, Iterator, Protocol
@@ -22,6 +30,13 @@ from github_runner_manager.types_ import SystemUserConfig
 
 _FILESYSTEM_BASE_DIR_NAME = "runner-fs"
 _FILESYSTEM_QUARANTINE_DIR_NAME = "runner-fs-quarantine"
+_FILESYSTEM_QUARANTINE_STAGING_DIR_NAME = "runner-fs-quarantine-staging"
+DEFAULT_QUARANTINE_MAX_BYTES = 100 * 1024 * 1024
+DEFAULT_QUARANTINE_MAX_AGE_IN_SECONDS = 30 * 24 * 60 * 60
+TMPFS_DIR = Path("/dev/shm")  # nosec: B108 the directory of the user is checked before use
+# The file system timestamps have a coarse granularity: a base directory changed within this
+# time before the catalog is built may change again without a new modification time.
+_MTIME_GRANULARITY_NS = 1_000_000_000
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +54,23 @@ class MetricsStorage:
     runner_name: str
 
 
+@dataclass
+class _CatalogEntry:
+    """Entry of the catalog of the metrics storages.
+
+    Attributes:
+        path: The path to the directory of the storage.
+        created_at: The UNIX time stamp of the creation of the storage. For the storages found on
+            disk, the time stamp of the last status change of the directory.
+        last_modified: The UNIX time stamp of the last modification of the directory, as of the
+            last time it was read.
+    """
+
+    path: Path
+    created_at: float
+    last_modified: float
+
+
 class StorageManagerProtocol(Protocol):  # pylint: disable=too-few-public-methods
     """A protocol defining the methods for managing the metrics storage.
 
@@ -46,35 +78,68 @@ class StorageManagerProtocol(Protocol):  # pylint: disable=too-few-public-method
         create: Method to create a new storage. Returns the created storage.
           Raises an exception CreateMetricsStorageError if the storage already exists.
         list_all: Method to list all storages.
+        list_outdated: Method to list the storages not modified for a number of seconds.
         get: Method to get a storage by name.
         delete: Method to delete a storage by name.
-        move_to_quarantine: Method to archive and delete a storage by name.
+        move_to_quarantine: Method to archive and delete a storage by name. The archive may be
+          written in the background.
     """
 
     create: Callable[[str], MetricsStorage]
     list_all: Callable[[], Iterator[MetricsStorage]]
+    list_outdated: Callable[[float], Iterator[MetricsStorage]]
     get: Callable[[str], MetricsStorage]
     delete: Callable[[str], None]
     move_to_quarantine: Callable[[str], None]
 
 
-class StorageManager(StorageManagerProtocol):
-    """Manager for the metrics storage."""
+class StorageManager(StorageManagerProtocol):  # pylint: disable=too-many-instance-attributes
+    """Manager for the metrics storage.
 
-    def __init__(self, system_user_config: SystemUserConfig):
+    The storages are listed from a catalog kept in memory, which is updated by the operations of
+    the manager and rebuilt from disk when the base directory was changed otherwise, e.g. by
+    another process. Listing the storages then takes a single stat of the base directory.
+
+    A quarantined storage is moved to a staging directory next to the base directory and archived
+    by a background thread. The oldest archives are evicted once over the age or size limit of
+    the quarantine.
+    """
+
+    def __init__(
+        self,
+        system_user_config: SystemUserConfig,
+        base_dir: Path | None = None,
+        quarantine_max_bytes: int = DEFAULT_QUARANTINE_MAX_BYTES,
+        quarantine_max_age: float = DEFAULT_QUARANTINE_MAX_AGE_IN_SECONDS,
+    ):
         """Initialize the storage manager.
 
         Args:
             system_user_config: The configuration of the user owning the storage.
+            base_dir: The directory holding the storages, defaults to a directory in the home of
+                the user.
+            quarantine_max_bytes: The maximum total size of the quarantine archives.
+            quarantine_max_age: The maximum age in seconds of the quarantine archives.
         """
         self._system_user_config = system_user_config
-        self._base_dir = (
-            Path(f"~{self._system_user_config.user}").expanduser() / _FILESYSTEM_BASE_DIR_NAME
-        )
-        self._quarantine_dir = (
-            Path(f"~{self._system_user_config.user}").expanduser()
-            / _FILESYSTEM_QUARANTINE_DIR_NAME
+        home_dir = Path(f"~{self._system_user_config.user}").expanduser()
+        self._base_dir = base_dir if base_dir is not None else home_dir / _FILESYSTEM_BASE_DIR_NAME
+        self._quarantine_dir = home_dir / _FILESYSTEM_QUARANTINE_DIR_NAME
+        # Staged on the file system of the base directory for the move to be a rename.
+        self._quarantine_staging_dir = (
+            self._base_dir.parent / _FILESYSTEM_QUARANTINE_STAGING_DIR_NAME
         )
+        self._quarantine_max_bytes = quarantine_max_bytes
+        self._quarantine_max_age = quarantine_max_age
+        self._quarantine_lock = threading.Lock()
+        self._quarantine_executor: ThreadPoolExecutor | None = None
+        self._quarantine_jobs: set[Future[None]] = set()
+        self._dirs_prepared = False
+        self._catalog_lock = threading.Lock()
+        self._catalog: dict[str, _CatalogEntry] = {}
+        # The modification time of the base directory the catalog is in sync with, None if the
+        # catalog needs to be rebuilt.
+        self._catalog_base_mtime: int | None = None
 
     def create(self, runner_name: str) -> MetricsStorage:
         """Create metrics storage for the runner.
@@ -91,41 +156,12 @@ class StorageManager(StorageManagerProtocol):
         Raises:
             CreateMetricsStorageError: If the creation of the shared filesystem fails.
         """
-        try:
-            self._base_dir.mkdir(exist_ok=True)
-            # this could be executed as root (e.g. during a charm hook), therefore set permissions
-            shutil.chown(
-                self._base_dir,
-                user=self._system_user_config.user,
-                group=self._system_user_config.group,
-            )
-            logger.debug(
-                "Changed ownership of %s to %s:%s",
-                _FILESYSTEM_BASE_DIR_NAME,
-                self._system_user_config.user,
-                self._system_user_config.group,
-            )
-
-            self._quarantine_dir.mkdir(exist_ok=True)
-            shutil.chown(
-                self._quarantine_dir,
-                user=self._system_user_config.user,
-                group=self._system_user_config.group,
-            )
-            logger.debug(
-                "Changed ownership of %s to %s:%s",
-                self._quarantine_dir,
-                self._system_user_config.user,
-                self._system_user_config.group,
-            )
-
-        except OSError as exc:
-            raise CreateMetricsStorageError(
-                "Failed to create metrics storage directories"
-            ) from exc
+        base_stat = self._get_base_stat()
+        if base_stat is None or not self._dirs_prepared:
+            self._prepare_dirs()
+            base_stat = self._get_base_stat()
 
         runner_fs_path = self._get_runner_fs_path(runner_name=runner_name)
-
         try:
             runner_fs_path.mkdir()
         except FileExistsError as exc:
@@ -133,6 +169,12 @@ class StorageManager(StorageManagerProtocol):
                 f"Metrics storage for runner {runner_name} already exists."
             ) from exc
 
+        now = time.time()
+        self._update_catalog(
+            runner_name,
+            _CatalogEntry(path=runner_fs_path, created_at=now, last_modified=now),
+            base_stat,
+        )
         return MetricsStorage(runner_fs_path, runner_name)
 
     def list_all(self) -> Iterator[MetricsStorage]:
@@ -141,17 +183,32 @@ class StorageManager(StorageManagerProtocol):
         Yields:
             A metrics storage object.
         """
-        if not self._base_dir.exists():
-            return
+        for runner_name, entry in self._sync_catalog().items():
+            yield MetricsStorage(entry.path, runner_name)
+
+    def list_outdated(self, max_age: float) -> Iterator[MetricsStorage]:
+        """List the metric storages not modified for a number of seconds.
+
+        Only the storages outdated according to the catalog are checked on disk, as their
+        directory may have been modified since.
+
+        Args:
+            max_age: The number of seconds since the last modification.
 
-        directories = (entry for entry in self._base_dir.iterdir() if entry.is_dir())
-        for directory in directories:
+        Yields:
+            A metrics storage object.
+        """
+        threshold = time.time() - max_age
+        for runner_name, entry in self._sync_catalog().items():
+            if entry.last_modified >= threshold:
+                continue
             try:
-                fs = self.get(runner_name=directory.name)
-            except GetMetricsStorageError:
-                logger.error("Failed to get metrics storage for runner %s", directory.name)
-            else:
-                yield fs
+                entry.last_modified = entry.path.stat().st_mtime
+            except FileNotFoundError:
+                logger.debug("Metrics storage for runner %s no longer exists", runner_name)
+                continue
+            if entry.last_modified < threshold:
+                yield MetricsStorage(entry.path, runner_name)
 
     def get(self, runner_name: str) -> MetricsStorage:
         """Get the metrics storage for the runner.
@@ -184,18 +241,23 @@ class StorageManager(StorageManagerProtocol):
         """
         runner_fs_path = self._get_runner_fs_path(runner_name=runner_name)
 
+        base_stat = self._get_base_stat()
         try:
             shutil.rmtree(runner_fs_path)
         except OSError as exc:
             raise DeleteMetricsStorageError(
                 f"Failed to remove metrics storage for runner {runner_name}"
             ) from exc
+        self._update_catalog(runner_name, None, base_stat)
 
     def move_to_quarantine(
         self,
         runner_name: str,
     ) -> None:
-        """Archive the metrics storage for the runner and delete it.
+        """Move the metrics storage for the runner to the quarantine.
+
+        The storage is renamed into the staging directory of the quarantine, then archived and
+        deleted in the background.
 
         Args:
             runner_name: The name of the runner.
@@ -210,21 +272,232 @@ class StorageManager(StorageManagerProtocol):
                 f"Failed to get metrics storage for runner {runner_name}"
             ) from exc
 
-        tarfile_path = self._quarantine_dir.joinpath(runner_name).with_suffix(".tar.gz")
+        if not self._dirs_prepared:
+            try:
+                self._prepare_dirs()
+            except CreateMetricsStorageError as exc:
+                raise QuarantineMetricsStorageError(
+                    "Failed to create the quarantine directories"
+                ) from exc
+
+        staged_path = self._quarantine_staging_dir / runner_name
+        base_stat = self._get_base_stat()
         try:
-            with tarfile.open(tarfile_path, "w:gz") as tar:
-                tar.add(runner_fs.path, arcname=runner_fs.path.name)
+            runner_fs.path.rename(staged_path)
         except OSError as exc:
             raise QuarantineMetricsStorageError(
-                f"Failed to archive metrics storage for runner {runner_name}"
+                f"Failed to move metrics storage for runner {runner_name} to quarantine"
             ) from exc
+        self._update_catalog(runner_name, None, base_stat)
+        self._submit_archive(staged_path)
+
+    def wait_quarantine(self, timeout: float | None = None) -> None:
+        """Wait for the quarantined storages to be archived.
+
+        Args:
+            timeout: The maximum time in seconds to wait, None to wait until done.
+        """
+        with self._quarantine_lock:
+            jobs = list(self._quarantine_jobs)
+        concurrent.futures.wait(jobs, timeout=timeout)
+
+    def _submit_archive(self, staged_path: Path) -> None:
+        """Archive a staged storage in the background.
+
+        The storages left in the staging directory by a previous process are archived as well.
 
+        Args:
+            staged_path: The path of the staged storage.
+        """
+        with self._quarantine_lock:
+            to_archive = [staged_path]
+            if self._quarantine_executor is None:
+                self._quarantine_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="metrics-quarantine"
+                )
+                to_archive = [
+                    path for path in self._quarantine_staging_dir.iterdir() if path != staged_path
+                ] + to_archive
+            for path in to_archive:
+                job = self._quarantine_executor.submit(self._archive_staged, path)
+                self._quarantine_jobs.add(job)
+                job.add_done_callback(self._quarantine_jobs.discard)
+
+    def _archive_staged(self, staged_path: Path) -> None:
+        """Archive a staged storage into the quarantine, delete it and evict the old archives.
+
+        Args:
+            staged_path: The path of the staged storage.
+        """
+        tarfile_path = self._quarantine_dir.joinpath(staged_path.name).with_suffix(".tar.gz")
         try:
-            self.delete(runner_name)
-        except DeleteMetricsStorageError as exc:
-            raise QuarantineMetricsStorageError(
-                f"Failed to delete metrics storage for runner {runner_name}"
+            self._write_archive(staged_path, tarfile_path)
+            shutil.rmtree(staged_path)
+        except OSError:
+            logger.exception("Failed to archive quarantined metrics storage %s", staged_path)
+            return
+        logger.info("Archived quarantined metrics storage to %s", tarfile_path)
+        self._evict_quarantine()
+
+    def _write_archive(self, staged_path: Path, tarfile_path: Path) -> None:
+        """Write the archive of a staged storage, so that an archive is never partially written.
+
+        Args:
+            staged_path: The path of the staged storage.
+            tarfile_path: The path of the archive.
+
+        Raises:
+            OSError: If the archive cannot be written.
+        """
+        with tempfile.NamedTemporaryFile(
+            dir=self._quarantine_dir, suffix=".part", delete=False
+        ) as temp_file:
+            temp_path = Path(temp_file.name)
+            try:
+                with tarfile.open(fileobj=temp_file, mode="w:gz") as tar:
+                    tar.add(staged_path, arcname=staged_path.name)
+            except OSError:
+                temp_path.unlink(missing_ok=True)
+                raise
+        temp_path.replace(tarfile_path)
+
+    def _evict_quarantine(self) -> None:
+        """Delete the quarantine archives over the age limit, then the oldest over the size."""
+        archives = []
+        for path in self._quarantine_dir.glob("*.tar.gz"):
+            try:
+                archive_stat = path.stat()
+            except FileNotFoundError:
+                continue
+            archives.append((archive_stat.st_mtime, archive_stat.st_size, path))
+        archives.sort()
+        min_mtime = time.time() - self._quarantine_max_age
+        total_size = sum(size for _, size, _ in archives)
+        for mtime, size, path in archives:
+            if mtime >= min_mtime and total_size <= self._quarantine_max_bytes:
+                break
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                logger.exception("Failed to evict quarantine archive %s", path)
+                continue
+            total_size -= size
+            logger.info("Evicted quarantine archive %s", path)
+
+    def _prepare_dirs(self) -> None:
+        """Create the base and quarantine directories, owned by the user of the storage.
+
+        Raises:
+            CreateMetricsStorageError: If the directories cannot be created.
+        """
+        try:
+            for directory in (
+                self._base_dir,
+                self._quarantine_dir,
+                self._quarantine_staging_dir,
+            ):
+                directory.mkdir(exist_ok=True)
+                # this could be executed as root (e.g. during a charm hook), therefore set
+                # permissions
+                shutil.chown(
+                    directory,
+                    user=self._system_user_config.user,
+                    group=self._system_user_config.group,
+                )
+                logger.debug(
+                    "Changed ownership of %s to %s:%s",
+                    directory,
+                    self._system_user_config.user,
+                    self._system_user_config.group,
+                )
+        except OSError as exc:
+            raise CreateMetricsStorageError(
+                "Failed to create metrics storage directories"
             ) from exc
+        self._dirs_prepared = True
+
+    def _get_base_stat(self) -> os.stat_result | None:
+        """Get the status of the base directory.
+
+        Returns:
+            The status of the base directory, None if the base directory does not exist.
+        """
+        try:
+            return self._base_dir.stat()
+        except FileNotFoundError:
+            return None
+
+    def _sync_catalog(self) -> dict[str, _CatalogEntry]:
+        """Rebuild the catalog from disk if the base directory changed since it was built.
+
+        Returns:
+            A copy of the catalog.
+        """
+        with self._catalog_lock:
+            base_stat = self._get_base_stat()
+            base_mtime = None if base_stat is None else base_stat.st_mtime_ns
+            if base_mtime is None:
+                self._catalog = {}
+            elif base_mtime != self._catalog_base_mtime:
+                logger.debug("Rebuilding the catalog of the metrics storages")
+                self._catalog = self._scan_base_dir()
+                if time.time_ns() - base_mtime < _MTIME_GRANULARITY_NS:
+                    base_mtime = None
+            self._catalog_base_mtime = base_mtime
+            return dict(self._catalog)
+
+    def _scan_base_dir(self) -> dict[str, _CatalogEntry]:
+        """Read the catalog entries of the storages in the base directory.
+
+        Returns:
+            The catalog entries by runner name.
+        """
+        catalog = {}
+        with os.scandir(self._base_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                try:
+                    entry_stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                catalog[entry.name] = _CatalogEntry(
+                    path=Path(entry.path),
+                    created_at=entry_stat.st_ctime,
+                    last_modified=entry_stat.st_mtime,
+                )
+        return catalog
+
+    def _update_catalog(
+        self, runner_name: str, entry: _CatalogEntry | None, base_stat: os.stat_result | None
+    ) -> None:
+        """Update the catalog after the creation or deletion of a storage.
+
+        The catalog stays in sync with the base directory only if it was in sync before the
+        operation and nothing else changed the base directory during the operation, otherwise
+        the catalog is rebuilt at the next listing. The storages are directories, each one
+        created or deleted changes the link count of the base directory by one.
+
+        Args:
+            runner_name: The name of the runner.
+            entry: The entry of the created storage, None for a deleted storage.
+            base_stat: The status of the base directory before the operation.
+        """
+        with self._catalog_lock:
+            if entry is None:
+                self._catalog.pop(runner_name, None)
+            else:
+                self._catalog[runner_name] = entry
+            after_stat = self._get_base_stat()
+            if (
+                base_stat is not None
+                and after_stat is not None
+                and base_stat.st_mtime_ns == self._catalog_base_mtime
+                and after_stat.st_nlink - base_stat.st_nlink == (-1 if entry is None else 1)
+            ):
+                self._catalog_base_mtime = after_stat.st_mtime_ns
+            else:
+                self._catalog_base_mtime = None
 
     def _get_runner_fs_path(self, runner_name: str) -> Path:
         """Get the path of the runner metrics storage.
@@ -236,3 +509,59 @@ class StorageManager(StorageManagerProtocol):
             The path of the runner shared filesystem.
         """
         return self._base_dir / runner_name
+
+
+class TmpfsStorageManager(StorageManager):
+    """Manager for the metrics storage on a tmpfs.
+
+    The directories and files created and deleted for each runner stay in memory, without
+    metadata writes to the disk of the host. The storages are lost on reboot of the host, with the
+    metrics not extracted yet. The quarantined storages are still archived on disk.
+    """
+
+    def __init__(self, system_user_config: SystemUserConfig, tmpfs_dir: Path = TMPFS_DIR):
+        """Initialize the storage manager.
+
+        Args:
+            system_user_config: The configuration of the user owning the storage.
+            tmpfs_dir: The tmpfs mount point to create the storage under.
+        """
+        self._tmpfs_user_dir = tmpfs_dir / f"github-runner-metrics-{system_user_config.user}"
+        super().__init__(
+            system_user_config=system_user_config,
+            base_dir=self._tmpfs_user_dir / _FILESYSTEM_BASE_DIR_NAME,
+        )
+
+    def _prepare_dirs(self) -> None:
+        """Create the directory of the user on the tmpfs, then the storage directories.
+
+        The tmpfs is writable by all users, the directory of the user is checked not to be a
+        link or a directory of another user before use.
+
+        Raises:
+            CreateMetricsStorageError: If the directories cannot be created.
+        """
+        try:
+            self._tmpfs_user_dir.mkdir(mode=0o700, exist_ok=True)
+            dir_stat = self._tmpfs_user_dir.lstat()
+            user_uid = pwd.getpwnam(self._system_user_config.user).pw_uid
+        except (OSError, KeyError) as exc:
+            raise CreateMetricsStorageError(
+                f"Failed to create metrics storage directory {self._tmpfs_user_dir}"
+            ) from exc
+        if not stat.S_ISDIR(dir_stat.st_mode) or dir_stat.st_uid not in (user_uid, os.geteuid()):
+            raise CreateMetricsStorageError(
+                f"{self._tmpfs_user_dir} is not a directory owned by "
+                f"{self._system_user_config.user}"
+            )
+        try:
+            shutil.chown(
+                self._tmpfs_user_dir,
+                user=self._system_user_config.user,
+                group=self._system_user_config.group,
+            )
+        except OSError as exc:
+            raise CreateMetricsStorageError(
+                f"Failed to change ownership of {self._tmpfs_user_dir}"
+            ) from exc
+        super()._prepare_dirs()
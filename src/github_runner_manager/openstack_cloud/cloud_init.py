@@ -0,0 +1,143 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Generation of the cloud-init userdata of the runner instances."""
+
+import secrets
+from pathlib import Path
+
+import jinja2
+
+from github_runner_manager.manager.cloud_runner_manager import (
+    GitHubRunnerConfig,
+    SupportServiceConfig,
+)
+from github_runner_manager.metrics import receiver as metrics_receiver
+from github_runner_manager.openstack_cloud import warm_pool
+from github_runner_manager.openstack_cloud.constants import METRICS_EXCHANGE_PATH
+from github_runner_manager.repo_policy_compliance_client import RepoPolicyComplianceClient
+from github_runner_manager.types_.github import GitHubOrg
+
+RUNNER_APPLICATION = Path("/home/ubuntu/actions-runner")
+PRE_JOB_SCRIPT = RUNNER_APPLICATION / "pre-job.sh"
+
+
+def generate_cloud_init(
+    runner_config: GitHubRunnerConfig,
+    service_config: SupportServiceConfig,
+    instance_name: str,
+    registration_token: str | None,
+) -> str:
+    """Generate cloud init userdata.
+
+    This is the script the openstack server runs on startup.
+
+    Args:
+        runner_config: The configuration for the GitHub runner.
+        service_config: The configuration for supporting services.
+        instance_name: The name of the instance.
+        registration_token: The GitHub runner registration token, None to wait in the warm
+            pool for the token.
+
+    Returns:
+        The cloud init userdata for openstack instance.
+    """
+    jinja = jinja2.Environment(
+        loader=jinja2.PackageLoader("github_runner_manager", "templates"), autoescape=True
+    )
+
+    env_contents = jinja.get_template("env.j2").render(
+        pre_job_script=str(PRE_JOB_SCRIPT),
+        dockerhub_mirror=service_config.dockerhub_mirror or "",
+        ssh_debug_info=(
+            secrets.choice(service_config.ssh_debug_connections)
+            if service_config.ssh_debug_connections
+            else None
+        ),
+    )
+
+    metrics_push = _get_metrics_push_config(service_config, instance_name)
+    pre_job_contents_dict = {
+        "issue_metrics": True,
+        "metrics_exchange_path": str(METRICS_EXCHANGE_PATH),
+        "do_repo_policy_check": False,
+        **metrics_push,
+    }
+    repo_policy = _get_repo_policy_compliance_client(service_config)
+    if repo_policy is not None:
+        pre_job_contents_dict.update(
+            {
+                "repo_policy_base_url": repo_policy.base_url,
+                "repo_policy_one_time_token": repo_policy.get_one_time_token(),
+                "do_repo_policy_check": True,
+            }
+        )
+
+    pre_job_contents = jinja.get_template("pre-job.j2").render(pre_job_contents_dict)
+
+    runner_group = None
+    if isinstance(runner_config.github_path, GitHubOrg):
+        runner_group = runner_config.github_path.group
+    aproxy_address = (
+        service_config.proxy_config.aproxy_address
+        if service_config.proxy_config is not None
+        else None
+    )
+    return jinja.get_template("openstack-userdata.sh.j2").render(
+        github_url=f"https://github.com/{runner_config.github_path.path()}",
+        runner_group=runner_group,
+        token=registration_token,
+        warm_pool=registration_token is None,
+        warm_pool_ready_path=str(warm_pool.WARM_POOL_READY_PATH),
+        registration_token_path=str(warm_pool.REGISTRATION_TOKEN_PATH),
+        instance_labels=",".join(runner_config.labels),
+        instance_name=instance_name,
+        env_contents=env_contents,
+        pre_job_contents=pre_job_contents,
+        metrics_exchange_path=str(METRICS_EXCHANGE_PATH),
+        aproxy_address=aproxy_address,
+        dockerhub_mirror=service_config.dockerhub_mirror,
+        **metrics_push,
+    )
+
+
+def _get_metrics_push_config(
+    service_config: SupportServiceConfig, instance_name: str
+) -> dict[str, str]:
+    """Get the template variables for the runner to push its metrics files to the receiver.
+
+    Args:
+        service_config: The configuration for supporting services.
+        instance_name: The name of the instance.
+
+    Returns:
+        The URL to post the metrics files under and the token of the runner, or nothing if the
+        metrics are not pushed.
+    """
+    if (receiver_config := service_config.metrics_receiver) is None:
+        return {}
+    return {
+        "metrics_push_url": metrics_receiver.get_push_url(str(receiver_config.url), instance_name),
+        "metrics_push_token": metrics_receiver.get_runner_token(
+            receiver_config.secret, instance_name
+        ),
+    }
+
+
+def _get_repo_policy_compliance_client(
+    service_config: SupportServiceConfig,
+) -> RepoPolicyComplianceClient | None:
+    """Get repo policy compliance client.
+
+    Args:
+        service_config: The configuration for supporting services.
+
+    Returns:
+        The repo policy compliance client.
+    """
+    if service_config.repo_policy_compliance is not None:
+        return RepoPolicyComplianceClient(
+            service_config.repo_policy_compliance.url,
+            service_config.repo_policy_compliance.token,
+        )
+    return None
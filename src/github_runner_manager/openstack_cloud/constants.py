@@ -4,7 +4,18 @@
 """Common constants for the Openstack cloud module."""
 from pathlib import Path
 
+import paramiko
+import paramiko.ssh_exception
+
 RUNNER_LISTENER_PROCESS = "Runner.Listener"
 RUNNER_WORKER_PROCESS = "Runner.Worker"
 METRICS_EXCHANGE_PATH = Path("/home/ubuntu/metrics-exchange")
+# Written by cloud-init right before starting the runner.
+RUNNER_INSTALLED_TIMESTAMP_PATH = METRICS_EXCHANGE_PATH / "runner-installed.timestamp"
 CREATE_SERVER_TIMEOUT = 5 * 60
+# The errors of an SSH connection or command failing on an unreachable or misbehaving instance.
+SSH_ERRORS = (
+    TimeoutError,
+    paramiko.ssh_exception.NoValidConnectionsError,
+    paramiko.ssh_exception.SSHException,
+)
@@ -0,0 +1,186 @@
+#  Copyright 2024 Canonical Ltd.
+#  See LICENSE file for licensing details.
+
+"""Cache of the runner health check results.
+
+A health check runs commands over SSH on the runner instance. The results are kept for a time
+depending on the state of the runner, so that a reconcile only checks the runners whose health
+could have changed since the last check:
+
+- A runner GitHub reports busy is running a job, its health is re-checked rarely.
+- An idle runner is re-checked after a shorter time.
+- A runner that booted recently, that GitHub reports offline, that is not ACTIVE, or that was
+  not healthy on the last check is always re-checked.
+
+An entry is also dropped when the OpenStack status of the instance changes and when the runner is
+deleted or flushed.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Iterable, Sequence
+
+from github_runner_manager.manager.cloud_runner_manager import CloudRunnerState, InstanceId
+from github_runner_manager.openstack_cloud.openstack_cloud import OpenstackInstance
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_IDLE_TTL_IN_SECONDS = 60
+DEFAULT_BUSY_TTL_IN_SECONDS = 300
+# The runner of a recently booted instance is still being set up and can fail at any point.
+_RECENT_BOOT_WINDOW = timedelta(minutes=10)
+
+
+@dataclass
+class _HealthEntry:
+    """A cached healthy result of a health check.
+
+    Attributes:
+        status: The OpenStack status of the instance when checked.
+        checked_at: The monotonic time of the health check.
+    """
+
+    status: str
+    checked_at: float
+
+
+class HealthCache:
+    """Health check results of the runners by instance ID.
+
+    Attributes:
+        idle_ttl: The time in seconds to keep the result of an idle runner. 0 disables the cache.
+        busy_ttl: The time in seconds to keep the result of a busy runner.
+        hits: The number of health checks skipped with a cached result.
+        misses: The number of health checks run.
+    """
+
+    def __init__(
+        self,
+        idle_ttl: float = DEFAULT_IDLE_TTL_IN_SECONDS,
+        busy_ttl: float = DEFAULT_BUSY_TTL_IN_SECONDS,
+    ) -> None:
+        """Construct the object.
+
+        Args:
+            idle_ttl: The time in seconds to keep the result of an idle runner. 0 disables the
+                cache.
+            busy_ttl: The time in seconds to keep the result of a busy runner.
+        """
+        self.idle_ttl = idle_ttl
+        self.busy_ttl = busy_ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[InstanceId, _HealthEntry] = {}
+        self._busy: set[InstanceId] = set()
+
+    def lookup(
+        self, instances: Sequence[OpenstackInstance]
+    ) -> tuple[dict[InstanceId, bool], list[OpenstackInstance]]:
+        """Split the instances into the ones with a valid cached result and the ones to check.
+
+        Args:
+            instances: The instances hosting the runners.
+
+        Returns:
+            The cached results by instance ID, and the instances to health check.
+        """
+        now = time.monotonic()
+        cached: dict[InstanceId, bool] = {}
+        to_check: list[OpenstackInstance] = []
+        for instance in instances:
+            entry = self._entries.get(instance.instance_id)
+            ttl = self.busy_ttl if instance.instance_id in self._busy else self.idle_ttl
+            if (
+                entry is not None
+                and entry.status == instance.status
+                and now - entry.checked_at < ttl
+            ):
+                cached[instance.instance_id] = True
+            else:
+                to_check.append(instance)
+        self.hits += len(cached)
+        self.misses += len(to_check)
+        logger.debug(
+            "Health cache: %s cached, %s to check (%s hits, %s misses in total)",
+            len(cached),
+            len(to_check),
+            self.hits,
+            self.misses,
+        )
+        return cached, to_check
+
+    def store(
+        self, instances: Iterable[OpenstackInstance], results: dict[InstanceId, bool | None]
+    ) -> None:
+        """Cache the healthy results of the instances the re-check policy allows.
+
+        Args:
+            instances: The instances checked.
+            results: The health check results by instance ID, None if undetermined.
+        """
+        now = time.monotonic()
+        for instance in instances:
+            healthy = results.get(instance.instance_id)
+            if not healthy or not self._is_cacheable(instance):
+                self._entries.pop(instance.instance_id, None)
+                continue
+            self._entries[instance.instance_id] = _HealthEntry(
+                status=instance.status, checked_at=now
+            )
+
+    def update_github_states(
+        self, busy: Iterable[InstanceId], offline: Iterable[InstanceId]
+    ) -> None:
+        """Apply the state of the runners on GitHub to the re-check policy.
+
+        The cached results of busy runners are kept for the longer busy TTL from then on, the
+        results of offline runners are dropped.
+
+        Args:
+            busy: The instance IDs of the runners GitHub reports busy.
+            offline: The instance IDs of the runners GitHub reports offline.
+        """
+        self._busy = set(busy)
+        for instance_id in offline:
+            self.invalidate(instance_id)
+
+    def prune(self, instances: Iterable[OpenstackInstance]) -> None:
+        """Drop the state of the runners no longer on the cloud.
+
+        Args:
+            instances: All the instances on the cloud.
+        """
+        present = {instance.instance_id for instance in instances}
+        for instance_id in self._entries.keys() - present:
+            del self._entries[instance_id]
+        self._busy &= present
+
+    def invalidate(self, instance_id: InstanceId) -> None:
+        """Drop the cached result of a runner.
+
+        Args:
+            instance_id: The instance ID of the runner.
+        """
+        self._entries.pop(instance_id, None)
+
+    def clear(self) -> None:
+        """Drop all cached results."""
+        self._entries.clear()
+
+    def _is_cacheable(self, instance: OpenstackInstance) -> bool:
+        """Check whether the healthy result of a runner can be kept.
+
+        Args:
+            instance: The instance checked.
+
+        Returns:
+            Whether the result can be cached.
+        """
+        return (
+            self.idle_ttl > 0
+            and CloudRunnerState.from_openstack_server_status(instance.status)
+            == CloudRunnerState.ACTIVE
+            and datetime.now() - instance.created_at >= _RECENT_BOOT_WINDOW
+        )
@@ -3,16 +3,28 @@
 
 """Collection of functions related to health checks for a runner VM."""
 
+import json
 import logging
+import shlex
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Iterable
 
 import invoke
 from fabric import Connection as SSHConnection
 
 from github_runner_manager.errors import KeyfileError, SSHError
-from github_runner_manager.manager.cloud_runner_manager import CloudInitStatus, CloudRunnerState
+from github_runner_manager.manager.cloud_runner_manager import (
+    CloudInitStatus,
+    CloudRunnerState,
+    HealthState,
+    InstanceId,
+)
 from github_runner_manager.openstack_cloud.constants import (
-    METRICS_EXCHANGE_PATH,
+    RUNNER_INSTALLED_TIMESTAMP_PATH,
     RUNNER_LISTENER_PROCESS,
     RUNNER_WORKER_PROCESS,
 )
@@ -22,9 +34,65 @@ from github_runner_manager.utilities import retry
 logger = logging.getLogger(__name__)
 
 INSTANCE_IN_BUILD_MODE_TIMEOUT_IN_HOURS = 1
+DEFAULT_HEALTH_CHECK_CONCURRENCY = 16
+# Upper bound for a single check: SSH connect attempts with retries plus the remote commands.
+DEFAULT_HEALTH_CHECK_TIMEOUT_IN_SECONDS = 120
+_HEALTH_CHECK_POLL_INTERVAL_IN_SECONDS = 1
 
 _HealthCheckResult = bool | None  # None indicates that the check can not determine health status
 
+# Collects the state evaluated by the individual health checks and prints it as JSON. The runner
+# images ship python3 as cloud-init depends on it.
+_HEALTH_PROBE_SCRIPT = f"""
+import json, os, subprocess
+report = {{"runner_installed": os.path.exists("{RUNNER_INSTALLED_TIMESTAMP_PATH}")}}
+def run(cmd):
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=25)
+        return result.returncode == 0, result.stdout, result.stderr
+    except (OSError, subprocess.SubprocessError) as exc:
+        return False, "", str(exc)
+ok, out, err = run(["cloud-init", "status"])
+report.update(cloud_init_ok=ok, cloud_init_status=out, cloud_init_error=err)
+ok, out, err = run(["ps", "-eo", "pid=,args="])
+# Skip the probe and its shell, their command lines contain the process names.
+probe_pids = {{str(os.getpid()), str(os.getppid())}}
+lines = (line.split(maxsplit=1) for line in out.splitlines())
+out = "\\n".join(line[-1] for line in lines if line and line[0] not in probe_pids)
+report.update(
+    processes_ok=ok,
+    listener_running="{RUNNER_LISTENER_PROCESS}" in out,
+    worker_running="{RUNNER_WORKER_PROCESS}" in out,
+    processes_error=err,
+)
+print(json.dumps(report))
+"""
+
+
+@dataclass
+class _HealthProbeReport:  # pylint: disable=too-many-instance-attributes
+    """The runner state collected by the health probe.
+
+    Attributes:
+        runner_installed: Whether the runner-installed.timestamp exists.
+        cloud_init_ok: Whether the cloud-init status command succeeded.
+        cloud_init_status: The output of the cloud-init status command.
+        cloud_init_error: The error output of the cloud-init status command.
+        processes_ok: Whether listing the processes succeeded.
+        listener_running: Whether the runner listener process is running.
+        worker_running: Whether the runner worker process is running.
+        processes_error: The error output of listing the processes.
+    """
+
+    runner_installed: bool
+    cloud_init_ok: bool
+    cloud_init_status: str
+    cloud_init_error: str
+    processes_ok: bool
+    listener_running: bool
+    worker_running: bool
+    processes_error: str
+
 
 def check_runner(openstack_cloud: OpenstackCloud, instance: OpenstackInstance) -> bool:
     """Run a general health check on a runner instance.
@@ -55,11 +123,134 @@ def check_runner(openstack_cloud: OpenstackCloud, instance: OpenstackInstance) -
     return check_active_runner(ssh_conn, instance)
 
 
+def check_runners(  # pylint: disable=too-many-locals
+    openstack_cloud: OpenstackCloud,
+    instances: Iterable[OpenstackInstance],
+    max_workers: int = DEFAULT_HEALTH_CHECK_CONCURRENCY,
+    timeout: float = DEFAULT_HEALTH_CHECK_TIMEOUT_IN_SECONDS,
+) -> dict[InstanceId, _HealthCheckResult]:
+    """Run the general health check on many runner instances concurrently.
+
+    At most max_workers checks run at the same time. A check that has not completed within
+    timeout seconds of starting is abandoned and reported as undetermined (None), so that the
+    slowest unresponsive instance bounds the run instead of the sum of all checks.
+
+    Args:
+        openstack_cloud: The OpenstackCloud instance to use.
+        instances: The instances hosting the runners to run health check on.
+        max_workers: The maximum number of concurrent health checks.
+        timeout: The deadline in seconds for a single health check.
+
+    Returns:
+        The health check result by instance ID. None if the check did not finish in time.
+    """
+    instances = tuple(instances)
+    if not instances:
+        return {}
+
+    started_at: dict[InstanceId, float] = {}
+    started_lock = threading.Lock()
+
+    def _check(instance: OpenstackInstance) -> bool:
+        """Run the health check on one instance and record its start time.
+
+        Args:
+            instance: The instance to check.
+
+        Returns:
+            True if runner is healthy.
+        """
+        with started_lock:
+            started_at[instance.instance_id] = time.monotonic()
+        return check_runner(openstack_cloud=openstack_cloud, instance=instance)
+
+    results: dict[InstanceId, _HealthCheckResult] = {}
+    worker_count = max(1, min(max_workers, len(instances)))
+    executor = ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="health-check")
+    try:
+        pending: dict[Future, OpenstackInstance] = {
+            executor.submit(_check, instance): instance for instance in instances
+        }
+        abandoned: set[Future] = set()
+        while pending:
+            done, _ = wait(
+                pending,
+                timeout=_HEALTH_CHECK_POLL_INTERVAL_IN_SECONDS,
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                results[pending.pop(future).instance_id] = future.result()
+
+            now = time.monotonic()
+            with started_lock:
+                expired = [
+                    future
+                    for future, instance in pending.items()
+                    if now - started_at.get(instance.instance_id, now) >= timeout
+                ]
+            for future in expired:
+                instance = pending.pop(future)
+                logger.warning(
+                    "Health check on %s did not complete in %s seconds, health unknown",
+                    instance.server_name,
+                    timeout,
+                )
+                results[instance.instance_id] = None
+                abandoned.add(future)
+
+            # Abandoned checks keep their worker thread busy. If all workers are held by them,
+            # the queued checks will not start before the abandoned ones return.
+            abandoned = {future for future in abandoned if not future.done()}
+            if pending and len(abandoned) >= worker_count:
+                for future, instance in pending.items():
+                    future.cancel()
+                    logger.warning(
+                        "Health check on %s not started as all workers are stuck, health unknown",
+                        instance.server_name,
+                    )
+                    results[instance.instance_id] = None
+                pending.clear()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def to_health_state(health_check_result: bool | None) -> HealthState:
+    """Convert a health check result to the health state of a runner.
+
+    Args:
+        health_check_result: The health check result, None if it is undetermined.
+
+    Returns:
+        The health state.
+    """
+    if health_check_result is None:
+        return HealthState.UNKNOWN
+    return HealthState.HEALTHY if health_check_result else HealthState.UNHEALTHY
+
+
+def from_health_state(health: HealthState) -> bool | None:
+    """Convert the health state of a runner to a health check result.
+
+    Args:
+        health: The health state.
+
+    Returns:
+        The health check result, None if it is undetermined.
+    """
+    if health == HealthState.UNKNOWN:
+        return None
+    return health == HealthState.HEALTHY
+
+
 def check_active_runner(
     ssh_conn: SSHConnection, instance: OpenstackInstance, accept_finished_job: bool = False
 ) -> bool:
     """Run a health check for a runner whose openstack instance is ACTIVE.
 
+    The runner state is collected with a single probe command. If the probe report cannot be
+    obtained, the state is collected with one command per check instead.
+
     Args:
         ssh_conn: The SSH connection to the runner.
         instance: The OpenStack instance to conduit the health check.
@@ -69,6 +260,50 @@ def check_active_runner(
             the flag, the health check would fail as it checks for running processes
             which would not be present in this case.
 
+    Returns:
+        Whether the runner should be considered healthy.
+    """
+    if (report := _run_health_probe(ssh_conn, instance.server_name)) is None:
+        return _check_active_runner_sequentially(ssh_conn, instance, accept_finished_job)
+
+    if (check_ok := _evaluate_runner_installed(report.runner_installed, instance)) is not None:
+        return check_ok
+
+    if (
+        check_ok := _evaluate_cloud_init(
+            command_ok=report.cloud_init_ok,
+            status=report.cloud_init_status,
+            error=report.cloud_init_error,
+            server_name=instance.server_name,
+            accept_finished_job=accept_finished_job,
+        )
+    ) is not None:
+        return check_ok
+
+    if (
+        check_ok := _evaluate_runner_processes(
+            command_ok=report.processes_ok,
+            listener_running=report.listener_running,
+            worker_running=report.worker_running,
+            error=report.processes_error,
+            server_name=instance.server_name,
+        )
+    ) is not None:
+        return check_ok
+
+    return True
+
+
+def _check_active_runner_sequentially(
+    ssh_conn: SSHConnection, instance: OpenstackInstance, accept_finished_job: bool = False
+) -> bool:
+    """Run a health check for an ACTIVE runner with one remote command per check.
+
+    Args:
+        ssh_conn: The SSH connection to the runner.
+        instance: The OpenStack instance to conduit the health check.
+        accept_finished_job: Whether a job that has finished should be marked healthy.
+
     Returns:
         Whether the runner should be considered healthy.
     """
@@ -90,6 +325,47 @@ def check_active_runner(
     return True
 
 
+def _run_health_probe(ssh_conn: SSHConnection, server_name: str) -> _HealthProbeReport | None:
+    """Collect the runner state needed by the health check with a single remote command.
+
+    Args:
+        ssh_conn: The SSH connection to the runner.
+        server_name: The name of the server.
+
+    Returns:
+        The probe report, or None if the probe did not produce a valid report.
+    """
+    result: invoke.runners.Result = ssh_conn.run(
+        f"python3 -c {shlex.quote(_HEALTH_PROBE_SCRIPT)}", warn=True, hide=True, timeout=60
+    )
+    if not result.ok:
+        logger.warning(
+            "Health probe failed on %s, falling back to individual checks: %s",
+            server_name,
+            result.stderr,
+        )
+        return None
+    try:
+        report = json.loads(result.stdout)
+        return _HealthProbeReport(
+            runner_installed=bool(report["runner_installed"]),
+            cloud_init_ok=bool(report["cloud_init_ok"]),
+            cloud_init_status=str(report["cloud_init_status"]),
+            cloud_init_error=str(report["cloud_init_error"]),
+            processes_ok=bool(report["processes_ok"]),
+            listener_running=bool(report["listener_running"]),
+            worker_running=bool(report["worker_running"]),
+            processes_error=str(report["processes_error"]),
+        )
+    except (json.JSONDecodeError, TypeError, KeyError):
+        logger.warning(
+            "Invalid health probe report on %s, falling back to individual checks: %s",
+            server_name,
+            result.stdout,
+        )
+        return None
+
+
 @retry(exception=SSHError, tries=3, delay=5, backoff=2, local_logger=logger)
 def _get_ssh_connection(
     openstack_cloud: OpenstackCloud, instance: OpenstackInstance
@@ -107,7 +383,8 @@ def _get_ssh_connection(
         Whether the runner is healthy.
     """
     try:
-        ssh_conn = openstack_cloud.get_ssh_connection(instance)
+        # The health probe output verifies the shell, no separate test command is needed.
+        ssh_conn = openstack_cloud.get_ssh_connection(instance, verify_shell=False)
 
     except SSHError:
         logger.exception(
@@ -171,11 +448,35 @@ def _run_health_check_cloud_init(
         Whether the cloud-init status indicates the run is healthy or None.
     """
     result: invoke.runners.Result = ssh_conn.run("cloud-init status", warn=True, timeout=30)
-    if not result.ok:
-        logger.warning("cloud-init status command failed on %s: %s.", server_name, result.stderr)
+    return _evaluate_cloud_init(
+        command_ok=result.ok,
+        status=result.stdout,
+        error=result.stderr,
+        server_name=server_name,
+        accept_finished_job=accept_finished_job,
+    )
+
+
+def _evaluate_cloud_init(
+    command_ok: bool, status: str, error: str, server_name: str, accept_finished_job: bool
+) -> _HealthCheckResult:
+    """Decide if a run is healthy from the cloud-init status.
+
+    Args:
+        command_ok: Whether the cloud-init status command succeeded.
+        status: The output of the cloud-init status command.
+        error: The error output of the cloud-init status command.
+        server_name: The name of the server.
+        accept_finished_job: Whether a job that has finished should be marked healthy.
+
+    Returns:
+        Whether the cloud-init status indicates the run is healthy or None.
+    """
+    if not command_ok:
+        logger.warning("cloud-init status command failed on %s: %s.", server_name, error)
         return False
 
-    if CloudInitStatus.DONE in result.stdout:
+    if CloudInitStatus.DONE in status:
         return accept_finished_job
 
     return None
@@ -206,10 +507,24 @@ def _run_health_check_runner_installed(
         If the run can be considered healthy depending on the existence of
         the runner-installed.timestamp.
     """
-    result = ssh_conn.run(
-        f"[ -f {METRICS_EXCHANGE_PATH}/runner-installed.timestamp ]", warn=True, timeout=30
-    )
-    if not result.ok:
+    result = ssh_conn.run(f"[ -f {RUNNER_INSTALLED_TIMESTAMP_PATH} ]", warn=True, timeout=30)
+    return _evaluate_runner_installed(result.ok, instance)
+
+
+def _evaluate_runner_installed(
+    runner_installed: bool, instance: OpenstackInstance
+) -> _HealthCheckResult:
+    """Decide if a run is healthy from the existence of the runner-installed.timestamp.
+
+    Args:
+        runner_installed: Whether the runner-installed.timestamp exists.
+        instance: The OpenStack instance to conduit the health check.
+
+    Returns:
+        If the run can be considered healthy depending on the existence of
+        the runner-installed.timestamp.
+    """
+    if not runner_installed:
         logger.info(
             "Runner installed timestamp file not found on %s, cloud-init may still run",
             instance.server_name,
@@ -240,10 +555,38 @@ def _run_health_check_runner_processes_running(
         If the run can be considered healthy depending on the existence of the processes.
     """
     result = ssh_conn.run("ps aux", warn=True, timeout=30)
-    if not result.ok:
-        logger.warning("SSH run of `ps aux` failed on %s: %s", server_name, result.stderr)
+    return _evaluate_runner_processes(
+        command_ok=result.ok,
+        listener_running=RUNNER_LISTENER_PROCESS in result.stdout,
+        worker_running=RUNNER_WORKER_PROCESS in result.stdout,
+        error=result.stderr,
+        server_name=server_name,
+    )
+
+
+def _evaluate_runner_processes(
+    command_ok: bool,
+    listener_running: bool,
+    worker_running: bool,
+    error: str,
+    server_name: str,
+) -> _HealthCheckResult:
+    """Decide if a run is healthy from the runner processes running.
+
+    Args:
+        command_ok: Whether listing the processes succeeded.
+        listener_running: Whether the runner listener process is running.
+        worker_running: Whether the runner worker process is running.
+        error: The error output of listing the processes.
+        server_name: The name of the server.
+
+    Returns:
+        If the run can be considered healthy depending on the existence of the processes.
+    """
+    if not command_ok:
+        logger.warning("SSH run of `ps aux` failed on %s: %s", server_name, error)
         return False
-    if RUNNER_WORKER_PROCESS not in result.stdout and RUNNER_LISTENER_PROCESS not in result.stdout:
+    if not worker_running and not listener_running:
         logger.warning("Runner process not found on %s", server_name)
         return False
     return None
@@ -0,0 +1,167 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Exchange of metrics between the runner instances and the shared metrics storage."""
+
+import logging
+from pathlib import Path
+
+import paramiko
+from fabric import Connection as SSHConnection
+
+from github_runner_manager.errors import (
+    CreateMetricsStorageError,
+    GetMetricsStorageError,
+    SSHError,
+)
+from github_runner_manager.metrics import runner as runner_metrics
+from github_runner_manager.metrics.storage import StorageManager
+from github_runner_manager.openstack_cloud.constants import METRICS_EXCHANGE_PATH, SSH_ERRORS
+
+logger = logging.getLogger(__name__)
+
+MAX_METRICS_FILE_SIZE = 1024
+
+
+class _PullFileError(Exception):
+    """Represents an error while pulling a file from the runner instance."""
+
+
+def init_metrics_storage(
+    metrics_storage_manager: StorageManager, name: str, install_start_timestamp: float
+) -> None:
+    """Create metrics storage for runner.
+
+    An error will be logged if the storage cannot be created.
+    It is assumed that the code will not be able to issue metrics for this runner
+    and not fail for other operations.
+
+    Args:
+        metrics_storage_manager: The metrics storage manager.
+        name: The name of the runner.
+        install_start_timestamp: The timestamp of installation start.
+    """
+    try:
+        storage = metrics_storage_manager.create(runner_name=name)
+    except CreateMetricsStorageError:
+        logger.exception(
+            "Failed to create metrics storage for runner %s, "
+            "will not be able to issue all metrics.",
+            name,
+        )
+    else:
+        try:
+            (storage.path / runner_metrics.RUNNER_INSTALLATION_START_TS_FILE_NAME).write_text(
+                str(install_start_timestamp), encoding="utf-8"
+            )
+        except FileNotFoundError:
+            logger.exception(
+                f"Failed to write {runner_metrics.RUNNER_INSTALLATION_START_TS_FILE_NAME}"
+                f" into metrics storage for runner %s, will not be able to issue all metrics.",
+                name,
+            )
+
+
+def pull_runner_metrics(
+    metrics_storage_manager: StorageManager, name: str, ssh_conn: SSHConnection
+) -> None:
+    """Pull metrics from runner.
+
+    Args:
+        metrics_storage_manager: The metrics storage manager.
+        name: The name of the runner.
+        ssh_conn: The SSH connection to the runner.
+    """
+    logger.debug("Pulling metrics for %s", name)
+    try:
+        storage = metrics_storage_manager.get(runner_name=name)
+    except GetMetricsStorageError:
+        logger.exception(
+            "Failed to get shared metrics storage for runner %s, "
+            "will not be able to issue all metrics.",
+            name,
+        )
+        return
+
+    files = {
+        str(METRICS_EXCHANGE_PATH / "runner-installed.timestamp"): storage.path
+        / runner_metrics.RUNNER_INSTALLED_TS_FILE_NAME,
+        str(METRICS_EXCHANGE_PATH / "pre-job-metrics.json"): storage.path
+        / runner_metrics.PRE_JOB_METRICS_FILE_NAME,
+        str(METRICS_EXCHANGE_PATH / "post-job-metrics.json"): storage.path
+        / runner_metrics.POST_JOB_METRICS_FILE_NAME,
+    }
+    # The files the runner pushed to the metrics receiver are already in the storage.
+    files = {remote: local for remote, local in files.items() if not local.exists()}
+    if not files:
+        logger.debug("All metrics of %s were pushed, skipping pull", name)
+        return
+    try:
+        _ssh_pull_files(ssh_conn=ssh_conn, files=files, max_size=MAX_METRICS_FILE_SIZE)
+    except _PullFileError as exc:
+        logger.warning(
+            "Failed to pull metrics for %s: %s . Will not be able to issue all metrics",
+            name,
+            exc,
+        )
+
+
+def _ssh_pull_files(ssh_conn: SSHConnection, files: dict[str, Path], max_size: int) -> None:
+    """Pull files from the runner instance over a single SFTP session.
+
+    Each file is read up to one byte over the size limit, so that a file too large is detected
+    without a separate size query and without transferring it.
+
+    Args:
+        ssh_conn: The SSH connection instance.
+        files: The local path to store each file at, by path of the file on the runner instance.
+        max_size: If a file is larger than this, it will not be pulled.
+
+    Raises:
+        _PullFileError: Unable to pull some of the files from the runner instance, the other
+            files are pulled.
+        SSHError: Issue with SSH connection.
+    """
+    errors = []
+    try:
+        sftp = ssh_conn.sftp()
+        for remote_path, local_path in files.items():
+            try:
+                content = _sftp_read(sftp, remote_path, max_size)
+            except _PullFileError as exc:
+                errors.append(str(exc))
+                continue
+            try:
+                local_path.write_bytes(content)
+            except OSError:
+                errors.append(f"Unable to write {remote_path} to {local_path}")
+    except (*SSH_ERRORS, EOFError) as exc:
+        raise SSHError(f"Unable to SSH into {ssh_conn.host}") from exc
+    if errors:
+        raise _PullFileError("; ".join(errors))
+
+
+def _sftp_read(sftp: paramiko.SFTPClient, remote_path: str, max_size: int) -> bytes:
+    """Read a file from the runner instance over SFTP.
+
+    Args:
+        sftp: The SFTP session to the runner instance.
+        remote_path: The file path on the runner instance.
+        max_size: If the file is larger than this, it will not be read.
+
+    Raises:
+        _PullFileError: Unable to read the file from the runner instance.
+
+    Returns:
+        The content of the file.
+    """
+    try:
+        with sftp.open(remote_path, "rb") as remote_file:
+            content = remote_file.read(max_size + 1)
+    except SSH_ERRORS:
+        raise
+    except OSError as exc:
+        raise _PullFileError(f"Unable to retrieve file {remote_path}: {exc}") from exc
+    if len(content) > max_size:
+        raise _PullFileError(f"File size of {remote_path} too large > {max_size}")
+    return content
@@ -4,13 +4,17 @@
 """Class for accessing OpenStack API for managing servers."""
 import functools
 import logging
+import os
 import shutil
+import threading
+import time
+from collections import defaultdict
 from contextlib import contextmanager
-from dataclasses import dataclass
+from dataclasses import astuple, dataclass, replace
 from datetime import datetime
 from functools import reduce
 from pathlib import Path
-from typing import Callable, Iterable, Iterator, ParamSpec, TypeVar, cast
+from typing import Callable, Iterable, Iterator, ParamSpec, Sequence, TypeVar, cast
 
 import keystoneauth1.exceptions
 import openstack
@@ -25,6 +29,7 @@ from paramiko.ssh_exception import NoValidConnectionsError
 
 from github_runner_manager.errors import KeyfileError, OpenStackError, SSHError
 from github_runner_manager.openstack_cloud.constants import CREATE_SERVER_TIMEOUT
+from github_runner_manager.openstack_cloud.ssh_connection_pool import SSHConnectionPool
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +37,11 @@ logger = logging.getLogger(__name__)
 _SECURITY_GROUP_NAME = "github-runner-v1"
 
 _SSH_TIMEOUT = 30
+# Re-authenticate a cached connection if the token expires within this amount of seconds.
+_TOKEN_REFRESH_MARGIN = 5 * 60
 _TEST_STRING = "test_string"
+_SERVER_STATUS_ACTIVE = "ACTIVE"
+_SERVER_STATUS_ERROR = "ERROR"
 
 
 @dataclass
@@ -67,6 +76,7 @@ class OpenstackInstance:
         created_at: The timestamp in which the instance was created at.
         instance_id: ID used by OpenstackCloud class to manage the instances. See docs on the
             OpenstackCloud.
+        metadata: The metadata key-value pairs of the server.
         server_id: ID of server assigned by OpenStack.
         server_name: Name of the server on OpenStack.
         status: Status of the server.
@@ -75,6 +85,7 @@ class OpenstackInstance:
     addresses: list[str]
     created_at: datetime
     instance_id: str
+    metadata: dict[str, str]
     server_id: str
     server_name: str
     status: str
@@ -101,6 +112,7 @@ class OpenstackInstance:
         ]
         self.created_at = datetime.strptime(server.created_at, "%Y-%m-%dT%H:%M:%SZ")
         self.instance_id = server.name[len(prefix) + 1 :]
+        self.metadata = dict(server.metadata or {})
         self.server_id = server.id
         self.server_name = server.name
         self.status = server.status
@@ -146,21 +158,99 @@ def _catch_openstack_errors(func: Callable[P, T]) -> Callable[P, T]:
     return exception_handling_wrapper
 
 
-@contextmanager
-def _get_openstack_connection(credentials: OpenStackCredentials) -> Iterator[OpenstackConnection]:
-    """Create a connection context managed object, to be used within with statements.
+@dataclass
+class OpenstackConnectionStats:
+    """Statistics on the authentication with OpenStack in the current process.
+
+    Attributes:
+        auth_handshakes: The number of token requests made to Keystone.
+        auth_handshakes_avoided: The number of times an authenticated connection was reused
+            without a token request.
+    """
+
+    auth_handshakes: int = 0
+    auth_handshakes_avoided: int = 0
+
+
+class _OpenstackConnectionCache:
+    """Cache of authenticated OpenStack connections shared by the threads of a process.
+
+    The connections are keyed by the credentials. The Keystone token of a connection is reused
+    until it is about to expire. Connections are never shared across processes, a forked child
+    process (e.g., the workers of multiprocessing.Pool) starts with an empty cache.
+    """
+
+    def __init__(self) -> None:
+        """Construct the object."""
+        self._lock = threading.Lock()
+        self._connections: dict[tuple, OpenstackConnection] = {}
+        self.stats = OpenstackConnectionStats()
 
-    Using the context manager ensures that the connection is properly closed after use.
+    def reset_after_fork(self) -> None:
+        """Drop the state inherited from the parent process.
+
+        The connections inherited share sockets with the parent process, hence they are dropped
+        without closing them.
+        """
+        self._lock = threading.Lock()
+        self._connections = {}
+        self.stats = OpenstackConnectionStats()
+
+    def get(self, credentials: OpenStackCredentials) -> OpenstackConnection:
+        """Get an authenticated connection.
+
+        Args:
+            credentials: The OpenStack authorization information.
+
+        Returns:
+            An authenticated openstack.connection.Connection object.
+        """
+        key = astuple(credentials)
+        with self._lock:
+            conn = self._connections.get(key)
+            if conn is None:
+                conn = _connect(credentials)
+                self._connections[key] = conn
+                self.stats.auth_handshakes += 1
+            elif _is_token_expiring(conn):
+                logger.debug("OpenStack token about to expire, re-authenticating")
+                # The connection might be in use by other threads, hence only the token is
+                # refreshed.
+                conn.session.auth.invalidate()
+                conn.authorize()
+                self.stats.auth_handshakes += 1
+            else:
+                self.stats.auth_handshakes_avoided += 1
+            return conn
+
+    def invalidate(self, credentials: OpenStackCredentials) -> None:
+        """Remove the connection of the credentials from the cache.
+
+        The connection is not closed as it might still be in use by other threads.
+
+        Args:
+            credentials: The OpenStack authorization information.
+        """
+        with self._lock:
+            self._connections.pop(astuple(credentials), None)
+
+
+def _connect(credentials: OpenStackCredentials) -> OpenstackConnection:
+    """Create an authenticated connection to OpenStack.
 
     Args:
         credentials: The OpenStack authorization information.
 
-    Yields:
-        An openstack.connection.Connection object.
+    Raises:
+        SDKException: Unable to authorize the connection.
+        ClientException: Unable to authorize the connection.
+
+    Returns:
+        An authenticated openstack.connection.Connection object.
     """
     # api documents that keystoneauth1.exceptions.MissingRequiredOptions can be raised but
     # I could not reproduce it. Therefore, no catch here for such exception.
-    with openstack.connect(
+    conn = openstack.connect(
         auth_url=credentials.auth_url,
         project_name=credentials.project_name,
         username=credentials.username,
@@ -168,9 +258,69 @@ def _get_openstack_connection(credentials: OpenStackCredentials) -> Iterator[Ope
         region_name=credentials.region_name,
         user_domain_name=credentials.user_domain_name,
         project_domain_name=credentials.project_domain_name,
-    ) as conn:
+    )
+    try:
         conn.authorize()
+    except (openstack.exceptions.SDKException, keystoneauth1.exceptions.ClientException):
+        conn.close()
+        raise
+    return conn
+
+
+def _is_token_expiring(conn: OpenstackConnection) -> bool:
+    """Check whether the token of the connection needs to be refreshed.
+
+    Args:
+        conn: The OpenStack connection.
+
+    Returns:
+        Whether the token is missing or expires within the refresh margin.
+    """
+    auth_ref = getattr(conn.session.auth, "auth_ref", None)
+    return auth_ref is None or auth_ref.will_expire_soon(_TOKEN_REFRESH_MARGIN)
+
+
+_connection_cache = _OpenstackConnectionCache()
+os.register_at_fork(after_in_child=_connection_cache.reset_after_fork)
+
+
+def get_connection_stats() -> OpenstackConnectionStats:
+    """Get statistics on the authentication with OpenStack in the current process.
+
+    Returns:
+        A copy of the connection statistics.
+    """
+    return replace(_connection_cache.stats)
+
+
+@contextmanager
+def _get_openstack_connection(credentials: OpenStackCredentials) -> Iterator[OpenstackConnection]:
+    """Get an authenticated connection context managed object, to be used within with statements.
+
+    The connection is shared with other calls of the current process and kept open after use, the
+    token is only requested again when it is about to expire. A connection that failed to
+    authenticate is dropped from the cache.
+
+    Args:
+        credentials: The OpenStack authorization information.
+
+    Yields:
+        An openstack.connection.Connection object.
+
+    Raises:
+        ClientException: Authentication of the connection failed.
+        HttpException: The connection was no longer authorized.
+    """
+    conn = _connection_cache.get(credentials)
+    try:
         yield conn
+    except keystoneauth1.exceptions.ClientException:
+        _connection_cache.invalidate(credentials)
+        raise
+    except openstack.exceptions.HttpException as exc:
+        if exc.status_code == 401:
+            _connection_cache.invalidate(credentials)
+        raise
 
 
 class OpenstackCloud:
@@ -194,12 +344,21 @@ class OpenstackCloud:
         self.prefix = prefix
         self._system_user = system_user
         self._ssh_key_dir = Path(f"~{system_user}").expanduser() / ".ssh"
+        self._ssh_connections = SSHConnectionPool()
 
     @_catch_openstack_errors
-    # Ignore "Too many arguments" as 6 args should be fine. Move to a dataclass if new args are
-    # added.
+    # Ignore "Too many arguments" as the server settings plus the wait flag should be fine. Move
+    # the server settings to a dataclass if new args are added.
     def launch_instance(  # pylint: disable=too-many-arguments, too-many-positional-arguments
-        self, instance_id: str, image: str, flavor: str, network: str, cloud_init: str
+        self,
+        instance_id: str,
+        image: str,
+        flavor: str,
+        network: str,
+        cloud_init: str,
+        *,
+        wait: bool = True,
+        metadata: dict[str, str] | None = None,
     ) -> OpenstackInstance:
         """Create an OpenStack instance.
 
@@ -209,6 +368,9 @@ class OpenstackCloud:
             flavor: The flavor used to create the instance.
             network: The network used to create the instance.
             cloud_init: The cloud init userdata to startup the instance.
+            wait: Whether to wait for the instance to be ACTIVE. If False, the instance is
+                returned as soon as the creation has been accepted and is likely still building.
+            metadata: The metadata key-value pairs to set on the instance.
 
         Raises:
             OpenStackError: Unable to create OpenStack server.
@@ -232,9 +394,10 @@ class OpenstackCloud:
                     network=network,
                     security_groups=[security_group.id],
                     userdata=cloud_init,
+                    meta=metadata,
                     auto_ip=False,
                     timeout=CREATE_SERVER_TIMEOUT,
-                    wait=True,
+                    wait=wait,
                 )
             except openstack.exceptions.ResourceTimeout as err:
                 logger.exception("Timeout creating openstack server %s", full_name)
@@ -270,6 +433,22 @@ class OpenstackCloud:
                 return OpenstackInstance(server, self.prefix)
         return None
 
+    @_catch_openstack_errors
+    def set_instance_metadata(self, instance_id: str, metadata: dict[str, str]) -> None:
+        """Set metadata key-value pairs on an OpenStack instance.
+
+        Existing keys not in the metadata are kept.
+
+        Args:
+            instance_id: The instance ID of the instance to update.
+            metadata: The metadata key-value pairs to set.
+        """
+        full_name = self.get_server_name(instance_id)
+        logger.info("Setting metadata %s on openstack server %s", metadata, full_name)
+
+        with _get_openstack_connection(credentials=self._credentials) as conn:
+            conn.set_server_metadata(full_name, metadata)
+
     @_catch_openstack_errors
     def delete_instance(self, instance_id: str) -> None:
         """Delete a openstack instance.
@@ -293,6 +472,7 @@ class OpenstackCloud:
             conn: The openstack connection to use.
             full_name: The full name of the server.
         """
+        self._ssh_connections.invalidate(full_name)
         try:
             server = OpenstackCloud._get_and_ensure_unique_server(conn, full_name)
             if server is not None:
@@ -305,11 +485,19 @@ class OpenstackCloud:
             raise OpenStackError(f"Failed to remove openstack runner {full_name}") from err
 
     @_catch_openstack_errors
-    def get_ssh_connection(self, instance: OpenstackInstance) -> SSHConnection:
+    def get_ssh_connection(
+        self, instance: OpenstackInstance, verify_shell: bool = True
+    ) -> SSHConnection:
         """Get SSH connection to an OpenStack instance.
 
+        The connections are pooled per instance, a live connection from a previous call is
+        returned without a new handshake.
+
         Args:
             instance: The OpenStack instance to connect to.
+            verify_shell: Whether to run a test command to verify the connection. If False, the
+                connection is only opened and authenticated, saving a command round-trip for
+                callers that verify the output of their own first command.
 
         Raises:
             SSHError: Unable to get a working SSH connection to the instance.
@@ -327,6 +515,13 @@ class OpenstackCloud:
         if not instance.addresses:
             raise SSHError(f"No addresses found for OpenStack server {instance.server_name}")
 
+        if (
+            pooled_connection := self._ssh_connections.get(
+                instance.server_name, instance.addresses
+            )
+        ) is not None:
+            return pooled_connection
+
         for ip in instance.addresses:
             try:
                 connection = SSHConnection(
@@ -335,6 +530,9 @@ class OpenstackCloud:
                     connect_kwargs={"key_filename": str(key_path)},
                     connect_timeout=_SSH_TIMEOUT,
                 )
+                if not verify_shell:
+                    connection.open()
+                    return self._ssh_connections.put(instance.server_name, connection)
                 result = connection.run(f"echo {_TEST_STRING}", warn=True, timeout=_SSH_TIMEOUT)
                 if not result.ok:
                     logger.warning(
@@ -344,7 +542,7 @@ class OpenstackCloud:
                     )
                     continue
                 if _TEST_STRING in result.stdout:
-                    return connection
+                    return self._ssh_connections.put(instance.server_name, connection)
             except (NoValidConnectionsError, TimeoutError, paramiko.ssh_exception.SSHException):
                 logger.warning(
                     "Unable to SSH into %s with address %s",
@@ -368,11 +566,15 @@ class OpenstackCloud:
         logger.info("Getting all openstack servers managed by the charm")
 
         with _get_openstack_connection(credentials=self._credentials) as conn:
-            instance_list = self._get_openstack_instances(conn)
-            server_names = set(server.name for server in instance_list)
+            # Index the servers by name from a single listing, instead of searching the servers
+            # of each name.
+            servers_by_name: dict[str, list[OpenstackServer]] = defaultdict(list)
+            for server in self._get_openstack_instances(conn):
+                servers_by_name[server.name].append(server)
 
             server_list = [
-                OpenstackCloud._get_and_ensure_unique_server(conn, name) for name in server_names
+                OpenstackCloud._ensure_unique_server(conn, name, servers)
+                for name, servers in servers_by_name.items()
             ]
             return tuple(
                 OpenstackInstance(server, self.prefix)
@@ -380,12 +582,71 @@ class OpenstackCloud:
                 if server is not None
             )
 
+    def wait_instances_active(
+        self,
+        instance_ids: Sequence[str],
+        poll_interval: float,
+        timeout: float = CREATE_SERVER_TIMEOUT,
+    ) -> tuple[OpenstackInstance, ...]:
+        """Wait for instances launched without waiting to be ACTIVE.
+
+        The status of all instances is polled together with a single server listing per poll.
+        Instances that end up in ERROR or are not ACTIVE within the timeout are deleted.
+
+        Args:
+            instance_ids: The instance IDs of the instances being built.
+            poll_interval: The time in seconds between polls of the status.
+            timeout: The time in seconds to wait for the instances.
+
+        Returns:
+            The instances that became ACTIVE.
+        """
+        pending = set(instance_ids)
+        active: list[OpenstackInstance] = []
+        failed: list[str] = []
+        deadline = time.monotonic() + timeout
+        while pending and time.monotonic() < deadline:
+            time.sleep(poll_interval)
+            try:
+                instances = self.get_instances()
+            except OpenStackError:
+                logger.exception("Failed to get the status of the instances being built")
+                continue
+            for instance in (
+                instance for instance in instances if instance.instance_id in pending
+            ):
+                if instance.status == _SERVER_STATUS_ACTIVE:
+                    active.append(instance)
+                elif instance.status == _SERVER_STATUS_ERROR:
+                    logger.error("OpenStack server %s failed to build", instance.server_name)
+                    failed.append(instance.instance_id)
+                else:
+                    continue
+                pending.discard(instance.instance_id)
+        for instance_id in pending:
+            logger.error("Timeout waiting for %s to build", self.get_server_name(instance_id))
+        self._delete_instances_quietly((*failed, *pending))
+        return tuple(active)
+
+    def _delete_instances_quietly(self, instance_ids: Iterable[str]) -> None:
+        """Delete instances, logging failures.
+
+        Args:
+            instance_ids: The instance IDs of the instances to delete.
+        """
+        for instance_id in instance_ids:
+            try:
+                self.delete_instance(instance_id)
+            except OpenStackError:
+                logger.exception("Unable to delete %s", self.get_server_name(instance_id))
+
     @_catch_openstack_errors
     def cleanup(self) -> None:
         """Cleanup unused key files and openstack keypairs."""
         with _get_openstack_connection(credentials=self._credentials) as conn:
             instances = self._get_openstack_instances(conn)
             exclude_list = [server.name for server in instances]
+            self._ssh_connections.retain(exclude_list)
             self._cleanup_key_files(exclude_list)
             self._cleanup_openstack_keypairs(conn, exclude_list)
 
@@ -479,7 +740,24 @@ class OpenstackCloud:
             A server with the name.
         """
         servers: list[OpenstackServer] = conn.search_servers(name)
+        return OpenstackCloud._ensure_unique_server(conn, name, servers)
+
+    @staticmethod
+    def _ensure_unique_server(
+        conn: OpenstackConnection, name: str, servers: list[OpenstackServer]
+    ) -> OpenstackServer | None:
+        """Get the latest server out of the servers with the same name and ensure it is unique.
+
+        The latest server in creation time is returned. Other servers are deleted.
 
+        Args:
+            conn: The connection to OpenStack.
+            name: The name of the servers.
+            servers: The servers with the name.
+
+        Returns:
+            The latest server of the name.
+        """
         if not servers:
             return None
 
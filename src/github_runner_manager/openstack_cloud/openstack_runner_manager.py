@@ -3,27 +3,23 @@
 
 """Manager for self-hosted runner on OpenStack."""
 
+import concurrent.futures
 import logging
 import secrets
 import time
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterator, Sequence
+from typing import Iterable, Iterator, Sequence
 
-import fabric
 import invoke
-import jinja2
-import paramiko
-import paramiko.ssh_exception
 from fabric import Connection as SSHConnection
 
 from github_runner_manager.errors import (
-    CreateMetricsStorageError,
-    GetMetricsStorageError,
     KeyfileError,
     MissingServerConfigError,
     OpenStackError,
     RunnerCreateError,
+    RunnerRemoveError,
     RunnerStartError,
     SSHError,
 )
@@ -36,47 +32,54 @@ from github_runner_manager.manager.cloud_runner_manager import (
     InstanceId,
     SupportServiceConfig,
 )
+from github_runner_manager.manager.create_concurrency import (
+    AdaptiveConcurrencyLimit,
+    CreateOutcome,
+    is_throttled,
+)
 from github_runner_manager.manager.runner_manager import HealthState
+from github_runner_manager.metrics import receiver_process
 from github_runner_manager.metrics import runner as runner_metrics
 from github_runner_manager.metrics import storage as metrics_storage
 from github_runner_manager.metrics.storage import StorageManager
-from github_runner_manager.openstack_cloud import health_checks
+from github_runner_manager.openstack_cloud import (
+    health_cache,
+    health_checks,
+    metrics_exchange,
+    runner_process,
+    warm_pool,
+)
+from github_runner_manager.openstack_cloud.cloud_init import generate_cloud_init
 from github_runner_manager.openstack_cloud.constants import (
     CREATE_SERVER_TIMEOUT,
-    METRICS_EXCHANGE_PATH,
-    RUNNER_LISTENER_PROCESS,
-    RUNNER_WORKER_PROCESS,
+    RUNNER_INSTALLED_TIMESTAMP_PATH,
 )
 from github_runner_manager.openstack_cloud.openstack_cloud import (
     OpenstackCloud,
     OpenStackCredentials,
     OpenstackInstance,
 )
-from github_runner_manager.repo_policy_compliance_client import RepoPolicyComplianceClient
 from github_runner_manager.types_ import SystemUserConfig
-from github_runner_manager.types_.github import GitHubOrg
 from github_runner_manager.utilities import retry, set_env_var
 
 logger = logging.getLogger(__name__)
 
 BUILD_OPENSTACK_IMAGE_SCRIPT_FILENAME = "scripts/build-openstack-image.sh"
-_CONFIG_SCRIPT_PATH = Path("/home/ubuntu/actions-runner/config.sh")
-
-RUNNER_APPLICATION = Path("/home/ubuntu/actions-runner")
-PRE_JOB_SCRIPT = RUNNER_APPLICATION / "pre-job.sh"
-MAX_METRICS_FILE_SIZE = 1024
 
 RUNNER_STARTUP_PROCESS = "/home/ubuntu/actions-runner/run.sh"
+# Max time in seconds to block on the runner for the readiness signal per startup check.
+RUNNER_READINESS_WAIT_TIMEOUT = 60
 
 OUTDATED_METRICS_STORAGE_IN_SECONDS = CREATE_SERVER_TIMEOUT + 30  # add a bit on top of the timeout
 
-
-class _GithubRunnerRemoveError(Exception):
-    """Represents an error while SSH into a runner and running the remove script."""
-
-
-class _PullFileError(Exception):
-    """Represents an error while pulling a file from the runner instance."""
+# Limits of the pipelined creation, the runner creation requests follow the adaptive concurrency.
+_CREATE_REQUEST_CONCURRENCY = 10
+_READINESS_CHECK_CONCURRENCY = 50
+_SERVER_STATUS_POLL_INTERVAL = 5
+_FLUSH_CONCURRENCY = 50
+_METRICS_EXTRACT_CONCURRENCY = 10
+# Covers the retries of the SSH connection and of the kill command of a single instance.
+DEFAULT_FLUSH_TIMEOUT_IN_SECONDS = 180
 
 
 @dataclass
@@ -95,7 +98,7 @@ class OpenStackServerConfig:
 
 
 @dataclass
-class OpenStackRunnerManagerConfig:
+class OpenStackRunnerManagerConfig:  # pylint: disable=too-many-instance-attributes
     """Configuration for OpenStack runner manager.
 
     Attributes:
@@ -106,6 +109,17 @@ class OpenStackRunnerManagerConfig:
         runner_config: The configuration for the GitHub runner.
         service_config: The configuration for supporting services.
         system_user_config: The user to use for creating metrics storage.
+        health_check_concurrency: The maximum number of runner health checks run concurrently.
+        health_check_timeout: The deadline in seconds for the health check of a single runner.
+        warm_pool_size: The maximum number of pre-booted instances kept waiting for a job in
+            reactive mode. 0 disables the warm pool.
+        health_cache_idle_ttl: The time in seconds to reuse the health check result of an idle
+            runner. 0 disables the health cache.
+        health_cache_busy_ttl: The time in seconds to reuse the health check result of a busy
+            runner.
+        flush_timeout: The deadline in seconds for flushing all the runners.
+        metrics_storage_on_tmpfs: Whether to keep the metrics storage of the runners on a tmpfs.
+            The metrics not extracted yet are lost on reboot of the host.
     """
 
     name: str
@@ -115,6 +129,13 @@ class OpenStackRunnerManagerConfig:
     runner_config: GitHubRunnerConfig
     service_config: SupportServiceConfig
     system_user_config: SystemUserConfig
+    health_check_concurrency: int = health_checks.DEFAULT_HEALTH_CHECK_CONCURRENCY
+    health_check_timeout: float = health_checks.DEFAULT_HEALTH_CHECK_TIMEOUT_IN_SECONDS
+    warm_pool_size: int = 0
+    health_cache_idle_ttl: float = health_cache.DEFAULT_IDLE_TTL_IN_SECONDS
+    health_cache_busy_ttl: float = health_cache.DEFAULT_BUSY_TTL_IN_SECONDS
+    flush_timeout: float = DEFAULT_FLUSH_TIMEOUT_IN_SECONDS
+    metrics_storage_on_tmpfs: bool = False
 
 
 @dataclass
@@ -124,16 +145,19 @@ class _RunnerHealth:
     Attributes:
         healthy: The list of healthy runners.
         unhealthy:  The list of unhealthy runners.
+        unknown: The list of runners whose health check did not complete in time.
     """
 
     healthy: tuple[OpenstackInstance, ...]
     unhealthy: tuple[OpenstackInstance, ...]
+    unknown: tuple[OpenstackInstance, ...] = ()
 
 
 class OpenStackRunnerManager(CloudRunnerManager):
     """Manage self-hosted runner on OpenStack cloud.
 
     Attributes:
+        health_cache: The cache of the runner health check results, with hit and miss counters.
         name_prefix: The name prefix of the runners created.
     """
 
@@ -153,8 +177,19 @@ class OpenStackRunnerManager(CloudRunnerManager):
             prefix=self.name_prefix,
             system_user=config.system_user_config.user,
         )
+        self._warm_pool = warm_pool.WarmPool(
+            openstack_cloud=self._openstack_cloud, max_size=config.warm_pool_size
+        )
+        self.health_cache = health_cache.HealthCache(
+            idle_ttl=config.health_cache_idle_ttl, busy_ttl=config.health_cache_busy_ttl
+        )
         self._system_user_config = config.system_user_config
-        self._metrics_storage_manager = metrics_storage.StorageManager(
+        storage_manager_class = (
+            metrics_storage.TmpfsStorageManager
+            if config.metrics_storage_on_tmpfs
+            else metrics_storage.StorageManager
+        )
+        self._metrics_storage_manager = storage_manager_class(
             system_user_config=config.system_user_config
         )
 
@@ -179,12 +214,14 @@ class OpenStackRunnerManager(CloudRunnerManager):
     def create_runner(self, registration_token: str) -> InstanceId:
         """Create a self-hosted runner.
 
+        The runner is created on an instance claimed from the warm pool if one is ready, else on
+        a newly launched instance.
+
         Args:
             registration_token: The GitHub registration token for registering runners.
 
         Raises:
             MissingServerConfigError: Unable to create runner due to missing configuration.
-            RunnerCreateError: Unable to create runner due to OpenStack issues.
 
         Returns:
             Instance ID of the runner.
@@ -192,32 +229,197 @@ class OpenStackRunnerManager(CloudRunnerManager):
         if (server_config := self._config.server_config) is None:
             raise MissingServerConfigError("Missing server configuration to create runners")
 
-        start_timestamp = time.time()
-        instance_id = OpenStackRunnerManager._generate_instance_id()
-        instance_name = self._openstack_cloud.get_server_name(instance_id=instance_id)
-        self._init_metrics_storage(name=instance_name, install_start_timestamp=start_timestamp)
+        if (instance := self._warm_pool.claim(registration_token)) is not None:
+            self.health_cache.invalidate(instance.instance_id)
+            metrics_exchange.init_metrics_storage(
+                metrics_storage_manager=self._metrics_storage_manager,
+                name=instance.server_name,
+                install_start_timestamp=time.time(),
+            )
+        else:
+            instance = self._launch_runner(registration_token, server_config, wait=True)
+        self._wait_runner_ready(instance)
+
+        logger.info("Runner %s created successfully", instance.server_name)
+        return instance.instance_id
+
+    def create_runners(
+        self, registration_token: str, num: int, concurrency: AdaptiveConcurrencyLimit
+    ) -> tuple[InstanceId, ...]:
+        """Create self-hosted runners with the creation of the instances pipelined.
+
+        The creation of all servers is requested first without waiting for them to boot, with
+        as many requests in flight as the concurrency limit. The servers are then tracked
+        together by a single status polling loop, and the runners on the servers that became
+        ACTIVE are waited for concurrently. Creating many runners therefore takes about the time
+        of a single boot. The outcome of each creation is recorded in the concurrency limit.
+
+        Args:
+            registration_token: The GitHub registration token for registering runners.
+            num: The number of runners to create.
+            concurrency: The limit on the number of runners created concurrently, updated with
+                the outcome of the creations.
+
+        Raises:
+            MissingServerConfigError: Unable to create runner due to missing configuration.
+
+        Returns:
+            The instance IDs of the runners created successfully.
+        """
+        if (server_config := self._config.server_config) is None:
+            raise MissingServerConfigError("Missing server configuration to create runners")
 
-        cloud_init = self._generate_cloud_init(
-            instance_name=instance_name, registration_token=registration_token
+        start = time.monotonic()
+        requested = self._launch_runners(registration_token, server_config, num, concurrency)
+        logger.info("Requested creation of %s runner servers", len(requested))
+
+        active = self._openstack_cloud.wait_instances_active(
+            instance_ids=[instance.instance_id for instance in requested],
+            poll_interval=_SERVER_STATUS_POLL_INTERVAL,
         )
+        for _ in range(len(requested) - len(active)):
+            concurrency.record(CreateOutcome(duration=time.monotonic() - start, failed=True))
+        if not active:
+            return ()
+        return self._wait_runners_ready(active, start, concurrency)
+
+    def _wait_runners_ready(
+        self,
+        instances: Sequence[OpenstackInstance],
+        start: float,
+        concurrency: AdaptiveConcurrencyLimit,
+    ) -> tuple[InstanceId, ...]:
+        """Wait concurrently for the runners on ACTIVE instances to be ready.
+
+        Args:
+            instances: The runner instances.
+            start: The monotonic time the creation of the runners started.
+            concurrency: The limit on the number of runners created concurrently, updated with
+                the outcome of the creations.
+
+        Returns:
+            The instance IDs of the runners ready.
+        """
+
+        def _wait_ready(instance: OpenstackInstance) -> tuple[InstanceId | None, CreateOutcome]:
+            """Wait for the runner on an instance to be ready.
+
+            Args:
+                instance: The runner instance.
+
+            Returns:
+                The instance ID if the runner is ready, else None, and the outcome.
+            """
+            try:
+                self._wait_runner_ready(instance)
+            except RunnerStartError:
+                logger.exception("Runner on %s failed to start.", instance.server_name)
+                return None, CreateOutcome(duration=time.monotonic() - start, failed=True)
+            logger.info("Runner %s created successfully", instance.server_name)
+            return instance.instance_id, CreateOutcome(duration=time.monotonic() - start)
+
+        instance_ids = []
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(len(instances), _READINESS_CHECK_CONCURRENCY),
+            thread_name_prefix="readiness",
+        ) as executor:
+            # The outcomes are recorded in this thread, the limit is not thread-safe.
+            for instance_id, outcome in executor.map(_wait_ready, instances):
+                concurrency.record(outcome)
+                if instance_id is not None:
+                    instance_ids.append(instance_id)
+        return tuple(instance_ids)
+
+    def reconcile_metrics_receiver(self) -> None:
+        """Keep the process receiving the metrics pushed by the runners running as configured."""
         try:
-            instance = self._openstack_cloud.launch_instance(
-                instance_id=instance_id,
-                image=server_config.image,
-                flavor=server_config.flavor,
-                network=server_config.network,
-                cloud_init=cloud_init,
+            receiver_process.reconcile(
+                self._config.service_config.metrics_receiver,
+                system_user=self._config.system_user_config,
+                storage_on_tmpfs=self._config.metrics_storage_on_tmpfs,
             )
-        except OpenStackError as err:
-            raise RunnerCreateError(f"Failed to create {instance_name} openstack runner") from err
+        except receiver_process.MetricsReceiverError:
+            logger.exception("Failed to reconcile the metrics receiver process")
 
-        logger.debug("Waiting for runner process to startup: %s", instance.server_name)
-        self._wait_runner_startup(instance)
-        logger.debug("Waiting for runner process to be running: %s", instance.server_name)
-        self._wait_runner_running(instance)
+    def refill_warm_pool(self, queue_size: int) -> int:
+        """Launch instances into the warm pool to match the recent job throughput.
 
-        logger.info("Runner %s created successfully", instance.server_name)
-        return instance_id
+        The instances are launched without waiting for them to boot, they get ready in the
+        background.
+
+        Args:
+            queue_size: The number of jobs waiting in the queue.
+
+        Returns:
+            The number of instances launched.
+        """
+        if (server_config := self._config.server_config) is None:
+            return 0
+        if (num := self._warm_pool.get_refill_count(queue_size)) <= 0:
+            return 0
+        launched = self._launch_runners(None, server_config, num)
+        logger.info("Launched %s instances into the warm pool", len(launched))
+        return len(launched)
+
+    def report_github_states(
+        self, busy: Iterable[InstanceId], offline: Iterable[InstanceId]
+    ) -> None:
+        """Report the state of the runners on GitHub to the health cache.
+
+        Args:
+            busy: The instance IDs of the runners GitHub reports busy.
+            offline: The instance IDs of the runners GitHub reports offline.
+        """
+        self.health_cache.update_github_states(busy=busy, offline=offline)
+
+    def _launch_runners(
+        self,
+        registration_token: str | None,
+        server_config: OpenStackServerConfig,
+        num: int,
+        concurrency: AdaptiveConcurrencyLimit | None = None,
+    ) -> list[OpenstackInstance]:
+        """Request the creation of runner servers without waiting for them to boot.
+
+        Args:
+            registration_token: The GitHub registration token for registering runners, None for
+                instances of the warm pool.
+            server_config: The configuration for OpenStack server.
+            num: The number of servers to create.
+            concurrency: The limit on the number of requests in flight, updated with the failed
+                requests. Defaults to a fixed limit.
+
+        Returns:
+            The instances being built.
+        """
+
+        def _launch(_: int) -> tuple[OpenstackInstance | None, CreateOutcome]:
+            """Request the creation of a runner server.
+
+            Returns:
+                The instance being built, or None if the request failed, and the outcome.
+            """
+            start = time.monotonic()
+            try:
+                instance = self._launch_runner(registration_token, server_config, wait=False)
+            except RunnerCreateError as exc:
+                logger.exception("Failed to request the creation of a runner server.")
+                return None, CreateOutcome(
+                    duration=time.monotonic() - start, failed=True, throttled=is_throttled(exc)
+                )
+            return instance, CreateOutcome(duration=time.monotonic() - start)
+
+        max_workers = concurrency.limit if concurrency is not None else _CREATE_REQUEST_CONCURRENCY
+        instances = []
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(num, max_workers), thread_name_prefix="launch"
+        ) as executor:
+            for instance, outcome in executor.map(_launch, range(num)):
+                if instance is not None:
+                    instances.append(instance)
+                elif concurrency is not None:
+                    concurrency.record(outcome)
+        return instances
 
     def get_runner(self, instance_id: InstanceId) -> CloudRunnerInstance | None:
         """Get a self-hosted runner by instance id.
@@ -260,21 +462,21 @@ class OpenStackRunnerManager(CloudRunnerManager):
         Returns:
             Information on the runner instances.
         """
-        instance_list = self._openstack_cloud.get_instances()
+        all_instances = self._openstack_cloud.get_instances()
+        self.health_cache.prune(all_instances)
+        # Instances waiting in the warm pool are not runners until claimed.
+        instances = tuple(
+            instance for instance in all_instances if not warm_pool.is_waiting(instance)
+        )
+        health_results = self._check_runners(instances)
         instance_list = [
             CloudRunnerInstance(
                 name=instance.server_name,
                 instance_id=instance.instance_id,
-                health=(
-                    HealthState.HEALTHY
-                    if health_checks.check_runner(
-                        openstack_cloud=self._openstack_cloud, instance=instance
-                    )
-                    else HealthState.UNHEALTHY
-                ),
+                health=health_checks.to_health_state(health_results.get(instance.instance_id)),
                 state=CloudRunnerState.from_openstack_server_status(instance.status),
             )
-            for instance in instance_list
+            for instance in instances
         ]
         if states is None:
             return tuple(instance_list)
@@ -321,6 +523,9 @@ class OpenStackRunnerManager(CloudRunnerManager):
     ) -> Iterator[runner_metrics.RunnerMetrics]:
         """Remove idle and/or busy runners.
 
+        The runners are flushed concurrently. The flushes not started within the flush timeout are
+        cancelled, the instances still being flushed are left out of the cleanup that follows.
+
         Args:
             remove_token:
             busy: If false, only idle runners are removed. If true, both idle and busy runners are
@@ -329,44 +534,97 @@ class OpenStackRunnerManager(CloudRunnerManager):
         Returns:
             Any metrics retrieved from flushed runners.
         """
+        # Flushing stops the runner processes, the health of the runners changes.
+        self.health_cache.clear()
         instance_list = self._openstack_cloud.get_instances()
-        for instance in instance_list:
+        running: list[OpenstackInstance] = []
+        if instance_list:
+            executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=min(len(instance_list), _FLUSH_CONCURRENCY), thread_name_prefix="flush"
+            )
             try:
-                logger.debug(
-                    "Checking runner state and flushing %s %s",
-                    instance.server_id,
-                    instance.server_name,
-                )
-                self._check_state_and_flush(instance, busy)
-            except SSHError:
+                tasks = {
+                    executor.submit(self._flush_instance, instance, remove_token, busy): instance
+                    for instance in instance_list
+                }
+                done, not_done = concurrent.futures.wait(tasks, timeout=self._config.flush_timeout)
+            finally:
+                executor.shutdown(wait=False, cancel_futures=True)
+            running = [tasks[future] for future in not_done if not future.cancel()]
+            if not_done:
                 logger.warning(
-                    "Unable to determine state of  %s and kill runner process due to SSH issues",
-                    instance.server_name,
+                    "Flush did not complete within %s seconds on: %s",
+                    self._config.flush_timeout,
+                    sorted(tasks[future].server_name for future in not_done),
                 )
-                continue
+            for future in done:
+                future.result()
         logger.debug("Runners successfully flushed, cleaning up.")
-        return self.cleanup(remove_token)
+        runners = [
+            CloudRunnerInstance(
+                name=instance.server_name,
+                instance_id=instance.instance_id,
+                health=HealthState.UNKNOWN,
+                state=CloudRunnerState.from_openstack_server_status(instance.status),
+            )
+            for instance in running
+        ]
+        return self.cleanup(remove_token, runners=runners)
+
+    def _flush_instance(self, instance: OpenstackInstance, remove_token: str, busy: bool) -> None:
+        """Flush the runner of an instance.
+
+        Args:
+            instance: The OpenStack instance.
+            remove_token: The GitHub remove token.
+            busy: If false, only an idle runner is flushed. If true, a busy runner is flushed too.
+        """
+        if warm_pool.is_waiting(instance):
+            # The waiting instances have no runner process, they are only flushed with the
+            # busy runners as they could have been launched with an outdated configuration.
+            if busy:
+                self._delete_runner(instance, remove_token)
+            return
+        try:
+            logger.debug(
+                "Checking runner state and flushing %s %s",
+                instance.server_id,
+                instance.server_name,
+            )
+            self._check_state_and_flush(instance, busy)
+        except SSHError:
+            logger.warning(
+                "Unable to determine state of  %s and kill runner process due to SSH issues",
+                instance.server_name,
+            )
 
-    def cleanup(self, remove_token: str) -> Iterator[runner_metrics.RunnerMetrics]:
+    def cleanup(
+        self, remove_token: str, runners: Sequence[CloudRunnerInstance] | None = None
+    ) -> Iterator[runner_metrics.RunnerMetrics]:
         """Cleanup runner and resource on the cloud.
 
         Args:
             remove_token: The GitHub remove token.
+            runners: The runners with their health known from a recent state snapshot. Only the
+                instances missing from it are health checked.
 
         Returns:
             Any metrics retrieved from cleanup runners.
         """
         logger.debug("Getting runner healths for cleanup.")
-        runners = self._get_runners_health()
+        known_health = {runner.instance_id: runner.health for runner in runners or ()}
+        runner_health = self._get_runners_health(known_health)
 
-        healthy_runner_names = {runner.server_name for runner in runners.healthy}
-        unhealthy_runner_names = {runner.server_name for runner in runners.unhealthy}
+        healthy_runner_names = {runner.server_name for runner in runner_health.healthy}
+        unhealthy_runner_names = {runner.server_name for runner in runner_health.unhealthy}
+        unknown_runner_names = {runner.server_name for runner in runner_health.unknown}
         logger.debug("Healthy runners: %s", healthy_runner_names)
         logger.debug("Unhealthy runners: %s", unhealthy_runner_names)
+        logger.debug("Runners with unknown health: %s", unknown_runner_names)
 
         logger.debug("Deleting unhealthy runners.")
-        for runner in runners.unhealthy:
-            self._delete_runner(runner, remove_token)
+        for instance in runner_health.unhealthy:
+            self._delete_runner(instance, remove_token)
         logger.debug("Cleaning up runner resources.")
         self._openstack_cloud.cleanup()
         logger.debug("Cleanup completed successfully.")
@@ -374,7 +632,8 @@ class OpenStackRunnerManager(CloudRunnerManager):
         logger.debug("Extracting metrics.")
         return self._cleanup_extract_metrics(
             metrics_storage_manager=self._metrics_storage_manager,
-            healthy_runner_names=healthy_runner_names,
+            # Runners with unknown health are kept, their metrics storage is not dangling.
+            healthy_runner_names=healthy_runner_names | unknown_runner_names,
             unhealthy_runner_names=unhealthy_runner_names,
         )
 
@@ -400,22 +659,18 @@ class OpenStackRunnerManager(CloudRunnerManager):
         # that should not be cleaned up.
         # On the other hand, there could be storage for runners from the past that
         # should be cleaned up.
-        all_runner_names = healthy_runner_names | unhealthy_runner_names
-        unmatched_metrics_storage = (
-            ms
-            for ms in metrics_storage_manager.list_all()
-            if ms.runner_name not in all_runner_names
-        )
         # We assume that storage is dangling if it has not been updated for a long time.
+        all_runner_names = healthy_runner_names | unhealthy_runner_names
         dangling_storage_runner_names = {
             ms.runner_name
-            for ms in unmatched_metrics_storage
-            if ms.path.stat().st_mtime < time.time() - OUTDATED_METRICS_STORAGE_IN_SECONDS
+            for ms in metrics_storage_manager.list_outdated(OUTDATED_METRICS_STORAGE_IN_SECONDS)
+            if ms.runner_name not in all_runner_names
         }
         return runner_metrics.extract(
             metrics_storage_manager=metrics_storage_manager,
             runners=unhealthy_runner_names | dangling_storage_runner_names,
             include=True,
+            concurrency=_METRICS_EXTRACT_CONCURRENCY,
         )
 
     def _delete_runner(self, instance: OpenstackInstance, remove_token: str) -> None:
@@ -425,15 +680,23 @@ class OpenStackRunnerManager(CloudRunnerManager):
             instance: The OpenStack instance.
             remove_token: The GitHub remove token.
         """
+        if warm_pool.is_waiting(instance):
+            # The runner is neither registered nor has metrics before the instance is claimed.
+            self._delete_instance(instance)
+            return
         try:
             ssh_conn = self._openstack_cloud.get_ssh_connection(instance)
-            self._pull_runner_metrics(instance.server_name, ssh_conn)
+            metrics_exchange.pull_runner_metrics(
+                metrics_storage_manager=self._metrics_storage_manager,
+                name=instance.server_name,
+                ssh_conn=ssh_conn,
+            )
 
             try:
-                OpenStackRunnerManager._run_runner_removal_script(
+                runner_process.run_runner_removal_script(
                     instance.server_name, ssh_conn, remove_token
                 )
-            except _GithubRunnerRemoveError:
+            except RunnerRemoveError:
                 logger.warning(
                     "Unable to run github runner removal script for %s",
                     instance.server_name,
@@ -446,7 +709,15 @@ class OpenStackRunnerManager(CloudRunnerManager):
             logger.warning(
                 "Skipping runner remove script for %s due to SSH issues", instance.server_name
             )
+        self._delete_instance(instance)
+
+    def _delete_instance(self, instance: OpenstackInstance) -> None:
+        """Delete the OpenStack instance of a runner.
 
+        Args:
+            instance: The OpenStack instance.
+        """
+        self.health_cache.invalidate(instance.instance_id)
         try:
             self._openstack_cloud.delete_instance(instance.instance_id)
         except OpenStackError:
@@ -454,100 +725,64 @@ class OpenStackRunnerManager(CloudRunnerManager):
                 "Unable to delete openstack instance for runner %s", instance.server_name
             )
 
-    def _get_runners_health(self) -> _RunnerHealth:
+    def _get_runners_health(
+        self, known_health: dict[InstanceId, HealthState] | None = None
+    ) -> _RunnerHealth:
         """Get runners by health state.
 
+        Args:
+            known_health: The health of runners already checked, these are not checked again.
+
         Returns:
             Runners by health state.
         """
+        known_health = known_health or {}
         runner_list = self._openstack_cloud.get_instances()
+        self.health_cache.prune(runner_list)
+        health_results = self._check_runners(
+            [runner for runner in runner_list if runner.instance_id not in known_health]
+        )
+        health_results.update(
+            {
+                instance_id: health_checks.from_health_state(health)
+                for instance_id, health in known_health.items()
+            }
+        )
 
-        healthy, unhealthy = [], []
+        healthy, unhealthy, unknown = [], [], []
         for runner in runner_list:
-            if health_checks.check_runner(openstack_cloud=self._openstack_cloud, instance=runner):
+            result = health_results.get(runner.instance_id)
+            if result is None:
+                unknown.append(runner)
+            elif result:
                 healthy.append(runner)
             else:
                 unhealthy.append(runner)
-        return _RunnerHealth(healthy=tuple(healthy), unhealthy=tuple(unhealthy))
-
-    def _generate_cloud_init(self, instance_name: str, registration_token: str) -> str:
-        """Generate cloud init userdata.
+        return _RunnerHealth(
+            healthy=tuple(healthy), unhealthy=tuple(unhealthy), unknown=tuple(unknown)
+        )
 
-        This is the script the openstack server runs on startup.
+    def _check_runners(
+        self, instances: Sequence[OpenstackInstance]
+    ) -> dict[InstanceId, bool | None]:
+        """Run health checks concurrently on the runner instances without a cached result.
 
         Args:
-            instance_name: The name of the instance.
-            registration_token: The GitHub runner registration token.
+            instances: The instances hosting the runners.
 
         Returns:
-            The cloud init userdata for openstack instance.
+            The health check result by instance ID, None if the check did not finish in time.
         """
-        jinja = jinja2.Environment(
-            loader=jinja2.PackageLoader("github_runner_manager", "templates"), autoescape=True
-        )
-
-        service_config = self._config.service_config
-        env_contents = jinja.get_template("env.j2").render(
-            pre_job_script=str(PRE_JOB_SCRIPT),
-            dockerhub_mirror=service_config.dockerhub_mirror or "",
-            ssh_debug_info=(
-                secrets.choice(service_config.ssh_debug_connections)
-                if service_config.ssh_debug_connections
-                else None
-            ),
+        cached, to_check = self.health_cache.lookup(instances)
+        results: dict[InstanceId, bool | None] = health_checks.check_runners(
+            openstack_cloud=self._openstack_cloud,
+            instances=to_check,
+            max_workers=self._config.health_check_concurrency,
+            timeout=self._config.health_check_timeout,
         )
-
-        pre_job_contents_dict = {
-            "issue_metrics": True,
-            "metrics_exchange_path": str(METRICS_EXCHANGE_PATH),
-            "do_repo_policy_check": False,
-        }
-        repo_policy = self._get_repo_policy_compliance_client()
-        if repo_policy is not None:
-            pre_job_contents_dict.update(
-                {
-                    "repo_policy_base_url": repo_policy.base_url,
-                    "repo_policy_one_time_token": repo_policy.get_one_time_token(),
-                    "do_repo_policy_check": True,
-                }
-            )
-
-        pre_job_contents = jinja.get_template("pre-job.j2").render(pre_job_contents_dict)
-
-        runner_group = None
-        runner_config = self._config.runner_config
-        if isinstance(runner_config.github_path, GitHubOrg):
-            runner_group = runner_config.github_path.group
-        aproxy_address = (
-            service_config.proxy_config.aproxy_address
-            if service_config.proxy_config is not None
-            else None
-        )
-        return jinja.get_template("openstack-userdata.sh.j2").render(
-            github_url=f"https://github.com/{runner_config.github_path.path()}",
-            runner_group=runner_group,
-            token=registration_token,
-            instance_labels=",".join(runner_config.labels),
-            instance_name=instance_name,
-            env_contents=env_contents,
-            pre_job_contents=pre_job_contents,
-            metrics_exchange_path=str(METRICS_EXCHANGE_PATH),
-            aproxy_address=aproxy_address,
-            dockerhub_mirror=service_config.dockerhub_mirror,
-        )
-
-    def _get_repo_policy_compliance_client(self) -> RepoPolicyComplianceClient | None:
-        """Get repo policy compliance client.
-
-        Returns:
-            The repo policy compliance client.
-        """
-        if (service_config := self._config.service_config).repo_policy_compliance is not None:
-            return RepoPolicyComplianceClient(
-                service_config.repo_policy_compliance.url,
-                service_config.repo_policy_compliance.token,
-            )
-        return None
+        self.health_cache.store(to_check, results)
+        results.update(cached)
+        return results
 
     @retry(tries=3, delay=5, backoff=2, local_logger=logger)
     def _check_state_and_flush(self, instance: OpenstackInstance, busy: bool) -> None:
@@ -579,41 +814,17 @@ class OpenStackRunnerManager(CloudRunnerManager):
             )
             raise
 
-        # Using a single command to determine the state and kill the process if needed.
-        # This makes it more robust when network is unstable.
-        if busy:
-            logger.info("Attempting to kill all runner process on %s", instance.server_name)
-            # kill both Runner.Listener and Runner.Worker processes.
-            # This kills pre-job.sh, a child process of Runner.Worker.
-            kill_command = (
-                f"pgrep -x {RUNNER_LISTENER_PROCESS} && "
-                f"kill $(pgrep -x {RUNNER_LISTENER_PROCESS});"
-                f"pgrep -x {RUNNER_WORKER_PROCESS} && kill $(pgrep -x {RUNNER_WORKER_PROCESS});"
-            )
-        else:
-            logger.info(
-                "Attempting to kill runner process on %s if not busy", instance.server_name
-            )
-            # Only kill Runner.Listener if Runner.Worker does not exist.
-            kill_command = (
-                f"! pgrep -x {RUNNER_WORKER_PROCESS} && pgrep -x {RUNNER_LISTENER_PROCESS} && "
-                f"kill $(pgrep -x {RUNNER_LISTENER_PROCESS})"
-            )
-        logger.info("Running kill process command: %s", kill_command)
-        # Checking the result of kill command is not useful, as the exit code does not reveal much.
-        result: fabric.Result = ssh_conn.run(kill_command, warn=True, timeout=30)
-        logger.info(
-            "Kill process command output, ok: %s code %s, out: %s, err: %s",
-            result.ok,
-            result.return_code,
-            result.stdout,
-            result.stderr,
-        )
+        runner_process.kill_runner_processes(ssh_conn, instance.server_name, busy)
 
-    @retry(tries=10, delay=60, local_logger=logger)
+    # The remote wait returns once the runner is ready, the backoff only spaces out the attempts
+    # while the instance is still booting and not reachable over SSH.
+    @retry(tries=10, delay=5, max_delay=60, backoff=2, jitter=5, local_logger=logger)
     def _wait_runner_startup(self, instance: OpenstackInstance) -> None:
         """Wait until runner is startup.
 
+        The wait blocks on the runner until cloud-init signals the readiness by writing the runner
+        installed timestamp, so that it returns as soon as the runner has started.
+
         Args:
             instance: The runner instance.
 
@@ -628,6 +839,11 @@ class OpenStackRunnerManager(CloudRunnerManager):
                 "not completed"
             ) from err
 
+        logger.debug("Waiting for runner installed signal on instance %s.", instance.server_name)
+        OpenStackRunnerManager._wait_remote_file(
+            ssh_conn, instance.server_name, RUNNER_INSTALLED_TIMESTAMP_PATH
+        )
+
         logger.debug("Running `cloud-init status` on instance %s.", instance.server_name)
         result: invoke.runners.Result = ssh_conn.run("cloud-init status", warn=True, timeout=60)
         if not result.ok:
@@ -651,7 +867,36 @@ class OpenStackRunnerManager(CloudRunnerManager):
             raise RunnerStartError(f"Runner startup process not found on {instance.server_name}")
         logger.info("Runner startup process found to be healthy on %s", instance.server_name)
 
-    @retry(tries=5, delay=60, local_logger=logger)
+    @staticmethod
+    def _wait_remote_file(ssh_conn: SSHConnection, server_name: str, remote_path: Path) -> None:
+        """Block until a file exists on the runner.
+
+        The file is polled on the runner itself, hence the command returns right after the file
+        is created without a round-trip per poll.
+
+        Args:
+            ssh_conn: The SSH connection to the runner.
+            server_name: The name of the server.
+            remote_path: The path of the file on the runner.
+
+        Raises:
+            RunnerStartError: The file was not created within the wait timeout.
+        """
+        try:
+            result: invoke.runners.Result = ssh_conn.run(
+                f"timeout {RUNNER_READINESS_WAIT_TIMEOUT} "
+                f"sh -c 'until [ -f {remote_path} ]; do sleep 1; done'",
+                warn=True,
+                timeout=RUNNER_READINESS_WAIT_TIMEOUT + 30,
+            )
+        except invoke.exceptions.CommandTimedOut as exc:
+            raise RunnerStartError(f"Timeout waiting for {remote_path} on {server_name}") from exc
+        if not result.ok:
+            logger.info("%s not found on %s, runner not yet installed", remote_path, server_name)
+            raise RunnerStartError(f"Runner on {server_name} not yet installed")
+
+    # The runner process starts right after the startup process, hence check again quickly.
+    @retry(tries=10, delay=2, max_delay=60, backoff=2, jitter=2, local_logger=logger)
     def _wait_runner_running(self, instance: OpenstackInstance) -> None:
         """Wait until runner is running.
 
@@ -678,193 +923,77 @@ class OpenStackRunnerManager(CloudRunnerManager):
 
         logger.info("Runner process found to be healthy on %s", instance.server_name)
 
-    @staticmethod
-    def _generate_instance_id() -> InstanceId:
-        r"""Generate an instance id suffix compliant to the GitHub runner naming convention.
-
-        The GitHub runner name convention is as following:
-        A valid runner name is 64 characters or less in length and does not include '"', '/', ':',
-        '<', '>', '\', '|', '*' and '?'.
-
-        The collision rate calculation:
-        alphanumeric 12 chars long (26 alphabet + 10 digits = 36)
-        36^12 is big enough for our use-case.
-
-        Return:
-            The id.
-        """
-        return secrets.token_hex(6)
-
-    def _init_metrics_storage(self, name: str, install_start_timestamp: float) -> None:
-        """Create metrics storage for runner.
-
-        An error will be logged if the storage cannot be created.
-        It is assumed that the code will not be able to issue metrics for this runner
-        and not fail for other operations.
+    def _launch_runner(
+        self, registration_token: str | None, server_config: OpenStackServerConfig, wait: bool
+    ) -> OpenstackInstance:
+        """Launch the instance of a runner.
 
         Args:
-            name: The name of the runner.
-            install_start_timestamp: The timestamp of installation start.
-        """
-        try:
-            storage = self._metrics_storage_manager.create(runner_name=name)
-        except CreateMetricsStorageError:
-            logger.exception(
-                "Failed to create metrics storage for runner %s, "
-                "will not be able to issue all metrics.",
-                name,
-            )
-        else:
-            try:
-                (storage.path / runner_metrics.RUNNER_INSTALLATION_START_TS_FILE_NAME).write_text(
-                    str(install_start_timestamp), encoding="utf-8"
-                )
-            except FileNotFoundError:
-                logger.exception(
-                    f"Failed to write {runner_metrics.RUNNER_INSTALLATION_START_TS_FILE_NAME}"
-                    f" into metrics storage for runner %s, will not be able to issue all metrics.",
-                    name,
-                )
+            registration_token: The GitHub registration token for registering runners, None to
+                launch an instance into the warm pool.
+            server_config: The configuration for OpenStack server.
+            wait: Whether to wait for the instance to be ACTIVE.
 
-    def _pull_runner_metrics(self, name: str, ssh_conn: SSHConnection) -> None:
-        """Pull metrics from runner.
+        Raises:
+            RunnerCreateError: Unable to create runner due to OpenStack issues.
 
-        Args:
-            name: The name of the runner.
-            ssh_conn: The SSH connection to the runner.
+        Returns:
+            The instance launched.
         """
-        logger.debug("Pulling metrics for %s", name)
-        try:
-            storage = self._metrics_storage_manager.get(runner_name=name)
-        except GetMetricsStorageError:
-            logger.exception(
-                "Failed to get shared metrics storage for runner %s, "
-                "will not be able to issue all metrics.",
-                name,
+        start_timestamp = time.time()
+        instance_id = OpenStackRunnerManager._generate_instance_id()
+        instance_name = self._openstack_cloud.get_server_name(instance_id=instance_id)
+        # The metrics storage of a warm instance is created once it is claimed.
+        if registration_token is not None:
+            metrics_exchange.init_metrics_storage(
+                metrics_storage_manager=self._metrics_storage_manager,
+                name=instance_name,
+                install_start_timestamp=start_timestamp,
             )
-            return
 
+        cloud_init = generate_cloud_init(
+            runner_config=self._config.runner_config,
+            service_config=self._config.service_config,
+            instance_name=instance_name,
+            registration_token=registration_token,
+        )
         try:
-            OpenStackRunnerManager._ssh_pull_file(
-                ssh_conn=ssh_conn,
-                remote_path=str(METRICS_EXCHANGE_PATH / "runner-installed.timestamp"),
-                local_path=str(storage.path / runner_metrics.RUNNER_INSTALLED_TS_FILE_NAME),
-                max_size=MAX_METRICS_FILE_SIZE,
-            )
-            OpenStackRunnerManager._ssh_pull_file(
-                ssh_conn=ssh_conn,
-                remote_path=str(METRICS_EXCHANGE_PATH / "pre-job-metrics.json"),
-                local_path=str(storage.path / runner_metrics.PRE_JOB_METRICS_FILE_NAME),
-                max_size=MAX_METRICS_FILE_SIZE,
-            )
-            OpenStackRunnerManager._ssh_pull_file(
-                ssh_conn=ssh_conn,
-                remote_path=str(METRICS_EXCHANGE_PATH / "post-job-metrics.json"),
-                local_path=str(storage.path / runner_metrics.POST_JOB_METRICS_FILE_NAME),
-                max_size=MAX_METRICS_FILE_SIZE,
-            )
-        except _PullFileError as exc:
-            logger.warning(
-                "Failed to pull metrics for %s: %s . Will not be able to issue all metrics",
-                name,
-                exc,
+            return self._openstack_cloud.launch_instance(
+                instance_id=instance_id,
+                image=server_config.image,
+                flavor=server_config.flavor,
+                network=server_config.network,
+                cloud_init=cloud_init,
+                wait=wait,
+                metadata=warm_pool.get_launch_metadata() if registration_token is None else None,
             )
+        except OpenStackError as err:
+            raise RunnerCreateError(f"Failed to create {instance_name} openstack runner") from err
 
-    @staticmethod
-    def _ssh_pull_file(
-        ssh_conn: SSHConnection, remote_path: str, local_path: str, max_size: int
-    ) -> None:
-        """Pull file from the runner instance.
+    def _wait_runner_ready(self, instance: OpenstackInstance) -> None:
+        """Wait for the runner on an ACTIVE instance to be up and running.
 
         Args:
-            ssh_conn: The SSH connection instance.
-            remote_path: The file path on the runner instance.
-            local_path: The local path to store the file.
-            max_size: If the file is larger than this, it will not be pulled.
-
-        Raises:
-            _PullFileError: Unable to pull the file from the runner instance.
-            SSHError: Issue with SSH connection.
+            instance: The runner instance.
         """
-        try:
-            result = ssh_conn.run(f"stat -c %s {remote_path}", warn=True, timeout=60)
-        except (
-            TimeoutError,
-            paramiko.ssh_exception.NoValidConnectionsError,
-            paramiko.ssh_exception.SSHException,
-        ) as exc:
-            raise SSHError(f"Unable to SSH into {ssh_conn.host}") from exc
-        if not result.ok:
-            logger.warning(
-                (
-                    "Unable to get file size of %s on instance %s, "
-                    "exit code: %s, stdout: %s, stderr: %s"
-                ),
-                remote_path,
-                ssh_conn.host,
-                result.return_code,
-                result.stdout,
-                result.stderr,
-            )
-            raise _PullFileError(f"Unable to get file size of {remote_path}")
-
-        stdout = result.stdout
-        try:
-            stdout.strip()
-            size = int(stdout)
-            if size > max_size:
-                raise _PullFileError(f"File size of {remote_path} too large {size} > {max_size}")
-        except ValueError as exc:
-            raise _PullFileError(f"Invalid file size for {remote_path}: stdout") from exc
-
-        try:
-            ssh_conn.get(remote=remote_path, local=local_path)
-        except (
-            TimeoutError,
-            paramiko.ssh_exception.NoValidConnectionsError,
-            paramiko.ssh_exception.SSHException,
-        ) as exc:
-            raise SSHError(f"Unable to SSH into {ssh_conn.host}") from exc
-        except OSError as exc:
-            raise _PullFileError(f"Unable to retrieve file {remote_path}") from exc
+        logger.debug("Waiting for runner process to startup: %s", instance.server_name)
+        self._wait_runner_startup(instance)
+        logger.debug("Waiting for runner process to be running: %s", instance.server_name)
+        self._wait_runner_running(instance)
 
     @staticmethod
-    def _run_runner_removal_script(
-        instance_name: str, ssh_conn: SSHConnection, remove_token: str
-    ) -> None:
-        """Run Github runner removal script.
+    def _generate_instance_id() -> InstanceId:
+        r"""Generate an instance id suffix compliant to the GitHub runner naming convention.
 
-        Args:
-            instance_name: The name of the runner instance.
-            ssh_conn: The SSH connection to the runner instance.
-            remove_token: The GitHub instance removal token.
+        The GitHub runner name convention is as following:
+        A valid runner name is 64 characters or less in length and does not include '"', '/', ':',
+        '<', '>', '\', '|', '*' and '?'.
 
-        Raises:
-            _GithubRunnerRemoveError: Unable to remove runner from GitHub.
-        """
-        try:
-            result = ssh_conn.run(
-                f"{_CONFIG_SCRIPT_PATH} remove --token {remove_token}", warn=True, timeout=60
-            )
-            if result.ok:
-                return
+        The collision rate calculation:
+        alphanumeric 12 chars long (26 alphabet + 10 digits = 36)
+        36^12 is big enough for our use-case.
 
-            logger.warning(
-                (
-                    "Unable to run removal script on instance %s, "
-                    "exit code: %s, stdout: %s, stderr: %s"
-                ),
-                instance_name,
-                result.return_code,
-                result.stdout,
-                result.stderr,
-            )
-            raise _GithubRunnerRemoveError(f"Failed to remove runner {instance_name} from Github.")
-        except (
-            TimeoutError,
-            paramiko.ssh_exception.NoValidConnectionsError,
-            paramiko.ssh_exception.SSHException,
-        ) as exc:
-            raise _GithubRunnerRemoveError(
-                f"Failed to remove runner {instance_name} from Github."
-            ) from exc
+        Return:
+            The id.
+        """
+        return secrets.token_hex(6)
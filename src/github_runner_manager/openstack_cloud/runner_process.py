@@ -0,0 +1,99 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Commands run over SSH on the runner process of an instance."""
+
+import logging
+
+import fabric
+from fabric import Connection as SSHConnection
+
+from github_runner_manager.errors import RunnerRemoveError
+from github_runner_manager.openstack_cloud.cloud_init import RUNNER_APPLICATION
+from github_runner_manager.openstack_cloud.constants import (
+    RUNNER_LISTENER_PROCESS,
+    RUNNER_WORKER_PROCESS,
+    SSH_ERRORS,
+)
+
+logger = logging.getLogger(__name__)
+
+_CONFIG_SCRIPT_PATH = RUNNER_APPLICATION / "config.sh"
+
+
+def kill_runner_processes(ssh_conn: SSHConnection, server_name: str, busy: bool) -> None:
+    """Kill runner process depending on idle or busy.
+
+    Due to update to runner state has some delay with GitHub API. The state of the runner is
+    determined by which runner processes are running. If the Runner.Worker process is running,
+    the runner is deemed to be busy.
+
+    Args:
+        ssh_conn: The SSH connection to the runner instance.
+        server_name: The name of the runner instance.
+        busy: Kill the process if runner is busy, else only kill runner
+            process if runner is idle.
+    """
+    # Using a single command to determine the state and kill the process if needed.
+    # This makes it more robust when network is unstable.
+    if busy:
+        logger.info("Attempting to kill all runner process on %s", server_name)
+        # kill both Runner.Listener and Runner.Worker processes.
+        # This kills pre-job.sh, a child process of Runner.Worker.
+        kill_command = (
+            f"pgrep -x {RUNNER_LISTENER_PROCESS} && "
+            f"kill $(pgrep -x {RUNNER_LISTENER_PROCESS});"
+            f"pgrep -x {RUNNER_WORKER_PROCESS} && kill $(pgrep -x {RUNNER_WORKER_PROCESS});"
+        )
+    else:
+        logger.info("Attempting to kill runner process on %s if not busy", server_name)
+        # Only kill Runner.Listener if Runner.Worker does not exist.
+        kill_command = (
+            f"! pgrep -x {RUNNER_WORKER_PROCESS} && pgrep -x {RUNNER_LISTENER_PROCESS} && "
+            f"kill $(pgrep -x {RUNNER_LISTENER_PROCESS})"
+        )
+    logger.info("Running kill process command: %s", kill_command)
+    # Checking the result of kill command is not useful, as the exit code does not reveal much.
+    result: fabric.Result = ssh_conn.run(kill_command, warn=True, timeout=30)
+    logger.info(
+        "Kill process command output, ok: %s code %s, out: %s, err: %s",
+        result.ok,
+        result.return_code,
+        result.stdout,
+        result.stderr,
+    )
+
+
+def run_runner_removal_script(
+    instance_name: str, ssh_conn: SSHConnection, remove_token: str
+) -> None:
+    """Run Github runner removal script.
+
+    Args:
+        instance_name: The name of the runner instance.
+        ssh_conn: The SSH connection to the runner instance.
+        remove_token: The GitHub instance removal token.
+
+    Raises:
+        RunnerRemoveError: Unable to remove runner from GitHub.
+    """
+    try:
+        result = ssh_conn.run(
+            f"{_CONFIG_SCRIPT_PATH} remove --token {remove_token}", warn=True, timeout=60
+        )
+        if result.ok:
+            return
+
+        logger.warning(
+            (
+                "Unable to run removal script on instance %s, "
+                "exit code: %s, stdout: %s, stderr: %s"
+            ),
+            instance_name,
+            result.return_code,
+            result.stdout,
+            result.stderr,
+        )
+        raise RunnerRemoveError(f"Failed to remove runner {instance_name} from Github.")
+    except SSH_ERRORS as exc:
+        raise RunnerRemoveError(f"Failed to remove runner {instance_name} from Github.") from exc
@@ -0,0 +1,196 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Pool of SSH connections to the OpenStack instances."""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Sequence
+
+import paramiko
+from fabric import Connection as SSHConnection
+
+logger = logging.getLogger(__name__)
+
+# Pooled SSH connections not used for this amount of seconds are closed.
+_SSH_CONNECTION_IDLE_TIMEOUT = 5 * 60
+# Pooled SSH connections are replaced after this amount of seconds.
+_SSH_CONNECTION_MAX_AGE = 30 * 60
+# Connections replaced for their age are closed after this amount of seconds, to let commands
+# started on them by other threads complete.
+_SSH_CONNECTION_RETIRE_GRACE = 5 * 60
+
+
+@dataclass
+class _PooledSSHConnection:
+    """A SSH connection in the pool.
+
+    Attributes:
+        connection: The SSH connection.
+        created_at: The monotonic time the connection was added to the pool.
+        last_used_at: The monotonic time the connection was last handed out.
+    """
+
+    connection: SSHConnection
+    created_at: float
+    last_used_at: float
+
+
+class SSHConnectionPool:
+    """Pool of SSH connections to the OpenStack instances keyed by server name.
+
+    A pooled connection is handed out again as long as its transport is alive, it has not been
+    idle for too long and it has not reached its maximum age. The pool is not shared across
+    processes, a pickled pool is restored empty.
+    """
+
+    def __init__(self) -> None:
+        """Construct the object."""
+        self._lock = threading.Lock()
+        self._connections: dict[str, _PooledSSHConnection] = {}
+        self._retired: list[tuple[SSHConnection, float]] = []
+
+    def __getstate__(self) -> dict:
+        """Drop the connections and the lock from the pickled state.
+
+        Returns:
+            The state to pickle.
+        """
+        return {}
+
+    def __setstate__(self, state: dict) -> None:
+        """Restore an empty pool.
+
+        Args:
+            state: The pickled state.
+        """
+        self.__init__()  # type: ignore[misc]  # pylint: disable=unnecessary-dunder-call
+
+    def get(self, server_name: str, addresses: Sequence[str]) -> SSHConnection | None:
+        """Get a live pooled connection to a server.
+
+        Args:
+            server_name: The name of the server to connect to.
+            addresses: The current addresses of the server.
+
+        Returns:
+            The pooled connection, or None if there is no usable connection in the pool.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            pooled = self._connections.get(server_name)
+            if pooled is None:
+                return None
+            if pooled.connection.host not in addresses or not _is_ssh_alive(pooled.connection):
+                logger.debug("Dropping stale SSH connection to %s", server_name)
+                del self._connections[server_name]
+                _close_ssh_connection(pooled.connection)
+                return None
+            pooled.last_used_at = now
+            return pooled.connection
+
+    def put(self, server_name: str, connection: SSHConnection) -> SSHConnection:
+        """Add a connection to the pool.
+
+        If another thread already added a connection to the server, the pooled connection is
+        kept and the given connection is closed.
+
+        Args:
+            server_name: The name of the server connected to.
+            connection: The SSH connection.
+
+        Returns:
+            The connection to use.
+        """
+        now = time.monotonic()
+        with self._lock:
+            pooled = self._connections.get(server_name)
+            if pooled is not None and pooled.connection is not connection:
+                _close_ssh_connection(connection)
+                pooled.last_used_at = now
+                return pooled.connection
+            self._connections[server_name] = _PooledSSHConnection(
+                connection=connection, created_at=now, last_used_at=now
+            )
+            return connection
+
+    def invalidate(self, server_name: str) -> None:
+        """Close and remove the connection to a server.
+
+        Args:
+            server_name: The name of the server.
+        """
+        with self._lock:
+            pooled = self._connections.pop(server_name, None)
+        if pooled is not None:
+            _close_ssh_connection(pooled.connection)
+
+    def retain(self, server_names: Iterable[str]) -> None:
+        """Close the connections to servers not in the given list and the expired connections.
+
+        Args:
+            server_names: The names of the servers that still exist.
+        """
+        server_name_set = set(server_names)
+        with self._lock:
+            for server_name in set(self._connections) - server_name_set:
+                _close_ssh_connection(self._connections.pop(server_name).connection)
+            self._evict_expired(time.monotonic())
+
+    def _evict_expired(self, now: float) -> None:
+        """Close the idle connections and retire the connections reaching their maximum age.
+
+        Must be called with the lock held.
+
+        Args:
+            now: The current monotonic time.
+        """
+        for server_name, pooled in list(self._connections.items()):
+            if now - pooled.last_used_at >= _SSH_CONNECTION_IDLE_TIMEOUT:
+                logger.debug("Closing idle SSH connection to %s", server_name)
+                del self._connections[server_name]
+                _close_ssh_connection(pooled.connection)
+            elif now - pooled.created_at >= _SSH_CONNECTION_MAX_AGE:
+                logger.debug("Retiring SSH connection to %s", server_name)
+                del self._connections[server_name]
+                self._retired.append((pooled.connection, now))
+        still_retired = []
+        for connection, retired_at in self._retired:
+            if now - retired_at >= _SSH_CONNECTION_RETIRE_GRACE:
+                _close_ssh_connection(connection)
+            else:
+                still_retired.append((connection, retired_at))
+        self._retired = still_retired
+
+
+def _is_ssh_alive(connection: SSHConnection) -> bool:
+    """Check whether the transport of a SSH connection is still usable.
+
+    Args:
+        connection: The SSH connection.
+
+    Returns:
+        Whether the connection is alive.
+    """
+    if not connection.is_connected:
+        return False
+    try:
+        # Sends a SSH_MSG_IGNORE packet, fails on a broken transport.
+        connection.transport.send_ignore()
+    except (EOFError, OSError, paramiko.ssh_exception.SSHException):
+        return False
+    return True
+
+
+def _close_ssh_connection(connection: SSHConnection) -> None:
+    """Close a SSH connection ignoring errors.
+
+    Args:
+        connection: The SSH connection.
+    """
+    try:
+        connection.close()
+    except (EOFError, OSError, paramiko.ssh_exception.SSHException):
+        logger.debug("Error closing SSH connection to %s", connection.host, exc_info=True)
@@ -0,0 +1,283 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Warm pool of pre-booted runner instances waiting for a registration token.
+
+A warm instance boots and runs cloud-init up to the registration of the runner, signals that it
+is ready and waits for a registration token. Claiming the instance for a job injects the token
+over SSH, after which the runner registers and starts within seconds instead of after a full boot.
+
+The state of the instances in the pool is kept in the metadata of the OpenStack servers, so that
+the reconciling process and the reactive processes claiming instances share it.
+"""
+
+import logging
+import shlex
+import time
+from datetime import datetime, timedelta
+from enum import Enum
+from pathlib import Path
+from typing import Iterable
+
+import invoke
+from fabric import Connection as SSHConnection
+
+from github_runner_manager.errors import OpenStackError, SSHError
+from github_runner_manager.manager.cloud_runner_manager import CloudRunnerState
+from github_runner_manager.openstack_cloud.constants import SSH_ERRORS
+from github_runner_manager.openstack_cloud.health_checks import (
+    INSTANCE_IN_BUILD_MODE_TIMEOUT_IN_HOURS,
+)
+from github_runner_manager.openstack_cloud.openstack_cloud import OpenstackCloud, OpenstackInstance
+
+logger = logging.getLogger(__name__)
+
+WARM_POOL_STATE_KEY = "warm-pool-state"
+WARM_POOL_CLAIMED_AT_KEY = "warm-pool-claimed-at"
+
+WARM_POOL_READY_PATH = Path("/home/ubuntu/warm-pool-ready")
+REGISTRATION_TOKEN_PATH = Path("/home/ubuntu/registration-token")
+_CLAIM_LOCK_PATH = Path("/home/ubuntu/warm-pool-claimed")
+
+# Waiting instances fail the health check once they have been building for too long. They are not
+# claimed close to that to leave the runner time to register.
+_MAX_CLAIM_AGE = timedelta(hours=INSTANCE_IN_BUILD_MODE_TIMEOUT_IN_HOURS) - timedelta(minutes=10)
+# About the time for a new instance to boot and get ready. The jobs claimed within this window are
+# expected to come again while the pool is being refilled.
+_DEMAND_WINDOW_IN_SECONDS = 10 * 60
+_MARK_CLAIMED_ATTEMPTS = 3
+_MARK_CLAIMED_RETRY_DELAY_IN_SECONDS = 1
+
+
+class WarmPoolState(str, Enum):
+    """State of an instance in the warm pool.
+
+    Attributes:
+        WAITING: The instance is booting or waiting for a registration token.
+        CLAIMED: The instance was handed a registration token for a job.
+    """
+
+    WAITING = "waiting"
+    CLAIMED = "claimed"
+
+
+def get_launch_metadata() -> dict[str, str]:
+    """Get the metadata to launch the instances of the pool with.
+
+    Returns:
+        The metadata of a waiting instance.
+    """
+    return {WARM_POOL_STATE_KEY: WarmPoolState.WAITING.value}
+
+
+def is_waiting(instance: OpenstackInstance) -> bool:
+    """Check whether an instance is in the warm pool waiting to be claimed.
+
+    Args:
+        instance: The OpenStack instance.
+
+    Returns:
+        Whether the instance waits in the warm pool.
+    """
+    return instance.metadata.get(WARM_POOL_STATE_KEY) == WarmPoolState.WAITING
+
+
+class WarmPool:
+    """Warm pool of runner instances.
+
+    Attributes:
+        max_size: The maximum number of instances waiting in the pool.
+    """
+
+    def __init__(self, openstack_cloud: OpenstackCloud, max_size: int):
+        """Construct the object.
+
+        Args:
+            openstack_cloud: The OpenStack cloud hosting the instances.
+            max_size: The maximum number of instances waiting in the pool.
+        """
+        self._openstack_cloud = openstack_cloud
+        self.max_size = max_size
+
+    def get_refill_count(self, queue_size: int) -> int:
+        """Get the number of instances to launch to refill the pool.
+
+        The pool is sized to the recent job throughput: the jobs claimed within the time an
+        instance takes to get ready plus the jobs waiting in the queue. Surplus instances are not
+        deleted, as a reactive process could be claiming them, they expire through the health
+        check instead.
+
+        Args:
+            queue_size: The number of jobs waiting in the queue.
+
+        Returns:
+            The number of instances to launch.
+        """
+        if self.max_size <= 0:
+            return 0
+        instances = self._openstack_cloud.get_instances()
+        now = time.time()
+        recent_claims = sum(
+            1
+            for instance in instances
+            if now - _get_claimed_at(instance) <= _DEMAND_WINDOW_IN_SECONDS
+        )
+        target = min(self.max_size, queue_size + recent_claims)
+        # Instances still booting are counted, they will be ready before new ones would be.
+        available = len(_get_waiting(instances))
+        logger.info(
+            "Warm pool has %s instances waiting, target %s (%s queued, %s recently claimed)",
+            available,
+            target,
+            queue_size,
+            recent_claims,
+        )
+        return max(0, target - available)
+
+    def claim(self, registration_token: str) -> OpenstackInstance | None:
+        """Claim a ready instance of the pool and hand it the registration token.
+
+        A claimed instance which cannot be marked so in its metadata would run a job while being
+        seen as waiting in the pool, and is deleted instead of returned.
+
+        Args:
+            registration_token: The GitHub registration token for registering the runner.
+
+        Returns:
+            The instance claimed, or None if no ready instance could be claimed.
+        """
+        if self.max_size <= 0:
+            return None
+        for instance in _get_waiting(self._openstack_cloud.get_instances()):
+            if (
+                CloudRunnerState.from_openstack_server_status(instance.status)
+                != CloudRunnerState.ACTIVE
+            ):
+                continue
+            try:
+                ssh_conn = self._openstack_cloud.get_ssh_connection(instance)
+            except SSHError:
+                logger.warning("Unable to SSH to warm instance %s", instance.server_name)
+                continue
+            if not _inject_registration_token(ssh_conn, instance.server_name, registration_token):
+                continue
+            if not self._mark_claimed(instance):
+                self._delete_unmarked(instance)
+                continue
+            logger.info("Claimed warm instance %s", instance.server_name)
+            return instance
+        logger.info("No ready instance in the warm pool")
+        return None
+
+    def _mark_claimed(self, instance: OpenstackInstance) -> bool:
+        """Mark an instance claimed in its metadata, retrying on failure.
+
+        Args:
+            instance: The OpenStack instance claimed.
+
+        Returns:
+            Whether the instance was marked claimed.
+        """
+        for attempt in range(1, _MARK_CLAIMED_ATTEMPTS + 1):
+            try:
+                self._openstack_cloud.set_instance_metadata(
+                    instance.instance_id,
+                    {
+                        WARM_POOL_STATE_KEY: WarmPoolState.CLAIMED.value,
+                        WARM_POOL_CLAIMED_AT_KEY: str(time.time()),
+                    },
+                )
+                return True
+            except OpenStackError:
+                logger.exception(
+                    "Failed to mark warm instance %s claimed, attempt %s of %s",
+                    instance.server_name,
+                    attempt,
+                    _MARK_CLAIMED_ATTEMPTS,
+                )
+            if attempt < _MARK_CLAIMED_ATTEMPTS:
+                time.sleep(_MARK_CLAIMED_RETRY_DELAY_IN_SECONDS)
+        return False
+
+    def _delete_unmarked(self, instance: OpenstackInstance) -> None:
+        """Delete a claimed instance which could not be marked claimed.
+
+        The runner may have registered with the token, it is removed from GitHub by the cleanup
+        of the offline runners.
+
+        Args:
+            instance: The OpenStack instance claimed.
+        """
+        logger.error("Deleting warm instance %s not marked claimed", instance.server_name)
+        try:
+            self._openstack_cloud.delete_instance(instance.instance_id)
+        except OpenStackError:
+            logger.exception("Failed to delete warm instance %s", instance.server_name)
+
+
+def _get_waiting(instances: Iterable[OpenstackInstance]) -> list[OpenstackInstance]:
+    """Get the waiting instances young enough to be claimed, oldest first.
+
+    Args:
+        instances: The OpenStack instances.
+
+    Returns:
+        The waiting instances.
+    """
+    now = datetime.now()
+    return sorted(
+        (
+            instance
+            for instance in instances
+            if is_waiting(instance) and now - instance.created_at < _MAX_CLAIM_AGE
+        ),
+        key=lambda instance: instance.created_at,
+    )
+
+
+def _get_claimed_at(instance: OpenstackInstance) -> float:
+    """Get the time an instance was claimed.
+
+    Args:
+        instance: The OpenStack instance.
+
+    Returns:
+        The timestamp of the claim, or minus infinity if the instance was not claimed.
+    """
+    try:
+        return float(instance.metadata[WARM_POOL_CLAIMED_AT_KEY])
+    except (KeyError, ValueError):
+        return float("-inf")
+
+
+def _inject_registration_token(
+    ssh_conn: SSHConnection, server_name: str, registration_token: str
+) -> bool:
+    """Claim a ready instance by writing the registration token onto it.
+
+    The claim is made atomic with the creation of a lock directory, so that a single one of the
+    reactive processes racing for an instance hands it a token.
+
+    Args:
+        ssh_conn: The SSH connection to the instance.
+        server_name: The name of the server.
+        registration_token: The GitHub registration token for registering the runner.
+
+    Returns:
+        Whether the instance was claimed.
+    """
+    temp_path = f"{REGISTRATION_TOKEN_PATH}.tmp"
+    command = (
+        f"[ -f {WARM_POOL_READY_PATH} ] && mkdir {_CLAIM_LOCK_PATH} && "
+        f"(umask 077 && printf %s {shlex.quote(registration_token)} > {temp_path}) && "
+        f"mv {temp_path} {REGISTRATION_TOKEN_PATH}"
+    )
+    try:
+        result: invoke.runners.Result = ssh_conn.run(command, warn=True, hide=True, timeout=30)
+    except (*SSH_ERRORS, invoke.exceptions.CommandTimedOut):
+        logger.exception("Failed to claim warm instance %s", server_name)
+        return False
+    if not result.ok:
+        logger.info("Warm instance %s not ready or already claimed", server_name)
+        return False
+    return True
@@ -2,12 +2,17 @@
 #  See LICENSE file for licensing details.
 
 """Module responsible for consuming jobs from the message queue."""
+import concurrent.futures
 import contextlib
+import functools
 import logging
 import signal
 import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import closing
 from enum import Enum
+from queue import Empty
 from time import sleep
 from types import FrameType
 from typing import Generator, cast
@@ -19,6 +24,7 @@ from pydantic import BaseModel, HttpUrl, ValidationError, validator
 
 from github_runner_manager.github_client import GithubClient
 from github_runner_manager.manager.runner_manager import RunnerManager
+from github_runner_manager.reactive.pickup_watcher import PickupWatcher
 from github_runner_manager.reactive.types_ import QueueConfig
 from github_runner_manager.types_.github import GitHubRepo
 
@@ -26,6 +32,10 @@ logger = logging.getLogger(__name__)
 
 Labels = set[str]
 
+_JOB_PICKED_UP_CHECKS = 10
+_JOB_PICKED_UP_CHECK_INTERVAL_IN_SECONDS = 30
+_QUEUE_POLL_INTERVAL_IN_SECONDS = 1
+
 
 class JobPickedUpStates(str, Enum):
     """The states of a job that indicate it has been picked up.
@@ -106,7 +116,7 @@ def consume(
     """Consume a job from the message queue.
 
     Log the job details and acknowledge the message.
-    If the job details are invalid, reject the message and raise an error.
+    If the job details are invalid, reject the message and raise a JobError.
 
     Args:
         queue_config: The configuration for the message queue.
@@ -116,7 +126,6 @@ def consume(
             the message is requeued.
 
     Raises:
-        JobError: If the job details are invalid.
         QueueError: If an error when communicating with the queue occurs.
     """
     try:
@@ -126,29 +135,8 @@ def consume(
             signal_handler(signal.SIGTERM),
         ):
             msg = simple_queue.get(block=True)
-            try:
-                job_details = cast(JobDetails, JobDetails.parse_raw(msg.payload))
-            except ValidationError as exc:
-                logger.error("Found invalid job details, will reject the message.")
-                msg.reject(requeue=False)
-                raise JobError(f"Invalid job details: {msg.payload}") from exc
-            logger.info(
-                "Received job with labels %s and job_url %s",
-                job_details.labels,
-                job_details.url,
-            )
-            if not _validate_labels(labels=job_details.labels, supported_labels=supported_labels):
-                logger.error(
-                    "Found unsupported job labels in %s. "
-                    "Will not spawn a runner and reject the message.",
-                    job_details.labels,
-                )
-                # We currently do not expect this to happen, but we should handle it.
-                # We do not want to requeue the message as it will be rejected again.
-                # This may change in the future when messages for multiple
-                # flavours are sent to the same queue.
-                msg.reject(requeue=False)
-            else:
+            job_details = _parse_job_details(msg=msg, supported_labels=supported_labels)
+            if job_details is not None:
                 _spawn_runner(
                     runner_manager=runner_manager,
                     job_url=job_details.url,
@@ -159,6 +147,180 @@ def consume(
         raise QueueError("Error when communicating with the queue") from exc
 
 
+def consume_jobs(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    queue_config: QueueConfig,
+    runner_manager: RunnerManager,
+    github_client: GithubClient,
+    supported_labels: Labels,
+    concurrency: int,
+    stop_event: threading.Event | None = None,
+) -> None:
+    """Consume a number of jobs from the message queue, handling them concurrently.
+
+    The connection to the queue is kept open until `concurrency` jobs are taken and settled, all
+    of them being handled at the same time. Bounding the jobs taken keeps the runners spawned by
+    the process within the share of the expected quantity it has been spawned for.
+
+    The runner of each job is spawned in a thread, then the job is watched until it is picked up,
+    by a PickupWatcher polling GitHub with backoff. The messages are acknowledged or requeued in
+    the calling thread as soon as their job is settled. Invalid messages are rejected and skipped.
+
+    On termination, the messages of the jobs not settled are requeued on close of the connection.
+
+    Args:
+        queue_config: The configuration for the message queue.
+        runner_manager: The runner manager used to create the runners.
+        github_client: The GitHub client to use to check the job status.
+        supported_labels: The supported labels for the runner. If the job has unsupported labels,
+            the message is rejected.
+        concurrency: The number of jobs to take, all handled at the same time.
+        stop_event: Stop taking new jobs once set, and return when the jobs taken are settled.
+
+    Raises:
+        QueueError: If an error when communicating with the queue occurs.
+    """
+    stop_event = stop_event if stop_event is not None else threading.Event()
+    watcher = PickupWatcher(
+        check_picked_up=functools.partial(_check_job_been_picked_up, github_client=github_client)
+    )
+    try:
+        with (
+            Connection(queue_config.mongodb_uri) as conn,
+            closing(SimpleQueue(conn, queue_config.queue_name)) as simple_queue,
+            signal_handler(signal.SIGTERM),
+            ThreadPoolExecutor(
+                max_workers=concurrency, thread_name_prefix="reactive-job"
+            ) as executor,
+        ):
+            spawning: dict[Future[bool], tuple[HttpUrl, Message]] = {}
+            taken = 0
+            while (taken < concurrency and not stop_event.is_set()) or spawning or watcher:
+                block = stop_event.is_set() or taken >= concurrency
+                if not block and (job := _get_next_job(simple_queue, supported_labels)):
+                    spawning[
+                        executor.submit(
+                            _spawn_runner_if_not_picked_up, job[0], runner_manager, github_client
+                        )
+                    ] = job
+                    taken += 1
+                _settle_jobs(spawning=spawning, watcher=watcher, block=block)
+    except KombuError as exc:
+        raise QueueError("Error when communicating with the queue") from exc
+
+
+def _get_next_job(
+    simple_queue: SimpleQueue, supported_labels: Labels
+) -> tuple[HttpUrl, Message] | None:
+    """Take the next message from the queue, if any.
+
+    Args:
+        simple_queue: The message queue.
+        supported_labels: The supported labels for the runner.
+
+    Returns:
+        The URL of the job with its message, None if there is no job to handle.
+    """
+    try:
+        msg = simple_queue.get(block=True, timeout=_QUEUE_POLL_INTERVAL_IN_SECONDS)
+    except Empty:
+        return None
+    try:
+        job_details = _parse_job_details(msg=msg, supported_labels=supported_labels)
+    except JobError:
+        logger.exception("Skipping invalid message")
+        return None
+    if job_details is None:
+        return None
+    return job_details.url, msg
+
+
+def _settle_jobs(
+    spawning: dict[Future[bool], tuple[HttpUrl, Message]], watcher: PickupWatcher, block: bool
+) -> None:
+    """Settle the jobs picked up, given up or failed, and watch the jobs whose runner is spawned.
+
+    Args:
+        spawning: The jobs whose runner is being spawned, by future of the spawn.
+        watcher: The watcher of the jobs waiting to be picked up.
+        block: Whether to wait for a spawn to be done or for the next check of the watcher.
+    """
+    timeout = watcher.next_check_in() if block else 0
+    if spawning:
+        done, _ = concurrent.futures.wait(
+            spawning, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+        )
+    else:
+        done = set()
+        if timeout:
+            sleep(timeout)
+    for future in done:
+        job_url, msg = spawning.pop(future)
+        try:
+            picked_up = future.result()
+        except Exception:  # pylint: disable=broad-exception-caught
+            logger.exception("Failed to spawn a runner for job %s", job_url)
+            _settle_message(msg=msg, picked_up=False)
+            continue
+        if picked_up:
+            _settle_message(msg=msg, picked_up=True)
+        else:
+            watcher.add(job_url=job_url, msg=msg)
+    for msg, picked_up in watcher.poll():
+        _settle_message(msg=msg, picked_up=picked_up)
+
+
+def _settle_message(msg: Message, picked_up: bool) -> None:
+    """Acknowledge the message of a job picked up, else requeue it.
+
+    Args:
+        msg: The message of the job.
+        picked_up: Whether the job has been picked up.
+    """
+    if picked_up:
+        msg.ack()
+    else:
+        msg.reject(requeue=True)
+
+
+def _parse_job_details(msg: Message, supported_labels: Labels) -> JobDetails | None:
+    """Parse the job details of a message, rejecting the message if the job cannot be handled.
+
+    Args:
+        msg: The message.
+        supported_labels: The supported labels for the runner.
+
+    Returns:
+        The job details, None if the labels of the job are not supported.
+
+    Raises:
+        JobError: If the job details are invalid.
+    """
+    try:
+        job_details = cast(JobDetails, JobDetails.parse_raw(msg.payload))
+    except ValidationError as exc:
+        logger.error("Found invalid job details, will reject the message.")
+        msg.reject(requeue=False)
+        raise JobError(f"Invalid job details: {msg.payload}") from exc
+    logger.info(
+        "Received job with labels %s and job_url %s",
+        job_details.labels,
+        job_details.url,
+    )
+    if not _validate_labels(labels=job_details.labels, supported_labels=supported_labels):
+        logger.error(
+            "Found unsupported job labels in %s. "
+            "Will not spawn a runner and reject the message.",
+            job_details.labels,
+        )
+        # We currently do not expect this to happen, but we should handle it.
+        # We do not want to requeue the message as it will be rejected again.
+        # This may change in the future when messages for multiple
+        # flavours are sent to the same queue.
+        msg.reject(requeue=False)
+        return None
+    return job_details
+
+
 def _validate_labels(labels: Labels, supported_labels: Labels) -> bool:
     """Validate the labels of the job.
 
@@ -189,19 +351,39 @@ def _spawn_runner(
         msg: The message to acknowledge or reject.
         github_client: The GitHub client to use to check the job status.
     """
-    if _check_job_been_picked_up(job_url=job_url, github_client=github_client):
+    if _spawn_runner_if_not_picked_up(
+        runner_manager=runner_manager, job_url=job_url, github_client=github_client
+    ):
         msg.ack()
         return
-    runner_manager.create_runners(1)
-    for _ in range(10):
+    for _ in range(_JOB_PICKED_UP_CHECKS):
         if _check_job_been_picked_up(job_url=job_url, github_client=github_client):
             msg.ack()
             break
-        sleep(30)
+        sleep(_JOB_PICKED_UP_CHECK_INTERVAL_IN_SECONDS)
     else:
         msg.reject(requeue=True)
 
 
+def _spawn_runner_if_not_picked_up(
+    job_url: HttpUrl, runner_manager: RunnerManager, github_client: GithubClient
+) -> bool:
+    """Spawn a runner for a job, unless the job has already been picked up.
+
+    Args:
+        job_url: The URL of the job.
+        runner_manager: The runner manager to use.
+        github_client: The GitHub client to use to check the job status.
+
+    Returns:
+        Whether the job had already been picked up, in which case no runner is spawned.
+    """
+    if _check_job_been_picked_up(job_url=job_url, github_client=github_client):
+        return True
+    runner_manager.create_runners(1)
+    return False
+
+
 def _check_job_been_picked_up(job_url: HttpUrl, github_client: GithubClient) -> bool:
     """Check if the job has already been picked up.
 
@@ -0,0 +1,141 @@
+#  Copyright 2024 Canonical Ltd.
+#  See LICENSE file for licensing details.
+
+"""Watcher of the jobs waiting to be picked up by the runners spawned for them."""
+
+import heapq
+import itertools
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from kombu import Message
+from pydantic import HttpUrl
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PICKUP_TIMEOUT_IN_SECONDS = 300
+DEFAULT_INITIAL_INTERVAL_IN_SECONDS = 5.0
+DEFAULT_MAX_INTERVAL_IN_SECONDS = 30.0
+DEFAULT_BATCH_SIZE = 10
+
+
+@dataclass(order=True)
+class _PendingJob:
+    """A job waiting to be picked up, ordered by the time of its next check.
+
+    Attributes:
+        next_check: The monotonic time of the next check.
+        seq: The order of addition, to order the jobs checked at the same time.
+        job_url: The URL of the job.
+        msg: The message of the job.
+        deadline: The monotonic time after which the job is given up.
+        interval: The time in seconds between the last check and the next.
+    """
+
+    next_check: float
+    seq: int
+    job_url: HttpUrl = field(compare=False)
+    msg: Message = field(compare=False)
+    deadline: float = field(compare=False)
+    interval: float = field(compare=False)
+
+
+class PickupWatcher:
+    """Watcher of many jobs waiting to be picked up, checked with backoff.
+
+    The checks of the jobs are spread over time by their own backoff, and a poll checks at most a
+    batch of the jobs due, so that the jobs are settled as soon as they are picked up, without a
+    thread blocked per job.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        check_picked_up: Callable[[HttpUrl], bool],
+        timeout: float = DEFAULT_PICKUP_TIMEOUT_IN_SECONDS,
+        initial_interval: float = DEFAULT_INITIAL_INTERVAL_IN_SECONDS,
+        max_interval: float = DEFAULT_MAX_INTERVAL_IN_SECONDS,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        """Construct the object.
+
+        Args:
+            check_picked_up: The function checking whether a job has been picked up by URL.
+            timeout: The time in seconds after which a job not picked up is given up.
+            initial_interval: The time in seconds before the first check of a job.
+            max_interval: The maximum time in seconds between two checks of a job.
+            batch_size: The maximum number of jobs checked per poll.
+        """
+        self._check_picked_up = check_picked_up
+        self._timeout = timeout
+        self._initial_interval = initial_interval
+        self._max_interval = max_interval
+        self._batch_size = batch_size
+        self._pending: list[_PendingJob] = []
+        self._seq = itertools.count()
+
+    def __len__(self) -> int:
+        """Get the number of jobs waiting to be picked up.
+
+        Returns:
+            The number of jobs.
+        """
+        return len(self._pending)
+
+    def add(self, job_url: HttpUrl, msg: Message) -> None:
+        """Watch a job a runner has been spawned for.
+
+        Args:
+            job_url: The URL of the job.
+            msg: The message of the job.
+        """
+        now = time.monotonic()
+        heapq.heappush(
+            self._pending,
+            _PendingJob(
+                next_check=now + self._initial_interval,
+                seq=next(self._seq),
+                job_url=job_url,
+                msg=msg,
+                deadline=now + self._timeout,
+                interval=self._initial_interval,
+            ),
+        )
+
+    def next_check_in(self) -> float | None:
+        """Get the time until the next check is due.
+
+        Returns:
+            The time in seconds, None if no job is watched.
+        """
+        if not self._pending:
+            return None
+        return max(self._pending[0].next_check - time.monotonic(), 0)
+
+    def poll(self) -> list[tuple[Message, bool]]:
+        """Check a batch of the jobs due and settle the jobs picked up or given up.
+
+        Returns:
+            The messages of the settled jobs, with whether their job has been picked up.
+        """
+        now = time.monotonic()
+        settled = []
+        for _ in range(self._batch_size):
+            if not self._pending or self._pending[0].next_check > now:
+                break
+            job = heapq.heappop(self._pending)
+            try:
+                picked_up = self._check_picked_up(job.job_url)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Failed to check whether job %s is picked up", job.job_url)
+                picked_up = False
+            if picked_up or now >= job.deadline:
+                if not picked_up:
+                    logger.info("Job %s not picked up in time", job.job_url)
+                settled.append((job.msg, picked_up))
+                continue
+            job.interval = min(job.interval * 2, self._max_interval)
+            job.next_check = min(now + job.interval, job.deadline)
+            heapq.heappush(self._pending, job)
+        return settled
@@ -22,7 +22,9 @@ REACTIVE_RUNNER_LOG_DIR = Path("/var/log/reactive_runner")
 PYTHON_BIN = "/usr/bin/python3"
 REACTIVE_RUNNER_SCRIPT_MODULE = "github_runner_manager.reactive.runner"
 REACTIVE_RUNNER_CMD_LINE_PREFIX = f"{PYTHON_BIN} -m {REACTIVE_RUNNER_SCRIPT_MODULE}"
-PID_CMD_COLUMN_WIDTH = len(REACTIVE_RUNNER_CMD_LINE_PREFIX)
+REACTIVE_RUNNER_JOBS_ARG = "--jobs"
+# Leave room for the number of jobs of the process after the prefix.
+PID_CMD_COLUMN_WIDTH = len(f"{REACTIVE_RUNNER_CMD_LINE_PREFIX} {REACTIVE_RUNNER_JOBS_ARG} ") + 6
 PIDS_COMMAND_LINE = [
     "ps",
     "axo",
@@ -39,10 +41,14 @@ class ReactiveRunnerError(Exception):
 
 
 def reconcile(quantity: int, runner_config: RunnerConfig) -> int:
-    """Reconcile the number of reactive runner processes.
+    """Reconcile the number of jobs of the reactive runner processes.
+
+    Each process handles a share of the jobs, of at most `runner_config.jobs_per_process`. The
+    newest processes are killed while the jobs of the processes exceed the quantity, then
+    processes are spawned for the jobs missing, the last one with the remainder of the jobs.
 
     Args:
-        quantity: The number of processes to spawn.
+        quantity: The number of jobs to handle by the processes.
         runner_config: The reactive runner configuration.
 
     Raises a ReactiveRunnerError if the runner fails to spawn.
@@ -50,39 +56,76 @@ def reconcile(quantity: int, runner_config: RunnerConfig) -> int:
     Returns:
         The number of reactive runner processes spawned/killed.
     """
-    pids = _get_pids()
-    current_quantity = len(pids)
-    logger.info("Current quantity of reactive runner processes: %s", current_quantity)
-    delta = quantity - current_quantity
-    if delta > 0:
-        logger.info("Will spawn %d new reactive runner process(es)", delta)
+    processes = _get_processes()
+    current_quantity = sum(jobs for _, jobs in processes)
+    logger.info(
+        "Current quantity of reactive runner processes: %s, handling %s job(s)",
+        len(processes),
+        current_quantity,
+    )
+    killed = 0
+    for pid, jobs in processes:
+        if current_quantity <= quantity:
+            break
+        _kill_process(pid)
+        current_quantity -= jobs
+        killed += 1
+    if killed:
+        logger.info("Killed %d process(es).", killed)
+    shares = _split_jobs(quantity - current_quantity, runner_config.jobs_per_process)
+    if shares:
+        logger.info("Will spawn %d new reactive runner process(es)", len(shares))
         _setup_logging_for_processes(runner_config.system_user)
-        for _ in range(delta):
-            _spawn_runner(runner_config)
-    elif delta < 0:
-        logger.info("Will kill %d process(es).", -delta)
-        for pid in pids[:-delta]:
-            logger.info("Killing reactive runner process with pid %s", pid)
-            try:
-                os.kill(pid, signal.SIGTERM)
-            except ProcessLookupError:
-                # There can be a race condition that the process has already terminated.
-                # We just ignore and log the fact.
-                logger.info(
-                    "Failed to kill process with pid %s. Process might have terminated it self.",
-                    pid,
-                )
-    else:
+        for jobs in shares:
+            _spawn_runner(runner_config, jobs=jobs)
+    elif not killed:
         logger.info("No changes to number of reactive runner processes needed.")
 
-    return delta
+    return len(shares) - killed
+
+
+def _split_jobs(quantity: int, jobs_per_process: int) -> list[int]:
+    """Split a number of jobs in shares of processes.
+
+    Args:
+        quantity: The number of jobs.
+        jobs_per_process: The maximum number of jobs per process.
+
+    Returns:
+        The number of jobs of each process to spawn.
+    """
+    if quantity <= 0:
+        return []
+    full_processes, remainder = divmod(quantity, jobs_per_process)
+    return [jobs_per_process] * full_processes + ([remainder] if remainder else [])
+
+
+def _kill_process(pid: int) -> None:
+    """Kill a reactive runner process.
+
+    Args:
+        pid: The PID of the process.
+    """
+    logger.info("Killing reactive runner process with pid %s", pid)
+    try:
+        os.kill(pid, signal.SIGTERM)
+    except ProcessLookupError:
+        # There can be a race condition that the process has already terminated.
+        # We just ignore and log the fact.
+        logger.info(
+            "Failed to kill process with pid %s. Process might have terminated it self.",
+            pid,
+        )
+
 
+def _get_processes() -> list[tuple[int, int]]:
+    """Get the PIDs of the reactive runners processes with their number of jobs.
 
-def _get_pids() -> list[int]:
-    """Get the PIDs of the reactive runners processes.
+    A process spawned without the number of jobs handles a single job.
 
     Returns:
-        The PIDs of the reactive runner processes sorted by start time in descending order.
+        The PIDs and number of jobs of the reactive runner processes sorted by start time in
+        descending order.
 
     Raises:
         ReactiveRunnerError: If the command to get the PIDs fails
@@ -97,14 +140,19 @@ def _get_pids() -> list[int]:
     # -bash                                                     2302498
     # /bin/sh -c /usr/bin/python3 -m github_runner_manager.reac 1757306
     # /usr/bin/python3 -m github_runner_manager.reactive.runner 1757308
+    # /usr/bin/python3 -m github_runner_manager.reactive.runner --jobs 4 1757310
 
     # we filter for the command line of the reactive runner processes and extract the PID
+    # and the number of jobs
 
-    return [
-        int(line.rstrip().rsplit(maxsplit=1)[-1])
-        for line in result.stdout.decode().split("\n")
-        if line.startswith(REACTIVE_RUNNER_CMD_LINE_PREFIX)
-    ]
+    processes = []
+    for line in result.stdout.decode().split("\n"):
+        if not line.startswith(REACTIVE_RUNNER_CMD_LINE_PREFIX):
+            continue
+        *args, pid = line[len(REACTIVE_RUNNER_CMD_LINE_PREFIX) :].split()
+        jobs = int(args[1]) if args[:1] == [REACTIVE_RUNNER_JOBS_ARG] else 1
+        processes.append((int(pid), jobs))
+    return processes
 
 
 def _setup_logging_for_processes(system_user_config: SystemUserConfig) -> None:
@@ -119,11 +167,12 @@ def _setup_logging_for_processes(system_user_config: SystemUserConfig) -> None:
     )
 
 
-def _spawn_runner(runner_config: RunnerConfig) -> None:
+def _spawn_runner(runner_config: RunnerConfig, jobs: int) -> None:
     """Spawn a runner.
 
     Args:
         runner_config: The runner configuration to pass to the spawned runner process.
+        jobs: The number of jobs the spawned runner process handles.
     """
     env = {
         "PYTHONPATH": os.environ["PYTHONPATH"],
@@ -136,6 +185,8 @@ def _spawn_runner(runner_config: RunnerConfig) -> None:
             PYTHON_BIN,
             "-m",
             REACTIVE_RUNNER_SCRIPT_MODULE,
+            REACTIVE_RUNNER_JOBS_ARG,
+            str(jobs),
             ">>",
             # $$ will be replaced by the PID of the process, so we can track the error log easily.
             f"{REACTIVE_RUNNER_LOG_DIR}/$$.log",
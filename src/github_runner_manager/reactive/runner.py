@@ -3,6 +3,7 @@
 #  See LICENSE file for licensing details.
 
 """Script to spawn a reactive runner process."""
+import argparse
 import logging
 import os
 import sys
@@ -10,8 +11,11 @@ import sys
 from github_runner_manager.github_client import GithubClient
 from github_runner_manager.manager.runner_manager import RunnerManager
 from github_runner_manager.openstack_cloud.openstack_runner_manager import OpenStackRunnerManager
-from github_runner_manager.reactive.consumer import consume
-from github_runner_manager.reactive.process_manager import RUNNER_CONFIG_ENV_VAR
+from github_runner_manager.reactive.consumer import consume, consume_jobs
+from github_runner_manager.reactive.process_manager import (
+    REACTIVE_RUNNER_JOBS_ARG,
+    RUNNER_CONFIG_ENV_VAR,
+)
 from github_runner_manager.reactive.types_ import RunnerConfig
 
 
@@ -26,7 +30,9 @@ def setup_root_logging() -> None:
 
 
 def main() -> None:
-    """Spawn a process that consumes a message from the queue to create a runner.
+    """Spawn a process that consumes messages from the queue to create runners.
+
+    The process handles the number of jobs given by the command line, a single job by default.
 
     Raises:
         ValueError: If the required environment variables are not set
@@ -40,6 +46,9 @@ def main() -> None:
         )
 
     runner_config = RunnerConfig.parse_raw(runner_config_str)
+    parser = argparse.ArgumentParser()
+    parser.add_argument(REACTIVE_RUNNER_JOBS_ARG, dest="jobs", type=int, default=1)
+    jobs = parser.parse_args().jobs
 
     setup_root_logging()
     queue_config = runner_config.queue
@@ -49,6 +58,15 @@ def main() -> None:
         config=runner_config.runner_manager,
     )
     github_client = GithubClient(token=runner_config.github_token)
+    if jobs > 1:
+        consume_jobs(
+            queue_config=queue_config,
+            runner_manager=runner_manager,
+            github_client=github_client,
+            supported_labels=runner_config.supported_labels,
+            concurrency=jobs,
+        )
+        return
     consume(
         queue_config=queue_config,
         runner_manager=runner_manager,
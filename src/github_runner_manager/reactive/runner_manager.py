@@ -67,10 +67,16 @@ def reconcile(
     If the quantity is less than the sum of the current runners,
     additional runners are killed and all reactive processes are killed.
 
+    A reactive process handling several jobs concurrently counts for that many jobs, the jobs
+    missing are handed out exactly to the processes spawned.
+
     In addition to this behaviour, reconciliation also checks the queue at the start and
     removes all idle runners if the queue is empty, to ensure that
     no idle runners are left behind if there are no new jobs.
 
+    Finally, the pool of pre-booted instances the reactive processes create runners from is
+    refilled in the background, if the cloud supports it.
+
     Args:
         expected_quantity: Number of intended amount of runners + reactive processes.
         runner_manager: The runner manager to interact with current running runners.
@@ -84,7 +90,8 @@ def reconcile(
     flush_metric_stats = {}
     delete_metric_stats = {}
 
-    if get_queue_size(runner_config.queue) == 0:
+    queue_size = get_queue_size(runner_config.queue)
+    if queue_size == 0:
         flush_metric_stats = runner_manager.flush_runners(FlushMode.FLUSH_IDLE)
 
     # Only count runners which are online on GitHub to prevent machines to be just in
@@ -95,10 +102,10 @@ def reconcile(
     runner_diff = expected_quantity - len(runners)
 
     if runner_diff >= 0:
-        process_quantity = runner_diff
+        job_quantity = runner_diff
     else:
         delete_metric_stats = runner_manager.delete_runners(-runner_diff)
-        process_quantity = 0
+        job_quantity = 0
 
     metric_stats = {
         event_name: delete_metric_stats.get(event_name, 0)
@@ -110,8 +117,9 @@ def reconcile(
     }
 
     processes_created = process_manager.reconcile(
-        quantity=process_quantity,
+        quantity=job_quantity,
         runner_config=runner_config,
     )
+    runner_manager.refill_warm_pool(queue_size=queue_size)
 
     return ReconcileResult(processes_diff=processes_created, metric_stats=metric_stats)
@@ -3,7 +3,7 @@
 
 """Module containing reactive scheduling related types."""
 
-from pydantic import BaseModel, MongoDsn
+from pydantic import BaseModel, Field, MongoDsn
 
 from github_runner_manager.manager.runner_manager import RunnerManagerConfig
 from github_runner_manager.openstack_cloud.openstack_runner_manager import (
@@ -34,6 +34,8 @@ class RunnerConfig(BaseModel):
         system_user: The configuration for the system user used to spawn processes.
         github_token: str
         supported_labels: The supported labels for the runner.
+        jobs_per_process: The maximum number of jobs a reactive process handles concurrently. The
+            process exits once its jobs are settled.
     """
 
     queue: QueueConfig
@@ -42,3 +44,4 @@ class RunnerConfig(BaseModel):
     system_user: SystemUserConfig
     github_token: str
     supported_labels: set[str]
+    jobs_per_process: int = Field(1, ge=1)
@@ -98,6 +98,36 @@ class RepoPolicyComplianceConfig(BaseModel):
     url: AnyHttpUrl
 
 
+class MetricsReceiverConfig(BaseModel):
+    """Configuration for the receiver of the metrics pushed by the runners.
+
+    Attributes:
+        url: URL of the receiver, reachable from the runner instances.
+        secret: Secret the tokens of the runners are derived from.
+    """
+
+    url: AnyHttpUrl
+    secret: str
+
+    @validator("url")
+    @classmethod
+    def check_url_scheme(cls, url: AnyHttpUrl) -> AnyHttpUrl:
+        """Validate the URL of the receiver.
+
+        Args:
+            url: The URL of the receiver.
+
+        Raises:
+            ValueError: if the URL is not a plain HTTP URL, the receiver does not serve TLS.
+
+        Returns:
+            Validated URL.
+        """
+        if url.scheme != "http":
+            raise ValueError("the metrics receiver only serves plain HTTP")
+        return url
+
+
 class SystemUserConfig(BaseModel):
     """Configuration for which user to use when spawning processes or accessing resources.
 
@@ -6,6 +6,7 @@
 import functools
 import logging
 import os
+import random
 import subprocess  # nosec B404
 import time
 from typing import Any, Callable, Optional, Sequence, Type, TypeVar
@@ -29,6 +30,7 @@ def retry(  # pylint: disable=too-many-arguments, too-many-positional-arguments
     max_delay: Optional[float] = None,
     backoff: float = 1,
     local_logger: logging.Logger = logger,
+    jitter: float = 0,
 ) -> Callable[[Callable[ParamT, ReturnT]], Callable[ParamT, ReturnT]]:
     """Parameterize the decorator for adding retry to functions.
 
@@ -39,6 +41,8 @@ def retry(  # pylint: disable=too-many-arguments, too-many-positional-arguments
         max_delay: Max time in seconds to wait between retry.
         backoff: Factor to increase the delay by each retry.
         local_logger: Logger for logging.
+        jitter: Max random time in seconds added to each wait between retry, to spread out
+            retries started at the same time.
 
     Returns:
         The function decorator for retry.
@@ -84,13 +88,14 @@ def retry(  # pylint: disable=too-many-arguments, too-many-positional-arguments
                             local_logger.exception("Retry limit of %s exceed: %s", tries, err)
                         raise
 
+                    # The jitter only spreads out the retries, it is not security sensitive.
+                    wait = current_delay + random.uniform(0, jitter)  # nosec B311
+
                     if local_logger is not None:
-                        local_logger.warning(
-                            "Retrying error in %s seconds: %s", current_delay, err
-                        )
+                        local_logger.warning("Retrying error in %s seconds: %s", wait, err)
                         local_logger.debug("Error to be retried:", stack_info=True)
 
-                    time.sleep(current_delay)
+                    time.sleep(wait)
 
                     current_delay *= backoff
 
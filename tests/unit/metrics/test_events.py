@@ -1,10 +1,13 @@
 #  Copyright 2024 Canonical Ltd.
 #  See LICENSE file for licensing details.
 import json
+import threading
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import pytest
 
+from github_runner_manager.errors import IssueMetricEventError
 from github_runner_manager.metrics import events
 
 TEST_LOKI_PUSH_API_URL = "http://loki:3100/api/prom/push"
@@ -65,3 +68,157 @@ def test_issue_events_exclude_none_values(tmp_path: Path):
         "status": "status",
         "job_duration": 456,
     }
+
+
+def test_batched_events_written_on_exit():
+    """
+    arrange: Change path of the events log.
+    act: Issue metric events within a batch.
+    assert: The events are written together on exit of the batch, one per line.
+    """
+    with events.batched_events():
+        for timestamp in range(3):
+            events.issue_event(
+                events.RunnerInstalled(timestamp=timestamp, flavor="small", duration=1)
+            )
+        assert not events.METRICS_LOG_PATH.exists()
+
+    lines = events.METRICS_LOG_PATH.read_text().splitlines()
+    assert [json.loads(line)["timestamp"] for line in lines] == [0, 1, 2]
+
+
+def test_batched_events_written_over_size(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Change path of the events log and lower the batch size threshold.
+    act: Issue metric events within a batch.
+    assert: The events are written once the batch exceeds the size threshold.
+    """
+    monkeypatch.setattr(events, "BATCH_MAX_BYTES", 100)
+    event = events.RunnerInstalled(timestamp=123, flavor="small", duration=456)
+
+    with events.batched_events():
+        events.issue_event(event)
+        assert not events.METRICS_LOG_PATH.exists()
+        events.issue_event(event)
+        assert len(events.METRICS_LOG_PATH.read_text().splitlines()) == 2
+
+
+def test_batched_events_kept_on_write_failure(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Lower the batch size threshold and make the first write of the events log fail.
+    act: Issue metric events within a batch.
+    assert: No error is raised by the failed write, the events are written and counted on exit.
+    """
+    monkeypatch.setattr(events, "BATCH_MAX_BYTES", 100)
+    append = events._append
+    failures = [OSError("disk full")]
+
+    def _append_failing_once(data: bytes) -> None:
+        """Fail the first write."""
+        if failures:
+            raise failures.pop()
+        append(data)
+
+    monkeypatch.setattr(events, "_append", _append_failing_once)
+    event = events.RunnerInstalled(timestamp=123, flavor="small", duration=456)
+
+    with events.batched_events() as issued:
+        events.issue_event(event)
+        events.issue_event(event)
+        assert not failures
+        assert not issued
+
+    assert len(events.METRICS_LOG_PATH.read_text().splitlines()) == 2
+    assert issued == {events.RunnerInstalled: 2}
+
+
+def test_batched_events_not_counted_on_write_failure(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Make the writes of the events log fail.
+    act: Issue a metric event within a batch.
+    assert: IssueMetricEventError is raised on exit and the event is not counted.
+    """
+    monkeypatch.setattr(events, "_append", MagicMock(side_effect=OSError("disk full")))
+
+    with pytest.raises(IssueMetricEventError):
+        with events.batched_events() as issued:
+            events.issue_event(events.RunnerInstalled(timestamp=123, flavor="small", duration=1))
+
+    assert not issued
+
+
+def test_batched_events_of_other_threads_not_buffered():
+    """
+    arrange: Change path of the events log.
+    act: Issue a metric event from another thread within a batch.
+    assert: The event of the other thread is written immediately.
+    """
+    event = events.RunnerInstalled(timestamp=123, flavor="small", duration=456)
+
+    with events.batched_events() as issued:
+        thread = threading.Thread(target=events.issue_event, args=(event,))
+        thread.start()
+        thread.join()
+        assert len(events.METRICS_LOG_PATH.read_text().splitlines()) == 1
+
+    assert not issued
+
+
+def test_to_json():
+    """
+    arrange: Given an event of every metric event type, with fields set to None and nested models.
+    act: When the events are serialized.
+    assert: The output is the same as the pydantic serialization without None values.
+    """
+    all_events = [
+        events.RunnerInstalled(timestamp=123, flavor="small", duration=456),
+        events.RunnerStart(
+            timestamp=123,
+            flavor="small",
+            workflow="workflow",
+            repo="repo",
+            github_event="push",
+            idle=1.5,
+            queue_duration=None,
+        ),
+        events.RunnerStop(
+            timestamp=123,
+            flavor="small",
+            workflow="workflow",
+            repo="repo",
+            github_event="push",
+            status="status",
+            status_info=events.CodeInformation(code=1),
+            job_duration=456,
+            job_conclusion="success",
+        ),
+        events.Reconciliation(
+            timestamp=123,
+            flavor="small",
+            crashed_runners=1,
+            idle_runners=2,
+            active_runners=3,
+            expected_runners=None,
+            duration=4.5,
+        ),
+    ]
+
+    assert {type(event) for event in all_events} == set(events.Event.__subclasses__())
+    for event in all_events:
+        assert event.to_json() == event.json(exclude_none=True)
+
+
+def test_event_name():
+    """
+    arrange: Given the metric event classes.
+    act: When events are created with and without event name.
+    assert: The default event name is the class name in snake case, a given name is kept.
+    """
+    assert events.RunnerInstalled.event_name == "runner_installed"
+    assert events.RunnerInstalled(timestamp=1, flavor="small", duration=1).event == (
+        "runner_installed"
+    )
+    assert (
+        events.RunnerInstalled(timestamp=1, flavor="small", duration=1, event="other").event
+        == "other"
+    )
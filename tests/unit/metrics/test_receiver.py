@@ -0,0 +1,159 @@
+#  Copyright 2024 Canonical Ltd.
+#  See LICENSE file for licensing details.
+
+"""Module for unit-testing the receiver of the metrics pushed by the runners."""
+import socket
+import urllib.error
+import urllib.request
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import MagicMock
+
+import pytest
+
+from github_runner_manager.errors import GetMetricsStorageError
+from github_runner_manager.metrics import receiver
+from github_runner_manager.metrics import runner as runner_metrics
+from github_runner_manager.metrics.storage import MetricsStorage, StorageManager
+from github_runner_manager.types_ import MetricsReceiverConfig
+
+_SECRET = "secret"
+_RUNNER_NAME = "test-runner"
+
+
+@pytest.fixture(name="storage_manager")
+def storage_manager_fixture(tmp_path: Path) -> MagicMock:
+    """Mock the metrics storage manager with the storage of one runner."""
+    storage_manager = MagicMock(spec=StorageManager)
+
+    def _get(runner_name: str) -> MetricsStorage:
+        """Get the storage of the runner."""
+        if runner_name != _RUNNER_NAME:
+            raise GetMetricsStorageError("not found")
+        return MetricsStorage(path=tmp_path, runner_name=runner_name)
+
+    storage_manager.get.side_effect = _get
+    return storage_manager
+
+
+@pytest.fixture(name="base_url")
+def base_url_fixture(storage_manager: MagicMock) -> Iterator[str]:
+    """Start a receiver on a free port."""
+    metrics_receiver = receiver.MetricsReceiver(
+        storage_manager=storage_manager, secret=_SECRET, host="127.0.0.1", port=0
+    )
+    metrics_receiver.start()
+    yield f"http://127.0.0.1:{metrics_receiver.port}"
+    metrics_receiver.shutdown()
+
+
+def _post(url: str, token: str, content: bytes) -> int:
+    """Post a metrics file.
+
+    Args:
+        url: The URL to post to.
+        token: The token of the runner.
+        content: The content of the file.
+
+    Returns:
+        The HTTP status code.
+    """
+    request = urllib.request.Request(
+        url, data=content, method="POST", headers={"Authorization": f"Bearer {token}"}
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:  # nosec: B310
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+def test_receive_metrics(base_url: str, tmp_path: Path):
+    """
+    arrange: Given a running receiver and a runner with a metrics storage.
+    act: When the runner posts its pre-job metrics with its token.
+    assert: The metrics are stored in the storage of the runner.
+    """
+    url = f"{receiver.get_push_url(base_url, _RUNNER_NAME)}/pre-job-metrics.json"
+
+    status = _post(url, receiver.get_runner_token(_SECRET, _RUNNER_NAME), b'{"timestamp": 1}')
+
+    assert status == 204
+    content = (tmp_path / runner_metrics.PRE_JOB_METRICS_FILE_NAME).read_text()
+    assert content == '{"timestamp": 1}'
+
+
+@pytest.mark.parametrize(
+    "runner_name, file_name, token_runner_name, size, expected_status",
+    [
+        pytest.param(_RUNNER_NAME, "pre-job-metrics.json", "other", 10, 403, id="other token"),
+        pytest.param(_RUNNER_NAME, "other.json", _RUNNER_NAME, 10, 404, id="unknown file"),
+        pytest.param("unknown", "pre-job-metrics.json", "unknown", 10, 404, id="no storage"),
+        pytest.param(
+            _RUNNER_NAME,
+            "pre-job-metrics.json",
+            _RUNNER_NAME,
+            runner_metrics.FILE_SIZE_BYTES_LIMIT + 1,
+            413,
+            id="too large",
+        ),
+    ],
+)
+def test_receive_metrics_rejected(
+    base_url: str,
+    tmp_path: Path,
+    runner_name: str,
+    file_name: str,
+    token_runner_name: str,
+    size: int,
+    expected_status: int,
+):
+    """
+    arrange: Given a running receiver and a runner with a metrics storage.
+    act: When an invalid metrics file post is made.
+    assert: The post is rejected and nothing is stored.
+    """
+    url = f"{receiver.get_push_url(base_url, runner_name)}/{file_name}"
+
+    status = _post(url, receiver.get_runner_token(_SECRET, token_runner_name), b"x" * size)
+
+    assert status == expected_status
+    assert not list(tmp_path.iterdir())
+
+
+def test_idle_client_disconnected(base_url: str, monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Given a running receiver with a short request timeout.
+    act: When a client connects without sending a request.
+    assert: The connection is closed by the receiver once the timeout is over.
+    """
+    monkeypatch.setattr(receiver._MetricsRequestHandler, "timeout", 0.1)
+    port = int(base_url.rsplit(":", 1)[1])
+
+    with socket.create_connection(("127.0.0.1", port), timeout=10) as client:
+        assert client.recv(1) == b""
+
+
+@pytest.mark.parametrize(
+    "url, expected_port",
+    [
+        pytest.param("http://10.0.0.1:8089", 8089, id="port of the URL"),
+        pytest.param("http://metrics.example.com", 80, id="default port of http"),
+    ],
+)
+def test_receiver_from_config(
+    monkeypatch: pytest.MonkeyPatch, storage_manager: MagicMock, url: str, expected_port: int
+):
+    """
+    arrange: Given a metrics receiver configuration with the URL the runners post to.
+    act: When the receiver is created from the configuration.
+    assert: The receiver listens on the port of the URL with the configured secret.
+    """
+    server_mock = MagicMock()
+    monkeypatch.setattr(receiver, "_MetricsHTTPServer", server_mock)
+
+    receiver.MetricsReceiver.from_config(
+        MetricsReceiverConfig(url=url, secret=_SECRET), storage_manager
+    )
+
+    server_mock.assert_called_once_with(("0.0.0.0", expected_port), storage_manager, _SECRET)
@@ -0,0 +1,196 @@
+#  Copyright 2024 Canonical Ltd.
+#  See LICENSE file for licensing details.
+import os
+import signal
+import subprocess
+from grp import getgrgid
+from pathlib import Path
+from pwd import getpwuid
+from subprocess import CompletedProcess
+from unittest.mock import MagicMock
+
+import pytest
+
+from github_runner_manager.metrics import receiver_process
+from github_runner_manager.metrics.receiver_process import (
+    METRICS_RECEIVER_CMD_LINE_PREFIX,
+    METRICS_RECEIVER_DIGEST_ARG,
+    RECEIVER_CONFIG_ENV_VAR,
+    MetricsReceiverError,
+    ReceiverProcessConfig,
+    reconcile,
+)
+from github_runner_manager.types_ import MetricsReceiverConfig, SystemUserConfig
+from github_runner_manager.utilities import secure_run_subprocess
+
+# We assume the process running the tests is running as a user
+# that can write to the temporary directory.
+TEST_SYSTEM_USER_CONFIG = SystemUserConfig(
+    user=(passwd := getpwuid(os.getuid())).pw_name,
+    group=getgrgid(passwd.pw_gid).gr_name,
+)
+RECEIVER_CONFIG = MetricsReceiverConfig(url="http://10.0.0.1:8089", secret="secret")
+
+
+@pytest.fixture(name="log_dir", autouse=True)
+def log_dir_fixture(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """Mock the log directory of the metrics receiver process."""
+    log_dir = tmp_path / "logs"
+    monkeypatch.setattr(receiver_process, "METRICS_RECEIVER_LOG_DIR", log_dir)
+    monkeypatch.setattr("shutil.chown", lambda *args, **kwargs: None)
+    monkeypatch.setenv("PYTHONPATH", "src")
+    return log_dir
+
+
+@pytest.fixture(name="secure_run_subprocess_mock")
+def secure_run_subprocess_mock_fixture(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Mock the ps command."""
+    secure_run_subprocess_mock = MagicMock(spec=secure_run_subprocess)
+    monkeypatch.setattr(receiver_process, "secure_run_subprocess", secure_run_subprocess_mock)
+    return secure_run_subprocess_mock
+
+
+@pytest.fixture(name="os_kill_mock", autouse=True)
+def os_kill_mock_fixture(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Mock the os.kill function."""
+    os_kill_mock = MagicMock(spec=os.kill)
+    monkeypatch.setattr("os.kill", os_kill_mock)
+    return os_kill_mock
+
+
+@pytest.fixture(name="subprocess_popen_mock", autouse=True)
+def subprocess_popen_mock_fixture(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Mock the subprocess.Popen function."""
+    subprocess_popen_mock = MagicMock(
+        spec=subprocess.Popen, return_value=MagicMock(spec=subprocess.Popen, pid=1234)
+    )
+    monkeypatch.setattr("subprocess.Popen", subprocess_popen_mock)
+    return subprocess_popen_mock
+
+
+def _arrange_receiver_processes(
+    secure_run_subprocess_mock: MagicMock, digests: list[str | None]
+) -> None:
+    """Mock the receiver processes running.
+
+    Args:
+        secure_run_subprocess_mock: The mock of the ps command.
+        digests: The configuration digests of the processes, None for no digest.
+    """
+    lines = ["-bash 99"]
+    for pid, digest in enumerate(digests, start=1):
+        args = f" {METRICS_RECEIVER_DIGEST_ARG} {digest}" if digest is not None else ""
+        lines.append(f"{METRICS_RECEIVER_CMD_LINE_PREFIX}{args} {pid}")
+    secure_run_subprocess_mock.return_value = CompletedProcess(
+        args=[], returncode=0, stdout="\n".join(lines).encode(), stderr=b""
+    )
+
+
+def _get_digest() -> str:
+    """Get the configuration digest of the test configuration.
+
+    Returns:
+        The digest.
+    """
+    return receiver_process._get_config_digest(
+        ReceiverProcessConfig(
+            receiver=RECEIVER_CONFIG, system_user=TEST_SYSTEM_USER_CONFIG, storage_on_tmpfs=False
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "running, receiver_config, expected_killed, expected_spawned",
+    [
+        pytest.param([], RECEIVER_CONFIG, [], True, id="spawned"),
+        pytest.param(["current"], RECEIVER_CONFIG, [], False, id="kept"),
+        pytest.param(["current", "current"], RECEIVER_CONFIG, [2], False, id="duplicate killed"),
+        pytest.param(["outdated", None], RECEIVER_CONFIG, [1, 2], True, id="replaced"),
+        pytest.param(["current"], None, [1], False, id="not configured"),
+    ],
+)
+def test_reconcile(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    secure_run_subprocess_mock: MagicMock,
+    os_kill_mock: MagicMock,
+    subprocess_popen_mock: MagicMock,
+    log_dir: Path,
+    running: list[str | None],
+    receiver_config: MetricsReceiverConfig | None,
+    expected_killed: list[int],
+    expected_spawned: bool,
+):
+    """
+    arrange: Given metrics receiver processes running with the current or another configuration.
+    act: Reconcile the metrics receiver process.
+    assert: A single process runs with the current configuration if the receiver is configured.
+    """
+    digest = _get_digest()
+    _arrange_receiver_processes(
+        secure_run_subprocess_mock,
+        [digest if process == "current" else process for process in running],
+    )
+
+    reconcile(receiver_config, system_user=TEST_SYSTEM_USER_CONFIG, storage_on_tmpfs=False)
+
+    assert [call.args for call in os_kill_mock.call_args_list] == [
+        (pid, signal.SIGTERM) for pid in expected_killed
+    ]
+    assert subprocess_popen_mock.called == expected_spawned
+    if expected_spawned:
+        command = subprocess_popen_mock.call_args.args[0]
+        assert " ".join(command) == (
+            f"{METRICS_RECEIVER_CMD_LINE_PREFIX} {METRICS_RECEIVER_DIGEST_ARG} {digest}"
+        )
+        env = subprocess_popen_mock.call_args.kwargs["env"]
+        assert ReceiverProcessConfig.parse_raw(env[RECEIVER_CONFIG_ENV_VAR]).receiver == (
+            RECEIVER_CONFIG
+        )
+        assert (log_dir / "receiver.log").exists()
+
+
+def test_reconcile_ps_failure(secure_run_subprocess_mock: MagicMock):
+    """
+    arrange: Given the command listing the processes failing.
+    act: Reconcile the metrics receiver process.
+    assert: MetricsReceiverError is raised.
+    """
+    secure_run_subprocess_mock.return_value = CompletedProcess(
+        args=[], returncode=1, stdout=b"", stderr=b"error"
+    )
+
+    with pytest.raises(MetricsReceiverError):
+        reconcile(RECEIVER_CONFIG, system_user=TEST_SYSTEM_USER_CONFIG, storage_on_tmpfs=False)
+
+
+def test_main(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Given the configuration of the metrics receiver process in the environment.
+    act: Run the process and terminate it.
+    assert: The receiver is started with the configuration, then shut down.
+    """
+    config = ReceiverProcessConfig(
+        receiver=RECEIVER_CONFIG, system_user=TEST_SYSTEM_USER_CONFIG, storage_on_tmpfs=True
+    )
+    monkeypatch.setenv(RECEIVER_CONFIG_ENV_VAR, config.json())
+    receiver_mock = MagicMock(spec=receiver_process.MetricsReceiver)
+    monkeypatch.setattr(receiver_process, "MetricsReceiver", receiver_mock)
+    storage_manager_mock = MagicMock()
+    monkeypatch.setattr(
+        receiver_process.metrics_storage, "TmpfsStorageManager", storage_manager_mock
+    )
+    handlers = {}
+    monkeypatch.setattr(
+        receiver_process.signal,
+        "signal",
+        lambda signum, handler: handlers.update({signum: handler}),
+    )
+    receiver = receiver_mock.from_config.return_value
+    receiver.start.side_effect = lambda: handlers[signal.SIGTERM](signal.SIGTERM, None)
+
+    receiver_process.main()
+
+    receiver_mock.from_config.assert_called_once_with(
+        RECEIVER_CONFIG, storage_manager_mock.return_value
+    )
+    storage_manager_mock.assert_called_once_with(system_user_config=TEST_SYSTEM_USER_CONFIG)
+    receiver.shutdown.assert_called_once_with()
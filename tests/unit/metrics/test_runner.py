@@ -245,6 +245,78 @@ def test_extract(runner_fs_base: Path):
     )
 
 
+def _create_runners_with_metrics(runner_fs_base: Path, count: int) -> list[MetricsStorage]:
+    """Create metrics storages of runners with all metrics.
+
+    Args:
+        runner_fs_base: The base path of the metrics storage.
+        count: The number of runners.
+
+    Returns:
+        The metrics storages.
+    """
+    metrics_storages = []
+    for _ in range(count):
+        data = _create_metrics_data(secrets.token_hex(16))
+        metrics_storages.append(
+            _create_runner_files(
+                runner_fs_base,
+                data.runner_name,
+                data.pre_job.json(),
+                data.post_job.json(),
+                str(data.installed_timestamp),
+                str(data.installation_start_timestamp),
+            )
+        )
+    return metrics_storages
+
+
+def test_extract_concurrently(runner_fs_base: Path):
+    """
+    arrange: Runners with metrics.
+    act: Call extract with a concurrency.
+    assert: The metrics of all runners are extracted and their storages are deleted.
+    """
+    metrics_storages = _create_runners_with_metrics(runner_fs_base, 20)
+    metrics_storage_manager = MagicMock()
+    metrics_storage_manager.list_all.return_value = metrics_storages
+
+    extracted_metrics = list(
+        runner_metrics.extract(
+            metrics_storage_manager=metrics_storage_manager, runners=set(), concurrency=4
+        )
+    )
+
+    runner_names = {ms.runner_name for ms in metrics_storages}
+    assert {metrics.runner_name for metrics in extracted_metrics} == runner_names
+    assert {
+        delete_call.args[0] for delete_call in metrics_storage_manager.delete.call_args_list
+    } == runner_names
+
+
+def test_extract_concurrently_stopped(runner_fs_base: Path):
+    """
+    arrange: Runners with metrics.
+    act: Call extract with a concurrency and stop iterating after the first metrics.
+    assert: Only the storages submitted ahead of the first metrics are extracted.
+    """
+    metrics_storage_manager = MagicMock()
+    metrics_storage_manager.list_all.return_value = _create_runners_with_metrics(
+        runner_fs_base, 20
+    )
+
+    extracted_metrics = runner_metrics.extract(
+        metrics_storage_manager=metrics_storage_manager, runners=set(), concurrency=2
+    )
+    next(extracted_metrics)
+    extracted_metrics.close()
+
+    assert (
+        metrics_storage_manager.delete.call_count
+        <= 2 * runner_metrics._EXTRACT_IN_FLIGHT_PER_WORKER
+    )
+
+
 def test_extract_ignores_runners(runner_fs_base: Path):
     """
     arrange: Runners with metrics.
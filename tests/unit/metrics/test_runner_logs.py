@@ -1,6 +1,10 @@
 #  Copyright 2024 Canonical Ltd.
 #  See LICENSE file for licensing details.
+import gzip
+import os
+import time
 from pathlib import Path
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -29,3 +33,109 @@ def test_remove_outdated_crashed(log_dir_base_path: Path, monkeypatch: pytest.Mo
     runner_logs.remove_outdated()
 
     assert not log_dir_path.exists()
+
+
+def test_retention_evicts_by_age_and_size(tmp_path: Path):
+    """
+    arrange: Given logs on disk over the age limit, and logs written over the size limit.
+    act: Evict the logs.
+    assert: The old logs and the oldest logs over the size limit are removed.
+    """
+    old_logs = tmp_path / "old"
+    old_logs.mkdir()
+    old_logs.joinpath("syslog").write_bytes(b"x" * 10)
+    os.utime(old_logs, (time.time() - 7200, time.time() - 7200))
+    retention = runner_logs.RunnerLogsRetention(logs_dir=tmp_path, max_age=3600, max_bytes=150)
+    for runner_name in ("oldest", "recent"):
+        retention.write_log(runner_name, "syslog", [b"x" * 50, b"x" * 50])
+
+    evicted = retention.evict()
+
+    assert evicted == ["old", "oldest"]
+    assert {path.name for path in tmp_path.iterdir() if path.is_dir()} == {"recent"}
+    assert retention.total_size == 100
+
+
+def test_retention_evicts_nothing_within_limits(tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Given logs within the age and size limits indexed by another retention.
+    act: Evict the logs.
+    assert: Nothing is removed and the logs directory is not listed again.
+    """
+    runner_logs.RunnerLogsRetention(logs_dir=tmp_path).create_logs_dir("runner")
+    # Sync the index with the logs directory, last changed a while ago.
+    os.utime(tmp_path, ns=(0, 0))
+    runner_logs.RunnerLogsRetention(logs_dir=tmp_path).create_logs_dir("other")
+    scandir_mock = MagicMock()
+    monkeypatch.setattr(runner_logs.os, "scandir", scandir_mock)
+
+    assert runner_logs.RunnerLogsRetention(logs_dir=tmp_path).evict() == []
+    scandir_mock.assert_not_called()
+
+
+def test_retention_indexes_outside_changes(tmp_path: Path):
+    """
+    arrange: Given logs created and removed without the retention after the index is synced.
+    act: Evict the logs over the age limit.
+    assert: The logs created without the retention are indexed and evicted, the logs removed
+        are no longer indexed.
+    """
+    retention = runner_logs.RunnerLogsRetention(logs_dir=tmp_path, max_age=3600)
+    for runner_name in ("removed", "kept"):
+        retention.create_logs_dir(runner_name)
+    os.utime(tmp_path, ns=(0, 0))
+    assert retention.total_size == 0
+    tmp_path.joinpath("removed").rmdir()
+    tmp_path.joinpath("outside").mkdir()
+    tmp_path.joinpath("outside", "syslog").write_bytes(b"x" * 10)
+    os.utime(tmp_path / "outside", (time.time() - 7200, time.time() - 7200))
+    assert retention.total_size == 10
+
+    assert retention.evict() == ["outside"]
+    assert not tmp_path.joinpath("outside").exists()
+    assert retention.total_size == 0
+
+
+def test_create_logs_dir_indexed(log_dir_base_path: Path):
+    """
+    arrange: Given the logs directory of a runner created with the module function.
+    act: Write a log file and update the size of the logs.
+    assert: The logs are indexed.
+    """
+    logs_dir = runner_logs.create_logs_dir("runner")
+    logs_dir.joinpath("syslog").write_bytes(b"x" * 42)
+    retention = runner_logs.RunnerLogsRetention(logs_dir=log_dir_base_path)
+
+    retention.update_size("runner")
+
+    assert retention.total_size == 42
+
+
+def test_retention_compress(tmp_path: Path):
+    """
+    arrange: Given a retention compressing the logs.
+    act: Write a log.
+    assert: The log is gzipped and its compressed size is indexed.
+    """
+    retention = runner_logs.RunnerLogsRetention(logs_dir=tmp_path, compress=True)
+
+    log_path = retention.write_log("runner", "syslog", [b"line\n"] * 1000)
+
+    assert log_path == tmp_path / "runner" / "syslog.gz"
+    assert gzip.decompress(log_path.read_bytes()) == b"line\n" * 1000
+    assert retention.total_size == log_path.stat().st_size < 5000
+
+
+def test_retention_update_size(tmp_path: Path):
+    """
+    arrange: Given a logs directory created by the retention.
+    act: Write a log file directly in the directory and update the size of the logs.
+    assert: The size of the log file is indexed.
+    """
+    retention = runner_logs.RunnerLogsRetention(logs_dir=tmp_path)
+    logs_dir = retention.create_logs_dir("runner")
+    logs_dir.joinpath("syslog").write_bytes(b"x" * 42)
+
+    retention.update_size("runner")
+
+    assert retention.total_size == 42
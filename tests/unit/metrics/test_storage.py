@@ -3,9 +3,11 @@
 import os
 import secrets
 import tarfile
+import time
 from grp import getgrgid
 from pathlib import Path
 from pwd import getpwuid
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -19,6 +21,7 @@ from github_runner_manager.metrics import storage
 from github_runner_manager.metrics.storage import (
     _FILESYSTEM_BASE_DIR_NAME,
     _FILESYSTEM_QUARANTINE_DIR_NAME,
+    _FILESYSTEM_QUARANTINE_STAGING_DIR_NAME,
     MetricsStorage,
     StorageManager,
 )
@@ -39,6 +42,7 @@ def filesystem_paths_fixture(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) ->
     return {
         "base": tmp_path / _FILESYSTEM_BASE_DIR_NAME,
         "quarantine": tmp_path / _FILESYSTEM_QUARANTINE_DIR_NAME,
+        "staging": tmp_path / _FILESYSTEM_QUARANTINE_STAGING_DIR_NAME,
     }
 
 
@@ -162,7 +166,8 @@ def test_quarantine(filesystem_paths: dict[str, Path], tmp_path: Path):
     """
     arrange: Create a storage for a runner with a file in it.
     act: Call quarantine.
-    assert: The storage is moved to the quarantine.
+    assert: The storage is moved out of the base directory at once and archived in the
+        quarantine in the background.
     """
     runner_name = secrets.token_hex(16)
     storage_manager = StorageManager(TEST_SYSTEM_USER_CONFIG)
@@ -171,12 +176,15 @@ def test_quarantine(filesystem_paths: dict[str, Path], tmp_path: Path):
 
     storage_manager.move_to_quarantine(runner_name)
 
+    assert not ms.path.exists()
+    assert [ms.runner_name for ms in storage_manager.list_all()] == []
+    storage_manager.wait_quarantine()
     tarfile_path = filesystem_paths["quarantine"].joinpath(runner_name).with_suffix(".tar.gz")
     assert tarfile_path.exists()
     tarfile.open(tarfile_path).extractall(path=tmp_path)
     assert tmp_path.joinpath(f"{runner_name}/test.txt").exists()
     assert tmp_path.joinpath(f"{runner_name}/test.txt").read_text(encoding="utf-8") == "foo bar"
-    assert not ms.path.exists()
+    assert not list(filesystem_paths["staging"].iterdir())
 
 
 def test_quarantine_raises_error():
@@ -190,3 +198,183 @@ def test_quarantine_raises_error():
 
     with pytest.raises(QuarantineMetricsStorageError):
         storage_manager.move_to_quarantine(runner_name)
+
+
+def test_list_all_catalog(filesystem_paths: dict[str, Path], monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Given storages created and deleted after the catalog is built, and one made on disk.
+    act: Call list_all.
+    assert: The storages are listed from the catalog while the base directory is unchanged, and
+        the storage created on disk is listed once the base directory changes.
+    """
+    storage_manager = StorageManager(TEST_SYSTEM_USER_CONFIG)
+    filesystem_paths["base"].mkdir()
+    # Build the catalog from the base directory, last changed a while ago.
+    os.utime(filesystem_paths["base"], ns=(0, 0))
+    list(storage_manager.list_all())
+    created, deleted = (storage_manager.create(secrets.token_hex(16)) for _ in range(2))
+    storage_manager.delete(deleted.runner_name)
+    scan_mock = MagicMock(wraps=storage.os.scandir)
+    monkeypatch.setattr(storage.os, "scandir", scan_mock)
+
+    assert [ms.runner_name for ms in storage_manager.list_all()] == [created.runner_name]
+    scan_mock.assert_not_called()
+
+    filesystem_paths["base"].joinpath("external").mkdir()
+
+    assert {ms.runner_name for ms in storage_manager.list_all()} == {
+        created.runner_name,
+        "external",
+    }
+    scan_mock.assert_called_once()
+
+
+def test_list_all_catalog_concurrent_change(
+    filesystem_paths: dict[str, Path], monkeypatch: pytest.MonkeyPatch
+):
+    """
+    arrange: Given a storage created on disk by another process while a storage is deleted.
+    act: Call list_all.
+    assert: The base directory is scanned again and the storage created on disk is listed.
+    """
+    storage_manager = StorageManager(TEST_SYSTEM_USER_CONFIG)
+    filesystem_paths["base"].mkdir()
+    os.utime(filesystem_paths["base"], ns=(0, 0))
+    list(storage_manager.list_all())
+    deleted = storage_manager.create(secrets.token_hex(16))
+    rmtree = storage.shutil.rmtree
+
+    def _rmtree_with_concurrent_create(path: Path) -> None:
+        """Delete a storage while another process creates one."""
+        rmtree(path)
+        filesystem_paths["base"].joinpath("external").mkdir()
+
+    monkeypatch.setattr(storage.shutil, "rmtree", _rmtree_with_concurrent_create)
+    storage_manager.delete(deleted.runner_name)
+
+    assert [ms.runner_name for ms in storage_manager.list_all()] == ["external"]
+
+
+def test_list_outdated(filesystem_paths: dict[str, Path]):
+    """
+    arrange: Given an outdated storage, a storage modified recently and a recent storage.
+    act: Call list_outdated.
+    assert: Only the outdated storage is listed.
+    """
+    storage_manager = StorageManager(TEST_SYSTEM_USER_CONFIG)
+    outdated, modified, _ = (storage_manager.create(secrets.token_hex(16)) for _ in range(3))
+    two_hours_ago = time.time() - 7200
+    os.utime(outdated.path, (two_hours_ago, two_hours_ago))
+    os.utime(modified.path, (two_hours_ago, two_hours_ago))
+    # Rebuild the catalog with the modification times on disk.
+    os.utime(filesystem_paths["base"], ns=(0, 0))
+    list(storage_manager.list_all())
+    modified.path.joinpath("pre-job-metrics.json").write_text("{}")
+
+    assert [ms.runner_name for ms in storage_manager.list_outdated(3600)] == [outdated.runner_name]
+
+
+def test_create_prepares_directories_once(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Given a storage manager.
+    act: Create the storage of two runners.
+    assert: The ownership of the base, quarantine and staging directories is set only once.
+    """
+    chown_mock = MagicMock()
+    monkeypatch.setattr(storage.shutil, "chown", chown_mock)
+    storage_manager = StorageManager(TEST_SYSTEM_USER_CONFIG)
+
+    storage_manager.create(secrets.token_hex(16))
+    storage_manager.create(secrets.token_hex(16))
+
+    assert chown_mock.call_count == 3
+
+
+def test_tmpfs_storage(filesystem_paths: dict[str, Path], tmp_path: Path):
+    """
+    arrange: Given a storage manager on a tmpfs.
+    act: Create the storage of a runner, list the storages and quarantine the storage.
+    assert: The storage is created in the directory of the user on the tmpfs and archived in
+        the quarantine directory.
+    """
+    tmpfs_dir = tmp_path / "shm"
+    tmpfs_dir.mkdir()
+    storage_manager = storage.TmpfsStorageManager(TEST_SYSTEM_USER_CONFIG, tmpfs_dir=tmpfs_dir)
+    runner_name = secrets.token_hex(16)
+
+    ms = storage_manager.create(runner_name)
+    listed = list(storage_manager.list_all())
+    storage_manager.move_to_quarantine(runner_name)
+    storage_manager.wait_quarantine()
+
+    user_dir = tmpfs_dir / f"github-runner-metrics-{TEST_SYSTEM_USER_CONFIG.user}"
+    assert ms.path == user_dir / _FILESYSTEM_BASE_DIR_NAME / runner_name
+    assert listed == [ms]
+    assert filesystem_paths["quarantine"].joinpath(runner_name).with_suffix(".tar.gz").exists()
+    assert not ms.path.exists()
+
+
+def test_tmpfs_storage_rejects_link(tmp_path: Path):
+    """
+    arrange: Given a link in place of the directory of the user on the tmpfs.
+    act: Create the storage of a runner.
+    assert: A CreateMetricsStorageError is raised and nothing is created through the link.
+    """
+    tmpfs_dir = tmp_path / "shm"
+    tmpfs_dir.mkdir()
+    target = tmp_path / "target"
+    target.mkdir()
+    tmpfs_dir.joinpath(f"github-runner-metrics-{TEST_SYSTEM_USER_CONFIG.user}").symlink_to(target)
+    storage_manager = storage.TmpfsStorageManager(TEST_SYSTEM_USER_CONFIG, tmpfs_dir=tmpfs_dir)
+
+    with pytest.raises(CreateMetricsStorageError):
+        storage_manager.create(secrets.token_hex(16))
+
+    assert not list(target.iterdir())
+
+
+def test_quarantine_archives_staged_leftovers(filesystem_paths: dict[str, Path]):
+    """
+    arrange: Given a storage left in the quarantine staging directory by a previous process.
+    act: Quarantine the storage of a runner.
+    assert: Both storages are archived.
+    """
+    storage_manager = StorageManager(TEST_SYSTEM_USER_CONFIG)
+    runner_name = secrets.token_hex(16)
+    storage_manager.create(runner_name)
+    filesystem_paths["staging"].joinpath("leftover").mkdir()
+
+    storage_manager.move_to_quarantine(runner_name)
+    storage_manager.wait_quarantine()
+
+    assert {path.name for path in filesystem_paths["quarantine"].iterdir()} == {
+        f"{runner_name}.tar.gz",
+        "leftover.tar.gz",
+    }
+    assert not list(filesystem_paths["staging"].iterdir())
+
+
+def test_quarantine_eviction(filesystem_paths: dict[str, Path]):
+    """
+    arrange: Given quarantine archives over the age limit, and archives over the size limit.
+    act: Quarantine the storage of a runner.
+    assert: The old archives and the oldest archive over the size limit are evicted.
+    """
+    storage_manager = StorageManager(
+        TEST_SYSTEM_USER_CONFIG, quarantine_max_bytes=2000, quarantine_max_age=3600
+    )
+    runner_name = secrets.token_hex(16)
+    storage_manager.create(runner_name)
+    now = time.time()
+    for name, age in (("expired", 7200), ("oldest", 600), ("recent", 60)):
+        archive = filesystem_paths["quarantine"] / f"{name}.tar.gz"
+        archive.write_bytes(b"x" * 1000)
+        os.utime(archive, (now - age, now - age))
+
+    storage_manager.move_to_quarantine(runner_name)
+    storage_manager.wait_quarantine()
+
+    assert {path.name for path in filesystem_paths["quarantine"].iterdir()} == {
+        "recent.tar.gz",
+        f"{runner_name}.tar.gz",
+    }
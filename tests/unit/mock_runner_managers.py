@@ -387,13 +387,16 @@ class MockCloudRunnerManager(CloudRunnerManager):
             }
         return iter([MagicMock()])
 
-    def cleanup(self, remove_token: str) -> Iterator[RunnerMetrics]:
+    def cleanup(
+        self, remove_token: str, runners: Sequence[CloudRunnerInstance] | None = None
+    ) -> Iterator[RunnerMetrics]:
         """Cleanup runner and resource on the cloud.
 
         Perform health check on runner and delete the runner if it fails.
 
         Args:
             remove_token: The GitHub remove token for removing runners.
+            runners: The runners with their health known from a recent state snapshot.
 
         Returns:
             Any runner metrics produced during cleanup.
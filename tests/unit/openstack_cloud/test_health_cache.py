@@ -0,0 +1,126 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Module for unit-testing the cache of the runner health check results."""
+from datetime import datetime, timedelta
+
+import pytest
+
+from github_runner_manager.openstack_cloud import health_cache, openstack_cloud
+from tests.unit.factories import openstack_factory
+
+_PREFIX = "test"
+
+
+def _create_instance(
+    instance_id: str, status: str = "ACTIVE", age: timedelta = timedelta(hours=1)
+) -> openstack_cloud.OpenstackInstance:
+    """Create an OpenstackInstance managed under the test prefix.
+
+    Args:
+        instance_id: The instance ID.
+        status: The server status.
+        age: The time since the creation of the server.
+
+    Returns:
+        The OpenstackInstance.
+    """
+    return openstack_cloud.OpenstackInstance(
+        server=openstack_factory.ServerFactory(
+            name=f"{_PREFIX}-{instance_id}",
+            status=status,
+            created_at=(datetime.now() - age).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        ),
+        prefix=_PREFIX,
+    )
+
+
+@pytest.fixture(name="clock")
+def clock_fixture(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Mock the monotonic clock of the health cache.
+
+    Returns:
+        A one element list holding the current time, to be advanced by the test.
+    """
+    now = [1000.0]
+    monkeypatch.setattr(health_cache.time, "monotonic", lambda: now[0])
+    return now
+
+
+@pytest.mark.parametrize(
+    "instance, healthy, expect_cached",
+    [
+        pytest.param(_create_instance("idle"), True, True, id="healthy"),
+        pytest.param(_create_instance("unhealthy"), False, False, id="unhealthy"),
+        pytest.param(_create_instance("unknown"), None, False, id="unknown"),
+        pytest.param(
+            _create_instance("booted", age=timedelta(minutes=1)), True, False, id="recently booted"
+        ),
+        pytest.param(_create_instance("building", status="BUILD"), True, False, id="not active"),
+    ],
+)
+def test_store(
+    clock: list[float],
+    instance: openstack_cloud.OpenstackInstance,
+    healthy: bool | None,
+    expect_cached: bool,
+):
+    """
+    arrange: Given a health check result of an instance stored in the cache.
+    act: When the instance is looked up within the idle TTL.
+    assert: Only the healthy result of an ACTIVE instance booted a while ago is reused.
+    """
+    cache = health_cache.HealthCache(idle_ttl=60, busy_ttl=300)
+    cache.store([instance], {instance.instance_id: healthy})
+    clock[0] += 30
+
+    cached, to_check = cache.lookup([instance])
+
+    assert (instance.instance_id in cached) == expect_cached
+    assert (instance in to_check) != expect_cached
+    assert (cache.hits, cache.misses) == ((1, 0) if expect_cached else (0, 1))
+
+
+def test_ttl_by_github_state(clock: list[float]):
+    """
+    arrange: Given healthy idle, busy and offline runners in the cache.
+    act: When the runners are looked up after the idle TTL and after the busy TTL.
+    assert: The busy runner is reused until the busy TTL, the others are re-checked.
+    """
+    idle, busy, offline = (_create_instance(name) for name in ("idle", "busy", "offline"))
+    instances = [idle, busy, offline]
+    cache = health_cache.HealthCache(idle_ttl=60, busy_ttl=300)
+    cache.store(instances, {instance.instance_id: True for instance in instances})
+    cache.update_github_states(busy=[busy.instance_id], offline=[offline.instance_id])
+
+    clock[0] += 120
+    cached, to_check = cache.lookup(instances)
+    assert list(cached) == [busy.instance_id]
+    assert to_check == [idle, offline]
+
+    clock[0] += 300
+    cached, to_check = cache.lookup(instances)
+    assert not cached
+    assert to_check == instances
+
+
+def test_invalidation(clock: list[float]):
+    """
+    arrange: Given healthy runners in the cache.
+    act: When a runner changes status, a runner is invalidated and a runner is pruned.
+    assert: The three runners are re-checked.
+    """
+    changed, invalidated, pruned = (_create_instance(name) for name in ("a", "b", "c"))
+    cache = health_cache.HealthCache()
+    cache.store(
+        [changed, invalidated, pruned],
+        {changed.instance_id: True, invalidated.instance_id: True, pruned.instance_id: True},
+    )
+
+    changed.status = "SHUTOFF"
+    cache.invalidate(invalidated.instance_id)
+    cache.prune([changed, invalidated])
+
+    cached, to_check = cache.lookup([changed, invalidated, pruned])
+    assert not cached
+    assert to_check == [changed, invalidated, pruned]
@@ -1,5 +1,8 @@
 #  Copyright 2024 Canonical Ltd.
 #  See LICENSE file for licensing details.
+import json
+import threading
+import time
 from datetime import datetime, timedelta
 from unittest.mock import MagicMock
 
@@ -158,3 +161,165 @@ def test___run_health_check_runner_installed(
     ssh_conn.run.return_value = result_mock
 
     assert health_checks._run_health_check_runner_installed(ssh_conn, instance) == expected_result
+
+
+def _create_instances(count: int) -> list[openstack_cloud.OpenstackInstance]:
+    """Create active OpenStack instances with distinct names.
+
+    Args:
+        count: The number of instances.
+
+    Returns:
+        The OpenStack instances.
+    """
+    return [
+        openstack_cloud.OpenstackInstance(
+            server=openstack_factory.ServerFactory(
+                name=f"test-{i}",
+                status="ACTIVE",
+                created_at=datetime.now().strftime("%Y-%m-%dT%H:%M:%SZ"),
+            ),
+            prefix="test",
+        )
+        for i in range(count)
+    ]
+
+
+def test_check_runners_concurrent(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Given instances whose health check blocks until all checks have started.
+    act: When check_runners is called with enough workers.
+    assert: The checks run concurrently and each result is mapped to its instance.
+    """
+    instances = _create_instances(4)
+    barrier = threading.Barrier(len(instances), timeout=5)
+
+    def _check_runner(openstack_cloud: OpenstackCloud, instance) -> bool:
+        """Wait for all checks to start and report the first instance as unhealthy."""
+        barrier.wait()
+        return instance.server_name != "test-0"
+
+    monkeypatch.setattr(health_checks, "check_runner", _check_runner)
+
+    results = health_checks.check_runners(
+        openstack_cloud=MagicMock(spec=OpenstackCloud), instances=instances, max_workers=4
+    )
+
+    assert results == {
+        instances[0].instance_id: False,
+        instances[1].instance_id: True,
+        instances[2].instance_id: True,
+        instances[3].instance_id: True,
+    }
+
+
+def test_check_runners_deadline(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Given an instance whose health check hangs past the deadline.
+    act: When check_runners is called.
+    assert: The hanging instance health is undetermined and the other results are returned.
+    """
+    instances = _create_instances(3)
+    release = threading.Event()
+
+    def _check_runner(openstack_cloud: OpenstackCloud, instance) -> bool:
+        """Hang on the first instance."""
+        if instance.server_name == "test-0":
+            release.wait(10)
+        return True
+
+    monkeypatch.setattr(health_checks, "check_runner", _check_runner)
+
+    start = time.monotonic()
+    try:
+        results = health_checks.check_runners(
+            openstack_cloud=MagicMock(spec=OpenstackCloud),
+            instances=instances,
+            max_workers=2,
+            timeout=1,
+        )
+    finally:
+        release.set()
+
+    assert time.monotonic() - start < 5
+    assert results == {
+        instances[0].instance_id: None,
+        instances[1].instance_id: True,
+        instances[2].instance_id: True,
+    }
+
+
+def _probe_report(**overrides) -> str:
+    """Create a health probe report of a runner running a job.
+
+    Args:
+        overrides: The report values to override.
+
+    Returns:
+        The JSON health probe report.
+    """
+    report = {
+        "runner_installed": True,
+        "cloud_init_ok": True,
+        "cloud_init_status": "status: running",
+        "cloud_init_error": "",
+        "processes_ok": True,
+        "listener_running": True,
+        "worker_running": True,
+        "processes_error": "",
+    }
+    report.update(overrides)
+    return json.dumps(report)
+
+
+@pytest.mark.parametrize(
+    "report, expected_result",
+    [
+        pytest.param(_probe_report(), True, id="runner running"),
+        pytest.param(_probe_report(runner_installed=False), True, id="runner in installation"),
+        pytest.param(_probe_report(cloud_init_ok=False), False, id="cloud-init status failed"),
+        pytest.param(_probe_report(cloud_init_status="status: done"), False, id="cloud-init done"),
+        pytest.param(
+            _probe_report(listener_running=False, worker_running=False),
+            False,
+            id="runner processes not running",
+        ),
+        pytest.param(_probe_report(worker_running=False), True, id="runner idle"),
+    ],
+)
+def test_check_active_runner_probe(report: str, expected_result: bool):
+    """
+    arrange: Given a health probe report of the runner state.
+    act: When check_active_runner is called.
+    assert: A single remote command is run and the expected health is returned.
+    """
+    instance = _create_instances(1)[0]
+    ssh_conn = MagicMock(spec=SSHConnection)
+    ssh_conn.run.return_value = MagicMock(spec=invoke.runners.Result, ok=True, stdout=report)
+
+    assert health_checks.check_active_runner(ssh_conn, instance) == expected_result
+    assert ssh_conn.run.call_count == 1
+
+
+def test_check_active_runner_probe_fallback():
+    """
+    arrange: Given a runner on which the health probe does not produce a report.
+    act: When check_active_runner is called.
+    assert: The runner state is collected with the individual checks.
+    """
+    instance = _create_instances(1)[0]
+    ssh_conn = MagicMock(spec=SSHConnection)
+    ssh_conn.run.side_effect = [
+        MagicMock(spec=invoke.runners.Result, ok=False, stdout="", stderr="not found"),
+        MagicMock(spec=invoke.runners.Result, ok=True, stdout="", stderr=""),
+        MagicMock(spec=invoke.runners.Result, ok=True, stdout="status: running", stderr=""),
+        MagicMock(
+            spec=invoke.runners.Result,
+            ok=True,
+            stdout=health_checks.RUNNER_WORKER_PROCESS,
+            stderr="",
+        ),
+    ]
+
+    assert health_checks.check_active_runner(ssh_conn, instance)
+    assert ssh_conn.run.call_count == 4
@@ -0,0 +1,105 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Module for unit-testing the exchange of metrics with the runner instances."""
+import io
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import paramiko
+import pytest
+from fabric import Connection as SSHConnection
+
+from github_runner_manager.errors import SSHError
+from github_runner_manager.metrics import runner as runner_metrics
+from github_runner_manager.metrics.storage import MetricsStorage, StorageManager
+from github_runner_manager.openstack_cloud import metrics_exchange
+from github_runner_manager.openstack_cloud.constants import METRICS_EXCHANGE_PATH
+
+
+def _mock_ssh_conn(remote_files: dict[str, bytes]) -> MagicMock:
+    """Create a mock SSH connection serving files over SFTP.
+
+    Args:
+        remote_files: The content of the files on the runner instance by name.
+
+    Returns:
+        The mock SSH connection.
+    """
+
+    def _open(path: str, mode: str) -> io.BytesIO:
+        """Open a remote file."""
+        name = Path(path).name
+        if name not in remote_files:
+            raise FileNotFoundError(2, "No such file")
+        return io.BytesIO(remote_files[name])
+
+    ssh_conn = MagicMock(spec=SSHConnection)
+    ssh_conn.sftp.return_value.open.side_effect = _open
+    return ssh_conn
+
+
+@pytest.fixture(name="storage_manager")
+def storage_manager_fixture(tmp_path: Path) -> MagicMock:
+    """Mock the metrics storage manager with the storage of a runner in a temporary directory."""
+    storage_manager = MagicMock(spec=StorageManager)
+    storage_manager.get.return_value = MetricsStorage(path=tmp_path, runner_name="test-runner")
+    return storage_manager
+
+
+def test_pull_runner_metrics(storage_manager: MagicMock, tmp_path: Path):
+    """
+    arrange: Given a runner with a post-job metrics file too large and no pre-job metrics file.
+    act: When the metrics are pulled.
+    assert: The other file is pulled over a single SFTP session without running commands.
+    """
+    ssh_conn = _mock_ssh_conn(
+        {
+            "runner-installed.timestamp": b"1234",
+            "post-job-metrics.json": b"x" * (metrics_exchange.MAX_METRICS_FILE_SIZE + 1),
+        }
+    )
+
+    metrics_exchange.pull_runner_metrics(storage_manager, "test-runner", ssh_conn)
+
+    ssh_conn.sftp.assert_called_once()
+    ssh_conn.run.assert_not_called()
+    assert ssh_conn.sftp.return_value.open.call_count == 3
+    ssh_conn.sftp.return_value.open.assert_any_call(
+        str(METRICS_EXCHANGE_PATH / "pre-job-metrics.json"), "rb"
+    )
+    assert (tmp_path / runner_metrics.RUNNER_INSTALLED_TS_FILE_NAME).read_text() == "1234"
+    assert not (tmp_path / runner_metrics.PRE_JOB_METRICS_FILE_NAME).exists()
+    assert not (tmp_path / runner_metrics.POST_JOB_METRICS_FILE_NAME).exists()
+
+
+def test_pull_runner_metrics_ssh_error(storage_manager: MagicMock):
+    """
+    arrange: Given a runner whose SSH connection fails.
+    act: When the metrics are pulled.
+    assert: An SSHError is raised.
+    """
+    ssh_conn = MagicMock(spec=SSHConnection)
+    ssh_conn.sftp.side_effect = paramiko.ssh_exception.SSHException("failed")
+
+    with pytest.raises(SSHError):
+        metrics_exchange.pull_runner_metrics(storage_manager, "test-runner", ssh_conn)
+
+
+def test_pull_runner_metrics_skips_pushed(storage_manager: MagicMock, tmp_path: Path):
+    """
+    arrange: Given a runner whose metrics files were all pushed to the metrics storage.
+    act: When the metrics are pulled.
+    assert: No file is pulled from the runner.
+    """
+    for file_name in (
+        runner_metrics.RUNNER_INSTALLED_TS_FILE_NAME,
+        runner_metrics.PRE_JOB_METRICS_FILE_NAME,
+        runner_metrics.POST_JOB_METRICS_FILE_NAME,
+    ):
+        (tmp_path / file_name).write_text("pushed")
+    ssh_conn = _mock_ssh_conn({})
+
+    metrics_exchange.pull_runner_metrics(storage_manager, "test-runner", ssh_conn)
+
+    ssh_conn.sftp.assert_not_called()
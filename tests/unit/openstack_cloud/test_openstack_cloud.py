@@ -8,10 +8,12 @@ import openstack
 import pytest
 
 from github_runner_manager.errors import OpenStackError
+from github_runner_manager.openstack_cloud import openstack_cloud
 from github_runner_manager.openstack_cloud.openstack_cloud import (
     OpenstackCloud,
     OpenStackCredentials,
 )
+from tests.unit.factories import openstack_factory
 
 FAKE_ARG = "fake"
 
@@ -61,3 +63,217 @@ def test_raises_openstack_error(
         with pytest.raises(OpenStackError) as exc:
             getattr(cloud, public_method)(*args)
         assert "Failed OpenStack API call" in str(exc.value)
+
+
+@pytest.fixture(name="connection_cache")
+def connection_cache_fixture(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    """Use an empty connection cache and mock openstack.connect."""
+    monkeypatch.setattr(
+        "github_runner_manager.openstack_cloud.openstack_cloud._connection_cache",
+        openstack_cloud._OpenstackConnectionCache(),
+    )
+    openstack_connect_mock = MagicMock(spec=openstack.connect)
+    openstack_connect_mock.return_value.session.auth.auth_ref.will_expire_soon.return_value = False
+    monkeypatch.setattr(
+        "github_runner_manager.openstack_cloud.openstack_cloud.openstack.connect",
+        openstack_connect_mock,
+    )
+    return openstack_connect_mock
+
+
+def _create_cloud(monkeypatch: pytest.MonkeyPatch) -> OpenstackCloud:
+    """Create an OpenstackCloud with fake credentials.
+
+    Args:
+        monkeypatch: The pytest monkeypatch fixture.
+
+    Returns:
+        The OpenstackCloud object.
+    """
+    creds = OpenStackCredentials(
+        username=FAKE_ARG,
+        password=FAKE_ARG,
+        project_name=FAKE_ARG,
+        user_domain_name=FAKE_ARG,
+        project_domain_name=FAKE_ARG,
+        auth_url=FAKE_ARG,
+        region_name=FAKE_ARG,
+    )
+    monkeypatch.setattr(
+        "github_runner_manager.openstack_cloud.openstack_cloud.Path.expanduser", MagicMock()
+    )
+    return OpenstackCloud(creds, FAKE_ARG, FAKE_ARG)
+
+
+def test_connection_reused(connection_cache: MagicMock, monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Mock openstack.connect to return a connection with a valid token.
+    act: Call get_instances multiple times.
+    assert: Only one connection is created and the avoided handshakes are counted.
+    """
+    cloud = _create_cloud(monkeypatch)
+
+    for _ in range(3):
+        cloud.get_instances()
+
+    assert connection_cache.call_count == 1
+    connection_cache.return_value.authorize.assert_called_once()
+    stats = openstack_cloud.get_connection_stats()
+    assert stats.auth_handshakes == 1
+    assert stats.auth_handshakes_avoided == 2
+
+
+def test_connection_token_refreshed(connection_cache: MagicMock, monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Mock openstack.connect to return a connection with a token about to expire.
+    act: Call get_instances twice.
+    assert: The connection is reused but the token is requested again.
+    """
+    auth_ref = connection_cache.return_value.session.auth.auth_ref
+    auth_ref.will_expire_soon.return_value = True
+    cloud = _create_cloud(monkeypatch)
+
+    cloud.get_instances()
+    cloud.get_instances()
+
+    assert connection_cache.call_count == 1
+    assert connection_cache.return_value.authorize.call_count == 2
+    connection_cache.return_value.session.auth.invalidate.assert_called_once()
+    assert openstack_cloud.get_connection_stats().auth_handshakes == 2
+
+
+def test_connection_dropped_on_unauthorized(
+    connection_cache: MagicMock, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    arrange: Mock the connection to fail with unauthorized error on listing servers.
+    act: Call get_instances twice.
+    assert: A new connection is created for the second call.
+    """
+    connection_cache.return_value.list_servers.side_effect = [
+        openstack.exceptions.HttpException("unauthorized", http_status=401),
+        [],
+    ]
+    cloud = _create_cloud(monkeypatch)
+
+    with pytest.raises(OpenStackError):
+        cloud.get_instances()
+    cloud.get_instances()
+
+    assert connection_cache.call_count == 2
+
+
+def test_connection_not_shared_after_fork(
+    connection_cache: MagicMock, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    arrange: Create a cached connection.
+    act: Reset the cache as done in a forked child process and call get_instances.
+    assert: A new connection is created.
+    """
+    cloud = _create_cloud(monkeypatch)
+    cloud.get_instances()
+
+    openstack_cloud._connection_cache.reset_after_fork()
+    cloud.get_instances()
+
+    assert connection_cache.call_count == 2
+    assert openstack_cloud.get_connection_stats().auth_handshakes == 1
+
+
+def test_get_instances_single_listing(
+    connection_cache: MagicMock, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    arrange: Mock the connection to list servers of which two have the same name.
+    act: Call get_instances.
+    assert: The servers are not searched by name, a single server of the duplicates is returned
+        and the other one is deleted, as with the search by name.
+    """
+    conn = connection_cache.return_value
+    first = openstack_factory.ServerFactory(
+        name=f"{FAKE_ARG}-dup", id="first", created_at="2024-09-12T02:48:03Z"
+    )
+    second = openstack_factory.ServerFactory(
+        name=f"{FAKE_ARG}-dup", id="second", created_at="2024-09-12T03:48:03Z"
+    )
+    unique = openstack_factory.ServerFactory(name=f"{FAKE_ARG}-unique", id="unique")
+    other = openstack_factory.ServerFactory(name="other-prefix-server", id="other")
+    conn.list_servers.return_value = [first, unique, second, other]
+    cloud = _create_cloud(monkeypatch)
+
+    instances = cloud.get_instances()
+
+    conn.list_servers.assert_called_once()
+    conn.search_servers.assert_not_called()
+    assert {instance.server_id for instance in instances} == {"first", "unique"}
+    conn.delete_server.assert_called_once_with(name_or_id="second")
+
+
+def _create_instance(instance_id: str, status: str) -> openstack_cloud.OpenstackInstance:
+    """Create an OpenstackInstance managed under the fake prefix.
+
+    Args:
+        instance_id: The instance ID.
+        status: The server status.
+
+    Returns:
+        The OpenstackInstance.
+    """
+    return openstack_cloud.OpenstackInstance(
+        server=openstack_factory.ServerFactory(name=f"{FAKE_ARG}-{instance_id}", status=status),
+        prefix=FAKE_ARG,
+    )
+
+
+def test_wait_instances_active(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Given a slow, a fast and a broken instance being built.
+    act: Call wait_instances_active.
+    assert: The ACTIVE instances are returned after polling all instances together, and the
+        failed instance is deleted.
+    """
+    monkeypatch.setattr(openstack_cloud.time, "sleep", MagicMock())
+    cloud = _create_cloud(monkeypatch)
+    get_instances_mock = MagicMock(
+        side_effect=[
+            (_create_instance("slow", "BUILD"), _create_instance("fast", "ACTIVE")),
+            (_create_instance("slow", "BUILD"), _create_instance("broken", "ERROR")),
+            (_create_instance("slow", "ACTIVE"), _create_instance("other", "ACTIVE")),
+        ]
+    )
+    monkeypatch.setattr(cloud, "get_instances", get_instances_mock)
+    delete_instance_mock = MagicMock()
+    monkeypatch.setattr(cloud, "delete_instance", delete_instance_mock)
+
+    instances = cloud.wait_instances_active(["slow", "fast", "broken"], poll_interval=1)
+
+    assert [instance.instance_id for instance in instances] == ["fast", "slow"]
+    assert get_instances_mock.call_count == 3
+    delete_instance_mock.assert_called_once_with("broken")
+
+
+def test_wait_instances_active_timeout(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Given an instance that stays in BUILD.
+    act: Call wait_instances_active with a timeout.
+    assert: No instance is returned and the instance still building is deleted.
+    """
+    monkeypatch.setattr(openstack_cloud.time, "sleep", MagicMock())
+    now = [0.0]
+
+    def _monotonic() -> float:
+        """Advance the clock by one second per call."""
+        now[0] += 1
+        return now[0]
+
+    monkeypatch.setattr(openstack_cloud.time, "monotonic", _monotonic)
+    cloud = _create_cloud(monkeypatch)
+    monkeypatch.setattr(
+        cloud, "get_instances", MagicMock(return_value=(_create_instance("stuck", "BUILD"),))
+    )
+    delete_instance_mock = MagicMock()
+    monkeypatch.setattr(cloud, "delete_instance", delete_instance_mock)
+
+    assert not cloud.wait_instances_active(["stuck"], poll_interval=1, timeout=5)
+    delete_instance_mock.assert_called_once_with("stuck")
@@ -2,19 +2,34 @@
 # See LICENSE file for licensing details.
 
 """Module for unit-testing OpenStack runner manager."""
+import functools
+import threading
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Iterator
 from unittest.mock import MagicMock
 
+import openstack.exceptions
 import pytest
+from fabric import Connection as SSHConnection
 
-from github_runner_manager.metrics import runner
+from github_runner_manager import utilities
+from github_runner_manager.errors import RunnerCreateError, RunnerStartError
+from github_runner_manager.manager.cloud_runner_manager import HealthState
+from github_runner_manager.manager.create_concurrency import AdaptiveConcurrencyLimit
+from github_runner_manager.metrics import receiver_process, runner
 from github_runner_manager.metrics.storage import MetricsStorage, StorageManager
-from github_runner_manager.openstack_cloud import openstack_runner_manager
+from github_runner_manager.openstack_cloud import (
+    health_cache,
+    openstack_runner_manager,
+    warm_pool,
+)
+from github_runner_manager.openstack_cloud.openstack_cloud import OpenstackCloud
 from github_runner_manager.openstack_cloud.openstack_runner_manager import (
     OUTDATED_METRICS_STORAGE_IN_SECONDS,
     OpenStackRunnerManager,
 )
+from github_runner_manager.types_ import MetricsReceiverConfig
 
 
 @pytest.mark.parametrize(
@@ -97,17 +112,20 @@ def test__cleanup_extract_metrics(
     runner_metrics_mock = MagicMock(spec=runner)
     monkeypatch.setattr(openstack_runner_manager, "runner_metrics", runner_metrics_mock)
     now = datetime.now()
-    all_runner_name_metrics_storage = [
-        _create_metrics_storage(runner_name, now)
+    storage_mtimes = [
+        (MetricsStorage(runner_name=runner_name, path=Path(runner_name)), now)
         for runner_name in (healthy_runner_names | unhealthy_runner_names)
-    ]
-    dangling_runner_metrics_storage = [
-        _create_metrics_storage(runner_name, mtime)
+    ] + [
+        (MetricsStorage(runner_name=runner_name, path=Path(runner_name)), mtime)
         for runner_name, mtime in undecided_runner_storage
     ]
-    metric_storage_manager.list_all = (
-        all_runner_name_metrics_storage + dangling_runner_metrics_storage
-    ).__iter__
+
+    def _list_outdated(max_age: float) -> Iterator[MetricsStorage]:
+        """List the storages by their mocked modification time."""
+        threshold = now - timedelta(seconds=max_age)
+        return iter(ms for ms, mtime in storage_mtimes if mtime < threshold)
+
+    metric_storage_manager.list_outdated.side_effect = _list_outdated
 
     OpenStackRunnerManager._cleanup_extract_metrics(
         metrics_storage_manager=metric_storage_manager,
@@ -115,24 +133,287 @@ def test__cleanup_extract_metrics(
         unhealthy_runner_names=unhealthy_runner_names,
     )
 
+    metric_storage_manager.list_all.assert_not_called()
     assert runner_metrics_mock.extract.call_count == 1
     assert runner_metrics_mock.extract.call_args[1]["runners"] == expected_storage_to_be_extracted
 
 
-def _create_metrics_storage(runner_name: str, mtime: datetime) -> MetricsStorage:
+def test__wait_runner_startup_returns_on_readiness_signal(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Given a runner that signals readiness during the remote wait.
+    act: When _wait_runner_startup is called.
+    assert: It returns after a single attempt without sleeping between retries.
+    """
+    sleep_mock = MagicMock()
+    monkeypatch.setattr(utilities.time, "sleep", sleep_mock)
+    ssh_conn = MagicMock(spec=SSHConnection)
+    ssh_conn.run.side_effect = [
+        MagicMock(ok=True),
+        MagicMock(ok=True, stdout="status: running"),
+        MagicMock(ok=True, stdout=openstack_runner_manager.RUNNER_STARTUP_PROCESS),
+    ]
+    runner_manager = MagicMock(spec=OpenStackRunnerManager)
+    runner_manager._openstack_cloud = MagicMock(spec=OpenstackCloud)
+    runner_manager._openstack_cloud.get_ssh_connection.return_value = ssh_conn
+
+    OpenStackRunnerManager._wait_runner_startup(runner_manager, MagicMock())
+
+    sleep_mock.assert_not_called()
+    assert "runner-installed.timestamp" in ssh_conn.run.call_args_list[0].args[0]
+
+
+def test__wait_runner_startup_retries_until_ready(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Given a runner not yet installed at the first remote wait.
+    act: When _wait_runner_startup is called.
+    assert: The wait is retried after a backoff and returns once the runner is ready.
+    """
+    sleep_mock = MagicMock()
+    monkeypatch.setattr(utilities.time, "sleep", sleep_mock)
+    ssh_conn = MagicMock(spec=SSHConnection)
+    ssh_conn.run.side_effect = [
+        MagicMock(ok=False),
+        MagicMock(ok=True),
+        MagicMock(ok=True, stdout="status: done"),
+    ]
+    runner_manager = MagicMock(spec=OpenStackRunnerManager)
+    runner_manager._openstack_cloud = MagicMock(spec=OpenstackCloud)
+    runner_manager._openstack_cloud.get_ssh_connection.return_value = ssh_conn
+
+    OpenStackRunnerManager._wait_runner_startup(runner_manager, MagicMock())
+
+    sleep_mock.assert_called_once()
+    assert sleep_mock.call_args.args[0] < 60
+
+
+def test_create_runners_pipelined(monkeypatch: pytest.MonkeyPatch):
     """
-    Create a metric storage object with a mocked mtime for the storage path.
+    arrange: Given a runner manager where the readiness of one of three runners fails.
+    act: When create_runners is called.
+    assert: All servers are launched without waiting before the status is polled once for all
+        of them, only the ready runners are returned and the outcomes are recorded.
+    """
+    calls: list[str] = []
+    runner_manager = MagicMock(spec=OpenStackRunnerManager)
+    runner_manager._config = MagicMock()
+    runner_manager._openstack_cloud = MagicMock(spec=OpenstackCloud)
+    launched = [MagicMock(instance_id=f"id-{i}", server_name=f"test-id-{i}") for i in range(3)]
+
+    def _launch_runner(registration_token, server_config, wait):
+        """Record the launch of a runner without waiting."""
+        assert not wait
+        calls.append("launch")
+        return launched[calls.count("launch") - 1]
 
-    Args:
-        runner_name: The name of the runner.
-        mtime: Used to mock the mtime of the storage path.
+    def _wait_instances_active(instance_ids, poll_interval):
+        """Record the wait for the servers to be ACTIVE."""
+        calls.append("wait_active")
+        assert instance_ids == ["id-0", "id-1", "id-2"]
+        return tuple(launched)
 
-    Returns:
-        A metric storage mock object.
+    def _wait_runner_ready(instance):
+        """Fail the readiness of the second runner."""
+        assert calls.count("launch") == 3 and "wait_active" in calls
+        if instance.instance_id == "id-1":
+            raise RunnerStartError("failed")
+
+    runner_manager._launch_runner.side_effect = _launch_runner
+    runner_manager._launch_runners.side_effect = functools.partial(
+        OpenStackRunnerManager._launch_runners, runner_manager
+    )
+    runner_manager._openstack_cloud.wait_instances_active.side_effect = _wait_instances_active
+    runner_manager._wait_runner_ready.side_effect = _wait_runner_ready
+
+    runner_manager._wait_runners_ready.side_effect = functools.partial(
+        OpenStackRunnerManager._wait_runners_ready, runner_manager
+    )
+    concurrency = MagicMock(spec=AdaptiveConcurrencyLimit, limit=2)
+
+    instance_ids = OpenStackRunnerManager.create_runners(runner_manager, "token", 3, concurrency)
+
+    assert instance_ids == ("id-0", "id-2")
+    assert calls == ["launch", "launch", "launch", "wait_active"]
+    assert [call.args[0].failed for call in concurrency.record.call_args_list] == [
+        False,
+        True,
+        False,
+    ]
+
+
+def test_create_runners_pipelined_records_throttled_requests():
+    """
+    arrange: Given a runner manager where the cloud throttles the second creation request.
+    act: When create_runners is called.
+    assert: The throttled request is recorded in the concurrency limit and its runner is not
+        waited for.
     """
-    metrics_storage = MetricsStorage(runner_name=runner_name, path=MagicMock(spec=Path))
-    stat = MagicMock()
-    stat_mock = MagicMock(return_value=stat)
-    stat.st_mtime = mtime.timestamp()
-    metrics_storage.path.stat = stat_mock
-    return metrics_storage
+    runner_manager = MagicMock(spec=OpenStackRunnerManager)
+    runner_manager._config = MagicMock()
+    runner_manager._openstack_cloud = MagicMock(spec=OpenstackCloud)
+    launched = MagicMock(instance_id="id-0", server_name="test-id-0")
+    throttled = RunnerCreateError("throttled")
+    throttled.__cause__ = openstack.exceptions.HttpException(http_status=429)
+    runner_manager._launch_runner.side_effect = [launched, throttled]
+    runner_manager._launch_runners.side_effect = functools.partial(
+        OpenStackRunnerManager._launch_runners, runner_manager
+    )
+    runner_manager._openstack_cloud.wait_instances_active.return_value = (launched,)
+    runner_manager._wait_runners_ready.return_value = ("id-0",)
+    concurrency = MagicMock(spec=AdaptiveConcurrencyLimit, limit=1)
+
+    instance_ids = OpenStackRunnerManager.create_runners(runner_manager, "token", 2, concurrency)
+
+    assert instance_ids == ("id-0",)
+    concurrency.record.assert_called_once()
+    assert concurrency.record.call_args.args[0].throttled
+    runner_manager._openstack_cloud.wait_instances_active.assert_called_once_with(
+        instance_ids=["id-0"], poll_interval=openstack_runner_manager._SERVER_STATUS_POLL_INTERVAL
+    )
+
+
+@pytest.mark.parametrize(
+    "warm_instance_ready",
+    [
+        pytest.param(True, id="warm instance claimed"),
+        pytest.param(False, id="warm pool empty"),
+    ],
+)
+def test_create_runner_from_warm_pool(monkeypatch: pytest.MonkeyPatch, warm_instance_ready: bool):
+    """
+    arrange: Given a runner manager with or without a ready instance in the warm pool.
+    act: When create_runner is called.
+    assert: The warm instance is used if claimed, else a new instance is launched.
+    """
+    monkeypatch.setattr(
+        openstack_runner_manager.metrics_exchange, "init_metrics_storage", MagicMock()
+    )
+    runner_manager = MagicMock(spec=OpenStackRunnerManager)
+    runner_manager._config = MagicMock()
+    runner_manager._metrics_storage_manager = MagicMock(spec=StorageManager)
+    warm_instance = MagicMock(instance_id="warm", server_name="test-warm")
+    launched_instance = MagicMock(instance_id="launched", server_name="test-launched")
+    runner_manager._warm_pool = MagicMock(spec=warm_pool.WarmPool)
+    runner_manager.health_cache = MagicMock(spec=health_cache.HealthCache)
+    runner_manager._warm_pool.claim.return_value = warm_instance if warm_instance_ready else None
+    runner_manager._launch_runner.return_value = launched_instance
+
+    instance_id = OpenStackRunnerManager.create_runner(runner_manager, "token")
+
+    runner_manager._warm_pool.claim.assert_called_once_with("token")
+    assert runner_manager.health_cache.invalidate.called == warm_instance_ready
+    assert instance_id == ("warm" if warm_instance_ready else "launched")
+    assert runner_manager._launch_runner.called != warm_instance_ready
+    runner_manager._wait_runner_ready.assert_called_once_with(
+        warm_instance if warm_instance_ready else launched_instance
+    )
+
+
+def test__get_runners_health_skips_known():
+    """
+    arrange: Given instances on the cloud, two of which have their health known from a snapshot.
+    act: When the health of the runners is requested with the known health.
+    assert: Only the instance missing from the snapshot is health checked.
+    """
+    runner_manager = MagicMock(spec=OpenStackRunnerManager)
+    runner_manager._openstack_cloud = MagicMock(spec=OpenstackCloud)
+    runner_manager.health_cache = MagicMock(spec=health_cache.HealthCache)
+    instances = [MagicMock(instance_id=instance_id) for instance_id in ("known", "bad", "new")]
+    runner_manager._openstack_cloud.get_instances.return_value = tuple(instances)
+    runner_manager._check_runners.return_value = {"new": None}
+
+    health = OpenStackRunnerManager._get_runners_health(
+        runner_manager, {"known": HealthState.HEALTHY, "bad": HealthState.UNHEALTHY}
+    )
+
+    runner_manager._check_runners.assert_called_once_with([instances[2]])
+    assert health.healthy == (instances[0],)
+    assert health.unhealthy == (instances[1],)
+    assert health.unknown == (instances[2],)
+
+
+@pytest.mark.parametrize(
+    "flush_concurrency, expected_flushed",
+    [
+        pytest.param(3, ["test-a", "test-b"], id="all started"),
+        pytest.param(1, ["test-a"], id="pending cancelled"),
+    ],
+)
+def test_flush_runners_deadline(
+    monkeypatch: pytest.MonkeyPatch,
+    caplog: pytest.LogCaptureFixture,
+    flush_concurrency: int,
+    expected_flushed: list[str],
+):
+    """
+    arrange: Given a runner manager with three instances, the flush of one of them hanging.
+    act: When the runners are flushed.
+    assert: The flushes not started by the deadline are cancelled, the hanging one is reported
+        and left out of the cleanup as a runner with unknown health.
+    """
+    monkeypatch.setattr(openstack_runner_manager, "_FLUSH_CONCURRENCY", flush_concurrency)
+    runner_manager = MagicMock(spec=OpenStackRunnerManager)
+    runner_manager._config = MagicMock(flush_timeout=0.5)
+    runner_manager.health_cache = MagicMock(spec=health_cache.HealthCache)
+    runner_manager._openstack_cloud = MagicMock(spec=OpenstackCloud)
+    instances = [
+        MagicMock(server_name=f"test-{name}", instance_id=name, status="ACTIVE")
+        for name in ("a", "stuck", "b")
+    ]
+    runner_manager._openstack_cloud.get_instances.return_value = tuple(instances)
+    release = threading.Event()
+    flushed: list[str] = []
+
+    def _flush_instance(instance, remove_token, busy):
+        """Flush an instance, hanging on the stuck one until released."""
+        if instance.server_name == "test-stuck":
+            release.wait(10)
+            return
+        flushed.append(instance.server_name)
+
+    runner_manager._flush_instance.side_effect = _flush_instance
+
+    try:
+        OpenStackRunnerManager.flush_runners(runner_manager, "token", busy=False)
+    finally:
+        release.set()
+
+    assert sorted(flushed) == expected_flushed
+    assert "test-stuck" in caplog.text
+    runner_manager.cleanup.assert_called_once()
+    assert runner_manager.cleanup.call_args.args == ("token",)
+    (runner,) = runner_manager.cleanup.call_args.kwargs["runners"]
+    assert runner.instance_id == "stuck"
+    assert runner.health == HealthState.UNKNOWN
+
+
+@pytest.mark.parametrize(
+    "error",
+    [pytest.param(False, id="reconciled"), pytest.param(True, id="reconcile failure logged")],
+)
+def test_reconcile_metrics_receiver(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture, error: bool
+):
+    """
+    arrange: Given a runner manager with a metrics receiver configured.
+    act: When the metrics receiver is reconciled.
+    assert: The receiver process is reconciled with the configuration of the manager, a failure
+        is logged.
+    """
+    reconcile_mock = MagicMock(
+        spec=receiver_process.reconcile,
+        side_effect=receiver_process.MetricsReceiverError("ps failed") if error else None,
+    )
+    monkeypatch.setattr(openstack_runner_manager.receiver_process, "reconcile", reconcile_mock)
+    receiver_config = MetricsReceiverConfig(url="http://10.0.0.1:8089", secret="secret")
+    runner_manager = MagicMock(spec=OpenStackRunnerManager)
+    runner_manager._config = MagicMock(metrics_storage_on_tmpfs=True)
+    runner_manager._config.service_config.metrics_receiver = receiver_config
+
+    OpenStackRunnerManager.reconcile_metrics_receiver(runner_manager)
+
+    reconcile_mock.assert_called_once_with(
+        receiver_config,
+        system_user=runner_manager._config.system_user_config,
+        storage_on_tmpfs=True,
+    )
+    assert ("Failed to reconcile the metrics receiver process" in caplog.text) == error
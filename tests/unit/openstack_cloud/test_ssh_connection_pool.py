@@ -0,0 +1,176 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Module for unit-testing the SSH connection pool."""
+import pickle
+from unittest.mock import MagicMock
+
+import paramiko
+import pytest
+from fabric import Connection as SSHConnection
+
+from github_runner_manager.openstack_cloud import ssh_connection_pool
+from github_runner_manager.openstack_cloud.ssh_connection_pool import SSHConnectionPool
+
+_SERVER_NAME = "test-server"
+_ADDRESSES = ["10.0.0.1"]
+
+
+@pytest.fixture(name="now")
+def now_fixture(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Mock the monotonic clock of the pool.
+
+    Returns:
+        A single element list with the current time, to be changed by the tests.
+    """
+    now = [1000.0]
+    monkeypatch.setattr(ssh_connection_pool.time, "monotonic", lambda: now[0])
+    return now
+
+
+def _create_connection(host: str = _ADDRESSES[0]) -> MagicMock:
+    """Create a mock of a connected SSH connection.
+
+    Args:
+        host: The host connected to.
+
+    Returns:
+        The SSH connection mock.
+    """
+    connection = MagicMock(spec=SSHConnection)
+    connection.host = host
+    connection.is_connected = True
+    connection.transport = MagicMock(spec=paramiko.Transport)
+    return connection
+
+
+def test_get_reuses_live_connection(now: list[float]):
+    """
+    arrange: Given a pool with a live connection to a server.
+    act: When a connection to the server is requested.
+    assert: The pooled connection is returned without being closed.
+    """
+    pool = SSHConnectionPool()
+    connection = _create_connection()
+    pool.put(_SERVER_NAME, connection)
+
+    assert pool.get(_SERVER_NAME, _ADDRESSES) is connection
+    connection.close.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "connected, send_ignore_error, addresses",
+    [
+        pytest.param(False, None, _ADDRESSES, id="disconnected"),
+        pytest.param(True, EOFError(), _ADDRESSES, id="broken transport"),
+        pytest.param(True, None, ["10.0.0.2"], id="address changed"),
+    ],
+)
+def test_get_drops_stale_connection(
+    now: list[float],
+    connected: bool,
+    send_ignore_error: Exception | None,
+    addresses: list[str],
+):
+    """
+    arrange: Given a pool with a connection that can no longer be used.
+    act: When a connection to the server is requested.
+    assert: No connection is returned and the stale connection is closed.
+    """
+    pool = SSHConnectionPool()
+    connection = _create_connection()
+    connection.is_connected = connected
+    connection.transport.send_ignore.side_effect = send_ignore_error
+    pool.put(_SERVER_NAME, connection)
+
+    assert pool.get(_SERVER_NAME, addresses) is None
+    connection.close.assert_called_once()
+
+
+def test_get_evicts_idle_connection(now: list[float]):
+    """
+    arrange: Given a pool with a connection unused for longer than the idle timeout.
+    act: When a connection to the server is requested.
+    assert: No connection is returned and the idle connection is closed.
+    """
+    pool = SSHConnectionPool()
+    connection = _create_connection()
+    pool.put(_SERVER_NAME, connection)
+    now[0] += ssh_connection_pool._SSH_CONNECTION_IDLE_TIMEOUT
+
+    assert pool.get(_SERVER_NAME, _ADDRESSES) is None
+    connection.close.assert_called_once()
+
+
+def test_get_retires_old_connection(now: list[float]):
+    """
+    arrange: Given a pool with an actively used connection reaching its maximum age.
+    act: When a connection to the server is requested, then again after the retire grace period.
+    assert: The connection is no longer handed out, and only closed after the grace period.
+    """
+    pool = SSHConnectionPool()
+    connection = _create_connection()
+    pool.put(_SERVER_NAME, connection)
+    step = ssh_connection_pool._SSH_CONNECTION_IDLE_TIMEOUT - 1
+    while now[0] - 1000.0 < ssh_connection_pool._SSH_CONNECTION_MAX_AGE - step:
+        now[0] += step
+        assert pool.get(_SERVER_NAME, _ADDRESSES) is connection
+    now[0] += step
+
+    assert pool.get(_SERVER_NAME, _ADDRESSES) is None
+    connection.close.assert_not_called()
+
+    now[0] += ssh_connection_pool._SSH_CONNECTION_RETIRE_GRACE
+    pool.get(_SERVER_NAME, _ADDRESSES)
+    connection.close.assert_called_once()
+
+
+def test_put_keeps_existing_connection(now: list[float]):
+    """
+    arrange: Given a pool with a connection to a server.
+    act: When another connection to the same server is added.
+    assert: The existing connection is returned and the new one is closed.
+    """
+    pool = SSHConnectionPool()
+    connection = _create_connection()
+    pool.put(_SERVER_NAME, connection)
+    other_connection = _create_connection()
+
+    assert pool.put(_SERVER_NAME, other_connection) is connection
+    other_connection.close.assert_called_once()
+
+
+def test_invalidate_and_retain(now: list[float]):
+    """
+    arrange: Given a pool with connections to three servers.
+    act: When one server is invalidated and only another one is retained.
+    assert: Only the connection to the retained server is kept open.
+    """
+    pool = SSHConnectionPool()
+    connections = {name: _create_connection() for name in ("server-1", "server-2", "server-3")}
+    for name, connection in connections.items():
+        pool.put(name, connection)
+
+    pool.invalidate("server-1")
+    pool.retain(["server-2"])
+
+    connections["server-1"].close.assert_called_once()
+    connections["server-2"].close.assert_not_called()
+    connections["server-3"].close.assert_called_once()
+    assert pool.get("server-2", _ADDRESSES) is connections["server-2"]
+
+
+def test_pickle_drops_connections(now: list[float]):
+    """
+    arrange: Given a pool with a connection.
+    act: When the pool is pickled and unpickled.
+    assert: The unpickled pool is empty and usable.
+    """
+    pool = SSHConnectionPool()
+    pool.put(_SERVER_NAME, _create_connection())
+
+    restored = pickle.loads(pickle.dumps(pool))
+
+    assert restored.get(_SERVER_NAME, _ADDRESSES) is None
+    restored.put(_SERVER_NAME, connection := _create_connection())
+    assert restored.get(_SERVER_NAME, _ADDRESSES) is connection
@@ -0,0 +1,280 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Module for unit-testing the warm pool of runner instances."""
+import time
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock
+
+import invoke
+import pytest
+from fabric import Connection as SSHConnection
+
+from github_runner_manager.errors import OpenStackError, SSHError
+from github_runner_manager.manager.cloud_runner_manager import (
+    GitHubRunnerConfig,
+    SupportServiceConfig,
+)
+from github_runner_manager.metrics import receiver
+from github_runner_manager.openstack_cloud import openstack_cloud, warm_pool
+from github_runner_manager.openstack_cloud.cloud_init import generate_cloud_init
+from github_runner_manager.openstack_cloud.openstack_cloud import OpenstackCloud
+from github_runner_manager.types_ import MetricsReceiverConfig
+from github_runner_manager.types_.github import GitHubRepo
+from tests.unit.factories import openstack_factory
+
+_PREFIX = "test"
+
+
+def _create_instance(
+    instance_id: str,
+    metadata: dict[str, str] | None = None,
+    status: str = "ACTIVE",
+    age: timedelta = timedelta(minutes=5),
+) -> openstack_cloud.OpenstackInstance:
+    """Create an OpenstackInstance managed under the test prefix.
+
+    Args:
+        instance_id: The instance ID.
+        metadata: The server metadata.
+        status: The server status.
+        age: The time since the creation of the server.
+
+    Returns:
+        The OpenstackInstance.
+    """
+    return openstack_cloud.OpenstackInstance(
+        server=openstack_factory.ServerFactory(
+            name=f"{_PREFIX}-{instance_id}",
+            status=status,
+            metadata=metadata,
+            created_at=(datetime.now() - age).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        ),
+        prefix=_PREFIX,
+    )
+
+
+def _waiting(instance_id: str, **kwargs) -> openstack_cloud.OpenstackInstance:
+    """Create an instance waiting in the warm pool.
+
+    Args:
+        instance_id: The instance ID.
+        kwargs: The other arguments of _create_instance.
+
+    Returns:
+        The OpenstackInstance.
+    """
+    return _create_instance(instance_id, metadata=warm_pool.get_launch_metadata(), **kwargs)
+
+
+def _claimed(instance_id: str, seconds_ago: float) -> openstack_cloud.OpenstackInstance:
+    """Create an instance claimed from the warm pool.
+
+    Args:
+        instance_id: The instance ID.
+        seconds_ago: The time since the claim.
+
+    Returns:
+        The OpenstackInstance.
+    """
+    return _create_instance(
+        instance_id,
+        metadata={
+            warm_pool.WARM_POOL_STATE_KEY: warm_pool.WarmPoolState.CLAIMED,
+            warm_pool.WARM_POOL_CLAIMED_AT_KEY: str(time.time() - seconds_ago),
+        },
+    )
+
+
+@pytest.mark.parametrize(
+    "max_size, queue_size, instances, expected_count",
+    [
+        pytest.param(0, 5, (), 0, id="disabled"),
+        pytest.param(5, 2, (), 2, id="queued jobs"),
+        pytest.param(
+            5,
+            0,
+            (_claimed("recent-1", 60), _claimed("recent-2", 120), _claimed("old", 3600)),
+            2,
+            id="recent claims",
+        ),
+        pytest.param(3, 10, (), 3, id="capped"),
+        pytest.param(
+            5,
+            3,
+            (
+                _waiting("booting", status="BUILD"),
+                _waiting("ready"),
+                _waiting("expiring", age=timedelta(minutes=55)),
+                _create_instance("runner"),
+            ),
+            1,
+            id="waiting instances",
+        ),
+        pytest.param(5, 0, (_waiting("ready-1"), _waiting("ready-2")), 0, id="surplus"),
+    ],
+)
+def test_get_refill_count(
+    max_size: int,
+    queue_size: int,
+    instances: tuple[openstack_cloud.OpenstackInstance, ...],
+    expected_count: int,
+):
+    """
+    arrange: Given a warm pool and instances on the cloud.
+    act: When the refill count is requested.
+    assert: The pool is topped up to the queued and recently claimed jobs within its size.
+    """
+    cloud = MagicMock(spec=OpenstackCloud)
+    cloud.get_instances.return_value = instances
+    pool = warm_pool.WarmPool(openstack_cloud=cloud, max_size=max_size)
+
+    assert pool.get_refill_count(queue_size=queue_size) == expected_count
+
+
+def test_claim():
+    """
+    arrange: Given a warm pool with instances booting, claimed, taken, unreachable and ready.
+    act: When an instance is claimed.
+    assert: The ready instance is claimed and marked so after the others are skipped.
+    """
+    cloud = MagicMock(spec=OpenstackCloud)
+    cloud.get_instances.return_value = (
+        _waiting("booting", status="BUILD", age=timedelta(minutes=30)),
+        _claimed("claimed", 60),
+        _waiting("taken", age=timedelta(minutes=20)),
+        _waiting("unreachable", age=timedelta(minutes=15)),
+        _waiting("ready", age=timedelta(minutes=10)),
+    )
+    connections = {}
+
+    def _get_ssh_connection(instance):
+        """Get a mock SSH connection, the claim only succeeds on the ready instance."""
+        if instance.instance_id == "unreachable":
+            raise SSHError("unreachable")
+        connection = MagicMock(spec=SSHConnection)
+        connection.run.return_value = MagicMock(
+            spec=invoke.runners.Result, ok=instance.instance_id == "ready"
+        )
+        connections[instance.instance_id] = connection
+        return connection
+
+    cloud.get_ssh_connection.side_effect = _get_ssh_connection
+    pool = warm_pool.WarmPool(openstack_cloud=cloud, max_size=5)
+
+    instance = pool.claim("registration-token")
+
+    assert instance is not None and instance.instance_id == "ready"
+    assert set(connections) == {"taken", "ready"}
+    command = connections["ready"].run.call_args.args[0]
+    assert "mkdir" in command and "registration-token" in command
+    cloud.set_instance_metadata.assert_called_once()
+    instance_id, metadata = cloud.set_instance_metadata.call_args.args
+    assert instance_id == "ready"
+    assert metadata[warm_pool.WARM_POOL_STATE_KEY] == warm_pool.WarmPoolState.CLAIMED
+
+
+def test_claim_deletes_instance_not_marked_claimed(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Given a warm pool with two ready instances, the first failing to be marked claimed.
+    act: When an instance is claimed.
+    assert: The first instance is deleted after retries and the second one is claimed.
+    """
+    monkeypatch.setattr(warm_pool.time, "sleep", MagicMock())
+    cloud = MagicMock(spec=OpenstackCloud)
+    cloud.get_instances.return_value = (
+        _waiting("unmarked", age=timedelta(minutes=20)),
+        _waiting("ready", age=timedelta(minutes=10)),
+    )
+    cloud.get_ssh_connection.return_value.run.return_value = MagicMock(
+        spec=invoke.runners.Result, ok=True
+    )
+
+    def _set_instance_metadata(instance_id: str, metadata: dict[str, str]) -> None:
+        """Fail to set the metadata of the unmarked instance."""
+        if instance_id == "unmarked":
+            raise OpenStackError("metadata")
+
+    cloud.set_instance_metadata.side_effect = _set_instance_metadata
+    pool = warm_pool.WarmPool(openstack_cloud=cloud, max_size=5)
+
+    instance = pool.claim("registration-token")
+
+    assert instance is not None and instance.instance_id == "ready"
+    assert [call.args[0] for call in cloud.set_instance_metadata.call_args_list] == [
+        *["unmarked"] * warm_pool._MARK_CLAIMED_ATTEMPTS,
+        "ready",
+    ]
+    cloud.delete_instance.assert_called_once_with("unmarked")
+
+
+def test_claim_empty_pool():
+    """
+    arrange: Given a warm pool without waiting instances.
+    act: When an instance is claimed.
+    assert: No instance is claimed.
+    """
+    cloud = MagicMock(spec=OpenstackCloud)
+    cloud.get_instances.return_value = (_create_instance("runner"),)
+    pool = warm_pool.WarmPool(openstack_cloud=cloud, max_size=5)
+
+    assert pool.claim("registration-token") is None
+    cloud.get_ssh_connection.assert_not_called()
+
+
+@pytest.mark.parametrize(
+    "registration_token, expect_wait",
+    [
+        pytest.param("registration-token", False, id="runner"),
+        pytest.param(None, True, id="warm pool"),
+    ],
+)
+def test_generate_cloud_init_warm_pool(registration_token: str | None, expect_wait: bool):
+    """
+    arrange: Given a runner configuration.
+    act: When the cloud-init userdata is generated with or without a registration token.
+    assert: The warm instance waits for the token to be injected before configuring the runner.
+    """
+    userdata = generate_cloud_init(
+        runner_config=GitHubRunnerConfig(
+            github_path=GitHubRepo(owner="owner", repo="repo"), labels=["label"]
+        ),
+        service_config=SupportServiceConfig(
+            proxy_config=None,
+            dockerhub_mirror=None,
+            ssh_debug_connections=None,
+            repo_policy_compliance=None,
+        ),
+        instance_name=f"{_PREFIX}-instance",
+        registration_token=registration_token,
+    )
+
+    assert (str(warm_pool.REGISTRATION_TOKEN_PATH) in userdata) == expect_wait
+    assert ("token=registration-token" in userdata) != expect_wait
+    assert "--token $token" in userdata
+
+
+def test_generate_cloud_init_metrics_push():
+    """
+    arrange: Given a runner configuration with a metrics receiver.
+    act: When the cloud-init userdata is generated.
+    assert: The runner posts its metrics files to the receiver with its token.
+    """
+    userdata = generate_cloud_init(
+        runner_config=GitHubRunnerConfig(
+            github_path=GitHubRepo(owner="owner", repo="repo"), labels=["label"]
+        ),
+        service_config=SupportServiceConfig(
+            proxy_config=None,
+            dockerhub_mirror=None,
+            ssh_debug_connections=None,
+            repo_policy_compliance=None,
+            metrics_receiver=MetricsReceiverConfig(url="http://10.0.0.1:8089", secret="secret"),
+        ),
+        instance_name=f"{_PREFIX}-instance",
+        registration_token="registration-token",
+    )
+
+    assert f"http://10.0.0.1:8089/runners/{_PREFIX}-instance/metrics" in userdata
+    assert receiver.get_runner_token("secret", f"{_PREFIX}-instance") in userdata
+    assert "push_metrics post-job-metrics.json" in userdata
@@ -1,7 +1,9 @@
 #  Copyright 2024 Canonical Ltd.
 #  See LICENSE file for licensing details.
 
+import functools
 import secrets
+import threading
 from contextlib import closing
 from datetime import datetime, timezone
 from random import randint
@@ -11,7 +13,7 @@ import pytest
 from kombu import Connection, Message
 from kombu.exceptions import KombuError
 
-from github_runner_manager.reactive import consumer
+from github_runner_manager.reactive import consumer, pickup_watcher
 from github_runner_manager.reactive.consumer import JobError, Labels, get_queue_size
 from github_runner_manager.reactive.types_ import QueueConfig
 from github_runner_manager.types_.github import JobConclusion, JobInfo, JobStatus
@@ -75,6 +77,92 @@ def test_consume(labels: Labels, supported_labels: Labels, queue_config: QueueCo
     _assert_queue_is_empty(queue_config.queue_name)
 
 
+def test_consume_jobs(queue_config: QueueConfig, monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Jobs not yet picked up and an invalid message placed in the message queue.
+    act: Call consume_jobs with a concurrency of three.
+    assert: A runner is created per job and the messages are removed from the queue.
+    """
+    job_urls = [f"{FAKE_JOB_URL}/jobs/{job_id}" for job_id in range(3)]
+    _put_in_queue("invalid", queue_config.queue_name)
+    github_client_mock = _arrange_jobs_picked_up_at_second_check(
+        queue_config=queue_config, job_urls=job_urls, monkeypatch=monkeypatch
+    )
+    runner_manager_mock = MagicMock(spec=consumer.RunnerManager)
+
+    consumer.consume_jobs(
+        queue_config=queue_config,
+        runner_manager=runner_manager_mock,
+        github_client=github_client_mock,
+        supported_labels={"label"},
+        concurrency=3,
+    )
+
+    assert runner_manager_mock.create_runners.call_count == 3
+    _assert_queue_is_empty(queue_config.queue_name)
+
+
+def test_consume_jobs_bounds_runners(queue_config: QueueConfig, monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: More jobs not yet picked up in the message queue than the concurrency of two.
+    act: Call consume_jobs with a concurrency of two.
+    assert: Only two runners are created and the other jobs are left in the queue.
+    """
+    job_urls = [f"{FAKE_JOB_URL}/jobs/{job_id}" for job_id in range(5)]
+    github_client_mock = _arrange_jobs_picked_up_at_second_check(
+        queue_config=queue_config, job_urls=job_urls, monkeypatch=monkeypatch
+    )
+    runner_manager_mock = MagicMock(spec=consumer.RunnerManager)
+
+    consumer.consume_jobs(
+        queue_config=queue_config,
+        runner_manager=runner_manager_mock,
+        github_client=github_client_mock,
+        supported_labels={"label"},
+        concurrency=2,
+    )
+
+    assert runner_manager_mock.create_runners.call_count == 2
+    assert get_queue_size(queue_config) == 3
+
+
+def _arrange_jobs_picked_up_at_second_check(
+    queue_config: QueueConfig, job_urls: list[str], monkeypatch: pytest.MonkeyPatch
+) -> MagicMock:
+    """Place jobs in the message queue, reported as queued at the first check, then in progress.
+
+    Args:
+        queue_config: The configuration of the message queue.
+        job_urls: The URLs of the jobs.
+        monkeypatch: The fixture to shorten the interval of the checks.
+
+    Returns:
+        The mock of the GitHub client reporting the status of the jobs.
+    """
+    monkeypatch.setattr(
+        consumer,
+        "PickupWatcher",
+        functools.partial(pickup_watcher.PickupWatcher, initial_interval=0.01),
+    )
+    for job_url in job_urls:
+        _put_in_queue(
+            consumer.JobDetails(labels={"label"}, url=job_url).json(), queue_config.queue_name
+        )
+    checked_job_ids: set[str] = set()
+    checked_job_ids_lock = threading.Lock()
+
+    def _get_job_info(path: object, job_id: str) -> JobInfo:
+        """Report the job as queued at the first check, then in progress."""
+        with checked_job_ids_lock:
+            picked_up = job_id in checked_job_ids
+            checked_job_ids.add(job_id)
+        return _create_job_info(JobStatus.IN_PROGRESS if picked_up else JobStatus.QUEUED)
+
+    github_client_mock = MagicMock(spec=consumer.GithubClient)
+    github_client_mock.get_job_info.side_effect = _get_job_info
+    return github_client_mock
+
+
 def test_consume_reject_if_job_gets_not_picked_up(queue_config: QueueConfig):
     """
     arrange: A job placed in the message queue which will not get picked up.
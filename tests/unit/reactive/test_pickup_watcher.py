@@ -0,0 +1,91 @@
+#  Copyright 2024 Canonical Ltd.
+#  See LICENSE file for licensing details.
+
+"""Module for unit-testing the watcher of the jobs waiting to be picked up."""
+from unittest.mock import MagicMock
+
+import pytest
+
+from github_runner_manager.reactive import pickup_watcher
+
+_JOB_URL = "https://api.github.com/repos/owner/repo/actions/jobs/{job_id}"
+
+
+@pytest.fixture(name="clock")
+def clock_fixture(monkeypatch: pytest.MonkeyPatch) -> list[float]:
+    """Mock the monotonic clock of the watcher.
+
+    Returns:
+        A one element list holding the current time, to be advanced by the test.
+    """
+    now = [1000.0]
+    monkeypatch.setattr(pickup_watcher.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_poll_backoff(clock: list[float]):
+    """
+    arrange: Given a watched job picked up after three checks.
+    act: Poll the watcher as the time advances.
+    assert: The job is checked with an increasing interval and settled once picked up.
+    """
+    check_picked_up = MagicMock(side_effect=[False, False, True])
+    watcher = pickup_watcher.PickupWatcher(
+        check_picked_up=check_picked_up, timeout=300, initial_interval=5, max_interval=30
+    )
+    msg = MagicMock()
+    watcher.add(_JOB_URL.format(job_id=1), msg)
+
+    check_times = []
+    settled: list = []
+    while not settled:
+        clock[0] += watcher.next_check_in() or 0
+        settled = watcher.poll()
+        check_times.append(clock[0])
+
+    assert check_times == [1005, 1015, 1035]
+    assert settled == [(msg, True)]
+    assert not watcher
+
+
+def test_poll_deadline(clock: list[float]):
+    """
+    arrange: Given a watched job never picked up.
+    act: Poll the watcher as the time advances.
+    assert: The job is settled as not picked up at the deadline.
+    """
+    watcher = pickup_watcher.PickupWatcher(
+        check_picked_up=MagicMock(return_value=False), timeout=60, initial_interval=5
+    )
+    msg = MagicMock()
+    watcher.add(_JOB_URL.format(job_id=1), msg)
+
+    settled: list = []
+    while not settled:
+        clock[0] += watcher.next_check_in() or 0
+        settled = watcher.poll()
+
+    assert clock[0] == 1060
+    assert settled == [(msg, False)]
+
+
+def test_poll_batch(clock: list[float]):
+    """
+    arrange: Given more watched jobs due than the batch size, with a failing check.
+    act: Poll the watcher.
+    assert: Only a batch of jobs is checked, the failed check is retried later.
+    """
+    check_picked_up = MagicMock(side_effect=[RuntimeError("API error"), True, True])
+    watcher = pickup_watcher.PickupWatcher(
+        check_picked_up=check_picked_up, initial_interval=5, batch_size=2
+    )
+    msgs = [MagicMock() for _ in range(3)]
+    for job_id, msg in enumerate(msgs):
+        watcher.add(_JOB_URL.format(job_id=job_id), msg)
+    clock[0] += 5
+
+    settled = watcher.poll()
+
+    assert check_picked_up.call_count == 2
+    assert settled == [(msgs[1], True)]
+    assert len(watcher) == 2
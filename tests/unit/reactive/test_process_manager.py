@@ -2,6 +2,7 @@
 #  See LICENSE file for licensing details.
 import os
 import secrets
+import signal
 import subprocess
 from grp import getgrgid
 from pathlib import Path
@@ -14,6 +15,7 @@ import pytest
 from github_runner_manager.reactive.process_manager import (
     PIDS_COMMAND_LINE,
     PYTHON_BIN,
+    REACTIVE_RUNNER_JOBS_ARG,
     REACTIVE_RUNNER_SCRIPT_MODULE,
     ReactiveRunnerError,
     reconcile,
@@ -161,6 +163,52 @@ def test_reconcile_ignore_process_not_found_on_kill(
     assert os_kill_mock.call_count == 2
 
 
+def test_reconcile_spawns_processes_with_share_of_jobs(
+    secure_run_subprocess_mock: MagicMock,
+    subprocess_popen_mock: MagicMock,
+    runner_config: RunnerConfig,
+):
+    """
+    arrange: Mock that no reactive runner process is active and 4 jobs per process.
+    act: Call reconcile with a quantity of 9 jobs.
+    assert: 3 processes are spawned, the last one with the remainder of the jobs.
+    """
+    _arrange_reactive_processes(secure_run_subprocess_mock, count=0)
+    runner_config.jobs_per_process = 4
+
+    delta = reconcile(9, runner_config=runner_config)
+
+    assert delta == 3
+    commands = [call.args[0] for call in subprocess_popen_mock.call_args_list]
+    assert [command.split(REACTIVE_RUNNER_JOBS_ARG)[1].split()[0] for command in commands] == [
+        "4",
+        "4",
+        "1",
+    ]
+
+
+def test_reconcile_counts_jobs_of_processes(
+    secure_run_subprocess_mock: MagicMock,
+    subprocess_popen_mock: MagicMock,
+    os_kill_mock: MagicMock,
+    runner_config: RunnerConfig,
+):
+    """
+    arrange: Mock that two reactive runner processes of 4 jobs are active.
+    act: Call reconcile with a quantity of 5 jobs.
+    assert: The newest process is killed and a process is spawned for the job missing.
+    """
+    _arrange_reactive_processes(secure_run_subprocess_mock, count=2, jobs=4)
+    runner_config.jobs_per_process = 4
+
+    delta = reconcile(5, runner_config=runner_config)
+
+    assert delta == 0
+    os_kill_mock.assert_called_once_with(0, signal.SIGTERM)
+    subprocess_popen_mock.assert_called_once()
+    assert f"{REACTIVE_RUNNER_JOBS_ARG} 1 " in subprocess_popen_mock.call_args.args[0]
+
+
 def test_reconcile_raises_reactive_runner_error_on_ps_failure(
     secure_run_subprocess_mock: MagicMock, runner_config: RunnerConfig
 ):
@@ -182,15 +230,19 @@ def test_reconcile_raises_reactive_runner_error_on_ps_failure(
     assert "Failed to get list of processes" in str(err.value)
 
 
-def _arrange_reactive_processes(secure_run_subprocess_mock: MagicMock, count: int):
+def _arrange_reactive_processes(
+    secure_run_subprocess_mock: MagicMock, count: int, jobs: int | None = None
+):
     """Mock reactive runner processes are active.
 
     Args:
         secure_run_subprocess_mock: The mock to use for the ps command.
         count: The number of processes.
+        jobs: The number of jobs of each process, not on the command line if None.
     """
+    jobs_arg = f" {REACTIVE_RUNNER_JOBS_ARG} {jobs}" if jobs is not None else ""
     process_cmds_before = "\n".join(
-        [f"{PYTHON_BIN} -m {REACTIVE_RUNNER_SCRIPT_MODULE}\t{i}" for i in range(count)]
+        [f"{PYTHON_BIN} -m {REACTIVE_RUNNER_SCRIPT_MODULE}{jobs_arg}\t{i}" for i in range(count)]
     )
 
     secure_run_subprocess_mock.return_value = CompletedProcess(
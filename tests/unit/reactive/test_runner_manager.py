@@ -143,6 +143,28 @@ def test_reconcile_flushes_idle_runners_when_queue_is_empty(
     runner_manager.flush_runners.assert_called_once_with(FlushMode.FLUSH_IDLE)
 
 
+def test_reconcile_refills_warm_pool(
+    runner_manager: MagicMock,
+    reactive_process_manager: MagicMock,
+    runner_config: MagicMock,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """
+    arrange: Mock the dependencies and set the queue size to 3.
+    act: Call reconcile.
+    assert: The warm pool is refilled for the queued jobs after the processes are reconciled.
+    """
+    monkeypatch.setattr(
+        "github_runner_manager.reactive.runner_manager.get_queue_size", lambda _: 3
+    )
+    runner_manager.get_runners = MagicMock(return_value=())
+
+    reconcile(5, runner_manager, runner_config)
+
+    reactive_process_manager.reconcile.assert_called_once()
+    runner_manager.refill_warm_pool.assert_called_once_with(queue_size=3)
+
+
 @pytest.mark.usefixtures("reactive_process_manager")
 @pytest.mark.parametrize(
     "runner_quantity, desired_quantity, cleanup_metric_stats, delete_metric_stats, "
@@ -0,0 +1,30 @@
+#  Copyright 2024 Canonical Ltd.
+#  See LICENSE file for licensing details.
+"""Module for testing the reactive types."""
+import pytest
+from pydantic import ValidationError
+
+from github_runner_manager.reactive.types_ import RunnerConfig
+
+
+@pytest.mark.parametrize(
+    "jobs_per_process, valid",
+    [
+        pytest.param(-1, False, id="negative"),
+        pytest.param(0, False, id="zero"),
+        pytest.param(1, True, id="one"),
+        pytest.param(4, True, id="several"),
+    ],
+)
+def test_runner_config_jobs_per_process(jobs_per_process: int, valid: bool):
+    """
+    arrange: Given a number of jobs per reactive process.
+    act: Validate a reactive runner configuration with it.
+    assert: The number of jobs per process is rejected unless at least one.
+    """
+    # The other fields are missing, only the error of the number of jobs per process is checked.
+    with pytest.raises(ValidationError) as exc_info:
+        RunnerConfig.parse_obj({"jobs_per_process": jobs_per_process})
+
+    invalid_fields = {error["loc"] for error in exc_info.value.errors()}
+    assert (("jobs_per_process",) not in invalid_fields) == valid
@@ -0,0 +1,127 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Test for the adaptive creation concurrency."""
+from unittest.mock import MagicMock
+
+import openstack.exceptions
+import pytest
+
+from github_runner_manager.errors import OpenStackError, RunnerCreateError
+from github_runner_manager.manager.cloud_runner_manager import CloudRunnerManager
+from github_runner_manager.manager.create_concurrency import (
+    AdaptiveConcurrencyLimit,
+    CreateOutcome,
+    is_throttled,
+)
+from github_runner_manager.manager.runner_manager import RunnerManager
+
+
+def test_increase_on_healthy_creations():
+    """
+    arrange: Given a concurrency limit below its maximum.
+    act: Record a limit's worth of successful creations with steady durations.
+    assert: The limit is increased by one, up to the maximum.
+    """
+    concurrency = AdaptiveConcurrencyLimit(max_limit=4, initial_limit=2)
+
+    for _ in range(2):
+        concurrency.record(CreateOutcome(duration=10))
+    assert concurrency.limit == 3
+
+    for _ in range(10):
+        concurrency.record(CreateOutcome(duration=10))
+    assert concurrency.limit == 4
+
+
+def test_no_increase_on_slow_creations():
+    """
+    arrange: Given a concurrency limit with a usual creation time.
+    act: Record successful creations much slower than usual.
+    assert: The limit is not increased.
+    """
+    concurrency = AdaptiveConcurrencyLimit(max_limit=10, initial_limit=2)
+    concurrency.record(CreateOutcome(duration=10))
+
+    for _ in range(3):
+        concurrency.record(CreateOutcome(duration=100))
+
+    assert concurrency.limit == 2
+
+
+def test_decrease_on_throttling():
+    """
+    arrange: Given a concurrency limit at its maximum.
+    act: Record a burst of throttled creations, then another one after a limit's worth of
+        outcomes.
+    assert: The limit is halved once for the burst, and again for the later throttling.
+    """
+    concurrency = AdaptiveConcurrencyLimit(max_limit=8)
+
+    for _ in range(3):
+        concurrency.record(CreateOutcome(duration=1, failed=True, throttled=True))
+    assert concurrency.limit == 4
+
+    concurrency.record(CreateOutcome(duration=1))
+    concurrency.record(CreateOutcome(duration=1, failed=True, throttled=True))
+    assert concurrency.limit == 2
+
+
+def test_decrease_on_failure_rate():
+    """
+    arrange: Given a concurrency limit at its maximum.
+    act: Record a window of creations with a high failure rate.
+    assert: The limit is halved.
+    """
+    concurrency = AdaptiveConcurrencyLimit(max_limit=8)
+
+    for failed in (True, False, True, False, True, False, True, False, False, False):
+        concurrency.record(CreateOutcome(duration=1, failed=failed))
+
+    assert concurrency.limit == 4
+
+
+@pytest.mark.parametrize(
+    "status_code, expected_throttled",
+    [
+        pytest.param(429, True, id="too many requests"),
+        pytest.param(503, True, id="service unavailable"),
+        pytest.param(500, False, id="server error"),
+    ],
+)
+def test_is_throttled(status_code: int, expected_throttled: bool):
+    """
+    arrange: Given a runner creation error caused by an OpenStack HTTP error.
+    act: Check whether the error is due to throttling.
+    assert: Only the throttling status codes are detected.
+    """
+    try:
+        try:
+            try:
+                raise openstack.exceptions.HttpException(http_status=status_code)
+            except openstack.exceptions.HttpException as exc:
+                raise OpenStackError("Failed OpenStack API call") from exc
+        except OpenStackError as exc:
+            raise RunnerCreateError("Failed to create runner") from exc
+    except RunnerCreateError as exc:
+        assert is_throttled(exc) == expected_throttled
+
+
+def test_single_runner_creation_recorded():
+    """
+    arrange: Given a cloud runner manager whose API throttles the creation of a runner.
+    act: Spawn a single runner.
+    assert: The creation error is raised and the throttling decreases the concurrency limit.
+    """
+    cloud_runner_manager = MagicMock(spec=CloudRunnerManager)
+    throttled = RunnerCreateError("throttled")
+    throttled.__cause__ = openstack.exceptions.HttpException(http_status=429)
+    cloud_runner_manager.create_runner.side_effect = throttled
+    limit = AdaptiveConcurrencyLimit(max_limit=4)
+
+    with pytest.raises(RunnerCreateError):
+        RunnerManager._spawn_runners(
+            [RunnerManager._CreateRunnerArgs(cloud_runner_manager, "token")], limit
+        )
+
+    assert limit.limit == 2
@@ -6,6 +6,7 @@ import random
 import secrets
 from collections import namedtuple
 from datetime import datetime, timezone
+from http.client import HTTPMessage
 from unittest.mock import MagicMock
 from urllib.error import HTTPError
 
@@ -286,3 +287,77 @@ def test_catch_http_errors_token_issues(github_client: GithubClient):
 
     with pytest.raises(TokenError):
         github_client.get_runner_remove_token(github_repo)
+
+
+def _mock_runner_pages(github_client: GithubClient, total_count: int) -> list[dict]:
+    """Mock the runner listing of a repo with ETags per page.
+
+    Args:
+        github_client: The GithubClient object to mock.
+        total_count: The number of runners.
+
+    Returns:
+        The runners listed.
+    """
+    runners = [{"id": index, "name": f"runner-{index}"} for index in range(total_count)]
+
+    def _list_runners(owner, repo, per_page, page, headers):
+        """Return a page of runners, or raise Not Modified if the ETag matches."""
+        etag = f'"page-{page}"'
+        if headers and headers.get("If-None-Match") == etag:
+            raise HTTPError("http://test.com", 304, "", HTTPMessage(), None)
+        github_client._client.recv_hdrs = {"ETag": etag}
+        return {
+            "total_count": total_count,
+            "runners": runners[(page - 1) * per_page : page * per_page],
+        }
+
+    github_client._client.actions.list_self_hosted_runners_for_repo.side_effect = _list_runners
+    return runners
+
+
+def test_get_runner_github_info_pages(github_client: GithubClient):
+    """
+    arrange: A mocked Github Client listing 150 runners.
+    act: Get the runner information.
+    assert: The two pages are requested once each and all runners are returned.
+    """
+    runners = _mock_runner_pages(github_client, total_count=150)
+
+    result = github_client.get_runner_github_info(GitHubRepo(owner="owner", repo="repo"))
+
+    assert result == runners
+    list_mock = github_client._client.actions.list_self_hosted_runners_for_repo
+    assert [call.kwargs["page"] for call in list_mock.call_args_list] == [1, 2]
+
+
+def test_get_runner_github_info_cached(
+    github_client: GithubClient, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    arrange: A mocked Github Client listing 150 runners, listed once already.
+    act: Get the runner information within the TTL, after the TTL and after a runner deletion.
+    assert: The listing is reused within the TTL, then revalidated with the ETags.
+    """
+    now = [1000.0]
+    monkeypatch.setattr("github_runner_manager.github_client.time.monotonic", lambda: now[0])
+    runners = _mock_runner_pages(github_client, total_count=150)
+    github_repo = GitHubRepo(owner="owner", repo="repo")
+    list_mock = github_client._client.actions.list_self_hosted_runners_for_repo
+    github_client.get_runner_github_info(github_repo)
+    list_mock.reset_mock()
+
+    assert github_client.get_runner_github_info(github_repo) == runners
+    list_mock.assert_not_called()
+
+    now[0] += 60
+    assert github_client.get_runner_github_info(github_repo) == runners
+    assert [call.kwargs["headers"] for call in list_mock.call_args_list] == [
+        {"If-None-Match": '"page-1"'},
+        {"If-None-Match": '"page-2"'},
+    ]
+
+    list_mock.reset_mock()
+    github_client.delete_runner(github_repo, runner_id=0)
+    github_client.get_runner_github_info(github_repo)
+    assert list_mock.call_count == 2
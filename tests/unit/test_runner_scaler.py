@@ -9,11 +9,13 @@ import pytest
 
 from github_runner_manager.errors import CloudError, ReconcileError
 from github_runner_manager.manager.cloud_runner_manager import CloudRunnerState, InstanceId
+from github_runner_manager.manager.create_concurrency import AdaptiveConcurrencyLimit
 from github_runner_manager.manager.github_runner_manager import GitHubRunnerState
 from github_runner_manager.manager.runner_manager import (
     FlushMode,
     RunnerManager,
     RunnerManagerConfig,
+    RunnerStateSnapshot,
 )
 from github_runner_manager.manager.runner_scaler import RunnerScaler
 from github_runner_manager.metrics.events import Reconciliation
@@ -27,6 +29,7 @@ from tests.unit.mock_runner_managers import (
 
 def mock_runner_manager_spawn_runners(
     create_runner_args: Iterable[RunnerManager._CreateRunnerArgs],
+    concurrency: AdaptiveConcurrencyLimit,
 ) -> tuple[InstanceId, ...]:
     """Mock _spawn_runners method of RunnerManager.
 
@@ -36,6 +39,7 @@ def mock_runner_manager_spawn_runners(
 
     Args:
         create_runner_args: The arguments for the create_runner method.
+        concurrency: The limit on the number of runners created concurrently.
 
     Returns:
         The instance ids of the runner spawned.
@@ -203,6 +207,7 @@ def test_reconcile_error_still_issue_metrics(
     issue_events_mock.assert_called_once()
     issued_event = issue_events_mock.call_args[0][0]
     assert isinstance(issued_event, Reconciliation)
+    assert issued_event.create_concurrency == runner_scaler._manager.create_concurrency
 
 
 def test_reconcile_raises_reconcile_error(
@@ -221,6 +226,22 @@ def test_reconcile_raises_reconcile_error(
     assert "Failed to reconcile runners." in str(exc.value)
 
 
+def test_reconcile_metrics_receiver(runner_scaler: RunnerScaler, monkeypatch: pytest.MonkeyPatch):
+    """
+    Arrange: A RunnerScaler with no runners.
+    Act: Reconcile to one runner.
+    Assert: The receiver of the metrics pushed by the runners is reconciled.
+    """
+    reconcile_receiver_mock = MagicMock()
+    monkeypatch.setattr(
+        runner_scaler._manager._cloud, "reconcile_metrics_receiver", reconcile_receiver_mock
+    )
+
+    runner_scaler.reconcile(1)
+
+    reconcile_receiver_mock.assert_called_once_with()
+
+
 def test_one_runner(runner_scaler: RunnerScaler):
     """
     Arrange: A RunnerScaler with no runners.
@@ -317,3 +338,88 @@ def test_get_runner_unknown_runner(runner_scaler_one_runner: RunnerScaler):
     set_one_runner_state(runner_scaler, "UNKNOWN")
 
     assert_runner_info(runner_scaler=runner_scaler, unknown=1)
+
+
+def test_reconcile_steady_state_single_scan(
+    runner_scaler_one_runner: RunnerScaler, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    Arrange: A RunnerScaler with one runner, with the cloud and GitHub listings spied on.
+    Act: Reconcile to one runner.
+    Assert: The cloud and GitHub runners are listed once for the whole reconcile.
+    """
+    runner_manager = runner_scaler_one_runner._manager
+    cloud_get_runners = MagicMock(wraps=runner_manager._cloud.get_runners)
+    github_get_runners = MagicMock(wraps=runner_manager._github.get_runners)
+    monkeypatch.setattr(runner_manager._cloud, "get_runners", cloud_get_runners)
+    monkeypatch.setattr(runner_manager._github, "get_runners", github_get_runners)
+
+    diff = runner_scaler_one_runner.reconcile(1)
+
+    assert diff == 0
+    cloud_get_runners.assert_called_once()
+    github_get_runners.assert_called_once()
+
+
+def test_reconcile_snapshot_refreshed_after_create(
+    runner_scaler: RunnerScaler, issue_events_mock: MagicMock
+):
+    """
+    Arrange: A RunnerScaler with no runners.
+    Act: Reconcile to two runners.
+    Assert: The reconciliation metric counts the runners created during the reconcile.
+    """
+    diff = runner_scaler.reconcile(2)
+
+    assert diff == 2
+    reconcile_event = issue_events_mock.call_args.args[0]
+    assert isinstance(reconcile_event, Reconciliation)
+    assert reconcile_event.idle_runners == 2
+
+
+def test_snapshot_remove_runners(runner_scaler: RunnerScaler):
+    """
+    Arrange: A snapshot of two runners.
+    Act: Remove one runner from the snapshot.
+    Assert: The runner is removed from both the cloud and the GitHub runners of the snapshot.
+    """
+    runner_scaler.reconcile(2)
+    snapshot = runner_scaler._manager.get_snapshot()
+    removed, kept = snapshot.get_runners()
+
+    snapshot.remove_runners([removed.instance_id])
+
+    assert isinstance(snapshot, RunnerStateSnapshot)
+    assert [runner.name for runner in snapshot.get_runners()] == [kept.name]
+    assert [runner["name"] for runner in snapshot.github_runners] == [kept.name]
+
+
+def test_delete_runners_isolates_failures(
+    runner_manager: RunnerManager, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    arrange: Given three runners, the deletion of the second one failing on the cloud.
+    act: When the runners are deleted.
+    assert: The other runners are deleted, with their metrics issued in the order of the runners.
+    """
+    runner_manager.create_runners(3)
+    runners = runner_manager.get_runners()
+    failing_id = runners[1].instance_id
+    delete_runner = runner_manager._cloud.delete_runner
+
+    def _delete_runner(instance_id: InstanceId, remove_token: str):
+        """Fail the deletion of one runner, return the instance ID as metrics of the others."""
+        if instance_id == failing_id:
+            raise CloudError("failed")
+        delete_runner(instance_id, remove_token)
+        return instance_id
+
+    monkeypatch.setattr(runner_manager._cloud, "delete_runner", _delete_runner)
+    issue_runner_metrics = MagicMock(return_value={})
+    monkeypatch.setattr(runner_manager, "_issue_runner_metrics", issue_runner_metrics)
+
+    runner_manager.delete_runners(3)
+
+    assert [runner.instance_id for runner in runner_manager.get_runners()] == [failing_id]
+    metrics = list(issue_runner_metrics.call_args.kwargs["metrics"])
+    assert metrics == [runners[0].instance_id, runners[2].instance_id]
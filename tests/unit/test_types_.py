@@ -3,7 +3,7 @@
 """Module for testing the general types."""
 import pytest
 
-from github_runner_manager.types_ import ProxyConfig
+from github_runner_manager.types_ import MetricsReceiverConfig, ProxyConfig
 
 
 def test_check_use_aproxy():
@@ -20,3 +20,23 @@ def test_check_use_aproxy():
         ProxyConfig.check_use_aproxy(use_aproxy, values)
 
     assert str(exc_info.value) == "aproxy requires http or https to be set"
+
+
+@pytest.mark.parametrize(
+    "url, valid",
+    [
+        pytest.param("http://10.0.0.1:8089", True, id="http"),
+        pytest.param("https://metrics.example.com", False, id="https"),
+    ],
+)
+def test_metrics_receiver_url_scheme(url: str, valid: bool):
+    """
+    arrange: Given the URL of a metrics receiver.
+    act: Create the metrics receiver configuration.
+    assert: Only the plain HTTP URL is accepted, as the receiver does not serve TLS.
+    """
+    if valid:
+        assert MetricsReceiverConfig(url=url, secret="secret").url == url
+        return
+    with pytest.raises(ValueError, match="only serves plain HTTP"):
+        MetricsReceiverConfig(url=url, secret="secret")
@@ -0,0 +1,30 @@
+# Copyright 2024 Canonical Ltd.
+# See LICENSE file for licensing details.
+
+"""Test for the utilities module."""
+from unittest.mock import MagicMock
+
+import pytest
+
+from github_runner_manager import utilities
+from github_runner_manager.utilities import retry
+
+
+def test_retry_backoff_with_jitter(monkeypatch: pytest.MonkeyPatch):
+    """
+    arrange: Given a function failing until the last attempt, decorated with retry with jitter.
+    act: When the function is called.
+    assert: The waits grow exponentially up to the max delay, each with a bounded jitter added.
+    """
+    sleep_mock = MagicMock()
+    monkeypatch.setattr(utilities.time, "sleep", sleep_mock)
+    func = MagicMock(side_effect=[ValueError(), ValueError(), ValueError(), ValueError(), "done"])
+
+    decorated = retry(exception=ValueError, tries=5, delay=1, max_delay=3, backoff=2, jitter=0.5)(
+        func
+    )
+
+    assert decorated() == "done"
+    waits = [call.args[0] for call in sleep_mock.call_args_list]
+    for wait, expected_delay in zip(waits, (1, 2, 3, 3), strict=True):
+        assert expected_delay <= wait <= expected_delay + 0.5